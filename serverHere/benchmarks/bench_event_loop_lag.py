@@ -0,0 +1,122 @@
+"""
+Event-loop lag while an LLM generates tokens on the server.
+
+A ticker task wakes up every few milliseconds and records how late it was, as
+a stand-in for WebSocket, VAD and TTS tasks. Tokens are consumed in two ways:
+
+- on loop: the blocking token iterator is iterated on the event loop, which
+  is what `llama_cpp_llm` did before tokens were generated on a thread
+- thread: the iterator runs on a producer thread via `stream_from_thread`
+
+Without --model, tokens come from a simulated model that blocks for
+--token-ms per token with the GIL released, like llama.cpp does.
+
+Usage:
+    python benchmarks/bench_event_loop_lag.py [--tokens 100] [--token-ms 20]
+    python benchmarks/bench_event_loop_lag.py --model path/to/model.gguf
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from contextlib import nullcontext
+from typing import Callable, Iterator, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from loguru import logger  # noqa: E402
+
+from open_llm_vtuber.utils.thread_stream import stream_from_thread  # noqa: E402
+
+
+def simulated_tokens(count: int, token_seconds: float) -> Iterator[str]:
+    for i in range(count):
+        time.sleep(token_seconds)
+        yield f"token{i} "
+
+
+async def on_loop(make_iterator: Callable[[], Iterator], lock=None):
+    with lock or nullcontext():
+        for item in make_iterator():
+            yield item
+
+
+async def measure_lag(stop: asyncio.Event, lags: List[float], interval: float):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(name: str, stream, interval: float) -> None:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop, lags, interval))
+    # Let the ticker start before the stream takes the loop
+    await asyncio.sleep(interval)
+
+    start = time.perf_counter()
+    tokens = 0
+    async for _ in stream:
+        tokens += 1
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{name:<10} {tokens / elapsed:>9.1f} {statistics.median(lags) * 1000:>10.1f} "
+        f"{p99 * 1000:>10.1f} {lags[-1] * 1000:>10.1f} {len(lags):>7}"
+    )
+
+
+async def main(args) -> None:
+    logger.remove()
+    interval = args.interval_ms / 1000
+    lock = None
+    if args.model:
+        from open_llm_vtuber.agent.stateless_llm.llama_cpp_manager import (
+            LlamaCppModelManager,
+        )
+
+        manager = LlamaCppModelManager.get(args.model, verbose=False)
+        session_id = str(uuid.uuid4())
+        messages = [{"role": "user", "content": "Tell me a long story."}]
+        lock = manager.turn(session_id)
+
+        def make_iterator():
+            return manager.generate(session_id, messages)
+
+        source = os.path.basename(args.model)
+    else:
+
+        def make_iterator():
+            return simulated_tokens(args.tokens, args.token_ms / 1000)
+
+        source = f"simulated, {args.tokens} tokens x {args.token_ms:g} ms"
+
+    print(f"{source}, ticker every {args.interval_ms:g} ms")
+    print(
+        f"{'mode':<10} {'tokens/s':>9} {'lag p50 ms':>10} {'lag p99 ms':>10} "
+        f"{'lag max ms':>10} {'ticks':>7}"
+    )
+    await run("on loop", on_loop(make_iterator, lock), interval)
+    await run(
+        "thread",
+        stream_from_thread(make_iterator, name="bench-generate", lock=lock),
+        interval,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("--model", help="GGUF model to generate with llama.cpp")
+    asyncio.run(main(parser.parse_args()))
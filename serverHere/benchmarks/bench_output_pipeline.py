@@ -0,0 +1,154 @@
+"""
+Per-sentence overhead of the agent output pipeline.
+
+Streams answers token by token through:
+
+- decorators: the sentence_divider, actions_extractor, display_processor and
+  tts_filter decorators, applied again for every answer, as
+  `BasicMemoryAgent` did before it built an `OutputPipeline` once
+- pipeline: one `OutputPipeline` with the same stages, built once
+
+and reports time per sentence and the peak memory allocated while an answer
+is processed, measured with tracemalloc in a separate pass.
+
+Usage:
+    python benchmarks/bench_output_pipeline.py [--answers 200] [--segment-method regex]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from loguru import logger  # noqa: E402
+
+from open_llm_vtuber.agent.transformers import (  # noqa: E402
+    OutputPipeline,
+    actions_extractor,
+    actions_stage,
+    display_processor,
+    display_stage,
+    sentence_divider,
+    tts_filter,
+    tts_stage,
+)
+from open_llm_vtuber.config_manager import TTSPreprocessorConfig  # noqa: E402
+
+ANSWER = (
+    "<think>The user greets me, so I greet back.</think>"
+    "[joy] Hello! It's really nice to see you again. "
+    "I was just thinking about the trip you mentioned, the one to the coast. "
+    "[surprise] Did you book the train already? "
+    "If not, the morning ones are cheaper, and the view is *much* better. "
+    "Let me know, and I'll help you plan the rest."
+)
+
+
+class Live2dModelStub:
+    """Extracts emotions like Live2dModel, without loading a model."""
+
+    emo_map = {"joy": 3, "surprise": 2}
+
+    def extract_emotion(self, text):
+        return [value for key, value in self.emo_map.items() if f"[{key}]" in text]
+
+    def remove_emotion_keywords(self, text):
+        for key in self.emo_map:
+            text = text.replace(f"[{key}]", "")
+        return text
+
+
+def tokens_of(text: str, size: int = 4):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+async def token_stream(tokens):
+    for token in tokens:
+        yield token
+
+
+def decorated_answer(live2d_model, config, segment_method):
+    """The chat function as it was rebuilt for every answer."""
+
+    @tts_filter(config)
+    @display_processor()
+    @actions_extractor(live2d_model)
+    @sentence_divider(
+        faster_first_response=True, segment_method=segment_method, valid_tags=["think"]
+    )
+    async def chat(tokens):
+        async for token in token_stream(tokens):
+            yield token
+
+    return chat
+
+
+async def run_decorators(answers, tokens, live2d_model, config, segment_method):
+    sentences = 0
+    for _ in range(answers):
+        chat = decorated_answer(live2d_model, config, segment_method)
+        async for _ in chat(tokens):
+            sentences += 1
+    return sentences
+
+
+async def run_pipeline(answers, tokens, pipeline):
+    sentences = 0
+    for _ in range(answers):
+        async for _ in pipeline.process(token_stream(tokens)):
+            sentences += 1
+    return sentences
+
+
+def peak_bytes(coroutine_function) -> int:
+    tracemalloc.start()
+    try:
+        asyncio.run(coroutine_function())
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(args) -> None:
+    logger.remove()
+    live2d_model = Live2dModelStub()
+    config = TTSPreprocessorConfig(
+        remove_special_char=True,
+        translator_config={"translate_audio": False, "translate_provider": "deeplx"},
+    )
+    pipeline = OutputPipeline(
+        stages=[actions_stage(live2d_model), display_stage, tts_stage(config)],
+        segment_method=args.segment_method,
+        valid_tags=["think"],
+    )
+    tokens = tokens_of(ANSWER)
+
+    runs = {
+        "decorators": lambda answers: run_decorators(
+            answers, tokens, live2d_model, config, args.segment_method
+        ),
+        "pipeline": lambda answers: run_pipeline(answers, tokens, pipeline),
+    }
+    print(f"{args.answers} answers, {len(tokens)} tokens each, {args.segment_method}")
+    print(f"{'path':<12} {'us/sentence':>12} {'sentences':>10} {'peak KiB/answer':>16}")
+    for name, run in runs.items():
+        asyncio.run(run(5))  # warm up
+        start = time.perf_counter()
+        sentences = asyncio.run(run(args.answers))
+        elapsed = time.perf_counter() - start
+        peak = peak_bytes(lambda: run(1))
+        print(
+            f"{name:<12} {elapsed / sentences * 1e6:>12.1f} "
+            f"{sentences // args.answers:>10} {peak / 1024:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--answers", type=int, default=200)
+    parser.add_argument("--segment-method", default="regex", choices=["regex", "pysbd"])
+    main(parser.parse_args())
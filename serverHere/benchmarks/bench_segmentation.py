@@ -0,0 +1,134 @@
+"""
+Benchmark of TTS segmentation policies: time to first audio and synthesis
+calls per answer.
+
+An answer is streamed through `OutputPipeline` token by token at a fixed LLM
+rate on a simulated clock. Each chunk is synthesized by a simulated TTS engine
+with a fixed per-call overhead, one call at a time, and played back at a fixed
+speaking rate. Nothing sleeps, so the results are the same on every run.
+
+Usage:
+    python benchmarks/bench_segmentation.py [--llm-rate 60] [--tts-overhead 0.35]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from dataclasses import dataclass
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from loguru import logger  # noqa: E402
+
+from open_llm_vtuber.agent.transformers import OutputPipeline  # noqa: E402
+from open_llm_vtuber.utils.segmentation_policy import (  # noqa: E402
+    SPEECH_CHARS_PER_SECOND,
+    SegmentationPolicy,
+    segmentation_stats,
+)
+
+ANSWERS = [
+    "Oh! Yes. Sure, I can help with that. First, open the settings page. "
+    "Then pick the voice you like. Done? Great! Now try saying hello.",
+    "Hmm. Well, that depends on a lot of things, like how far you want to go "
+    "and how much time you have and whether you would rather take the train "
+    "or drive and stop along the way at the small towns by the coast. OK?",
+    "Right. The short answer is no. The longer answer is that the function "
+    "returns early when the list is empty, so nothing is ever written. "
+    "Check the caller. Then add a log line. That should show it.",
+]
+
+POLICIES = {
+    "every sentence": SegmentationPolicy(),
+    "merge >= 40": SegmentationPolicy(min_chunk_chars=40),
+    "merge >= 40, cap 120": SegmentationPolicy(min_chunk_chars=40, max_chunk_chars=120),
+    "adaptive first, merge, cap": SegmentationPolicy(
+        min_chunk_chars=40, max_chunk_chars=120, adaptive_first_chunk=True
+    ),
+}
+
+
+@dataclass
+class Result:
+    first_audio: float
+    synthesis_calls: int
+    stall: float
+
+
+def tokens_of(text: str, size: int = 4) -> List[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+async def chunk_times(
+    policy: SegmentationPolicy, text: str, llm_rate: float
+) -> List[Tuple[float, str]]:
+    """Return the simulated time each TTS chunk is ready, and its text."""
+    pipeline = OutputPipeline(
+        stages=[], segment_method="regex", segmentation_policy=policy
+    )
+    now = 0.0
+
+    async def token_stream():
+        nonlocal now
+        for token in tokens_of(text):
+            now += len(token) / llm_rate
+            yield token
+
+    return [(now, output.tts_text) async for output in pipeline.process(token_stream())]
+
+
+def simulate(
+    chunks: List[Tuple[float, str]], tts_overhead: float, tts_per_char: float
+) -> Result:
+    synthesized = 0.0  # when the engine is free again
+    played = 0.0  # when playback of the previous chunk ends
+    first_audio = None
+    stall = 0.0
+    for ready, text in chunks:
+        synthesized = max(ready, synthesized) + tts_overhead + tts_per_char * len(text)
+        if first_audio is None:
+            first_audio = played = synthesized
+        elif synthesized > played:
+            stall += synthesized - played
+            played = synthesized
+        played += len(text) / SPEECH_CHARS_PER_SECOND
+    return Result(first_audio or 0.0, len(chunks), stall)
+
+
+async def main(args) -> None:
+    logger.remove()
+    # What the adaptive policy would have measured on earlier answers
+    segmentation_stats.tts_latency = args.tts_overhead + 30 * args.tts_per_char
+    segmentation_stats.llm_chars_per_second = args.llm_rate
+
+    print(
+        f"LLM {args.llm_rate:g} chars/s, TTS {args.tts_overhead:g} s + "
+        f"{args.tts_per_char * 1000:g} ms/char, {len(ANSWERS)} answers"
+    )
+    print(f"{'policy':<28} {'first audio':>12} {'calls/answer':>13} {'stall':>8}")
+    for name, policy in POLICIES.items():
+        results = [
+            simulate(
+                await chunk_times(policy, text, args.llm_rate),
+                args.tts_overhead,
+                args.tts_per_char,
+            )
+            for text in ANSWERS
+        ]
+        count = len(results)
+        print(
+            f"{name:<28} "
+            f"{sum(r.first_audio for r in results) / count:>10.2f} s "
+            f"{sum(r.synthesis_calls for r in results) / count:>13.1f} "
+            f"{sum(r.stall for r in results) / count:>6.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--llm-rate", type=float, default=60.0, help="chars/s")
+    parser.add_argument("--tts-overhead", type=float, default=0.35, help="s/call")
+    parser.add_argument("--tts-per-char", type=float, default=0.01, help="s/char")
+    asyncio.run(main(parser.parse_args()))
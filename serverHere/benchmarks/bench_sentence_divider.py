@@ -0,0 +1,106 @@
+"""
+Per-token cost of the sentence divider as answers get longer.
+
+Streams answers of increasing length token by token through
+`SentenceDivider.process_stream` and reports the time per token for each
+length. If the divider rescanned everything it had seen on every token, the
+cost per token would grow with the answer; it should stay flat.
+
+Two answer shapes are measured:
+
+- sentences: ordinary prose, so the buffer is emptied at every sentence end
+- run-on: one long sentence without end punctuation, the worst case for a
+  divider that holds text back. --max-chars sets max_sentence_chars for it,
+  as a SegmentationPolicy cap would.
+
+Usage:
+    python benchmarks/bench_sentence_divider.py [--segment-method regex] [--max-chars 0]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from loguru import logger  # noqa: E402
+
+from open_llm_vtuber.utils.sentence_divider import SentenceDivider  # noqa: E402
+
+SENTENCES = (
+    "I was just thinking about the trip you mentioned. "
+    "Did you book the train already? "
+    "If not, the morning ones are cheaper, and the view is much better! "
+    "<think>They may not know about the coast line.</think>"
+    "Let me know, and I'll help you plan the rest. "
+)
+RUN_ON = "and then we walked along the river for a while talking about nothing much "
+LENGTHS = [250, 1000, 4000, 16000]
+
+
+def make_answer(unit: str, length: int) -> str:
+    return (unit * (length // len(unit) + 1))[:length]
+
+
+def tokens_of(text: str, size: int = 4) -> List[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+async def token_stream(tokens: List[str]):
+    for token in tokens:
+        yield token
+
+
+async def divide(tokens: List[str], segment_method: str, max_chars: int) -> int:
+    divider = SentenceDivider(
+        faster_first_response=True,
+        segment_method=segment_method,
+        valid_tags=["think"],
+        language="en",
+        max_sentence_chars=max_chars,
+    )
+    sentences = 0
+    async for _ in divider.process_stream(token_stream(tokens)):
+        sentences += 1
+    return sentences
+
+
+def us_per_token(tokens: List[str], segment_method: str, max_chars: int, repeat: int):
+    best = float("inf")
+    sentences = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sentences = asyncio.run(divide(tokens, segment_method, max_chars))
+        best = min(best, time.perf_counter() - start)
+    return best / len(tokens) * 1e6, sentences
+
+
+def main(args) -> None:
+    logger.remove()
+    print(f"{args.segment_method}, 4-char tokens, best of {args.repeat}")
+    print(f"{'answer':<10} {'chars':>7} {'tokens':>7} {'sentences':>10} {'us/token':>9}")
+    shapes = [("sentences", SENTENCES, 0), ("run-on", RUN_ON, args.max_chars)]
+    # Load the segmenter and compile its rules before timing
+    asyncio.run(divide(tokens_of(SENTENCES), args.segment_method, 0))
+    for name, unit, max_chars in shapes:
+        for length in LENGTHS:
+            tokens = tokens_of(make_answer(unit, length))
+            cost, sentences = us_per_token(
+                tokens, args.segment_method, max_chars, args.repeat
+            )
+            print(
+                f"{name:<10} {length:>7} {len(tokens):>7} {sentences:>10} {cost:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--segment-method", default="regex", choices=["regex", "pysbd"])
+    parser.add_argument(
+        "--max-chars", type=int, default=0, help="max_sentence_chars of run-on answers"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,97 @@
+"""
+Lip-sync volume envelope: NumPy against the pydub path it replaced.
+
+For a few audio formats, times the envelope per second of audio, checks it
+against pydub's `make_chunks` + `.rms`, and reports the JSON size of the
+volumes per second of audio for every encoding a client can choose.
+
+Usage:
+    python benchmarks/bench_volume_envelope.py [--seconds 10] [--chunk-ms 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.utils import make_chunks
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from open_llm_vtuber.utils.stream_audio import (  # noqa: E402
+    VOLUME_ENCODINGS,
+    _get_volume_by_chunks,
+    encode_volumes,
+)
+
+# (frame rate, channels, sample width in bytes)
+FORMATS = [(24000, 1, 2), (22050, 1, 2), (44100, 2, 2), (48000, 2, 4)]
+
+
+def pydub_volumes(audio: AudioSegment, chunk_ms: int) -> list:
+    """The envelope as computed before, one AudioSegment per chunk."""
+    volumes = [chunk.rms for chunk in make_chunks(audio, chunk_ms)]
+    max_volume = max(volumes)
+    if max_volume == 0:
+        return [0.0] * len(volumes)
+    return [volume / max_volume for volume in volumes]
+
+
+def make_audio(rate: int, channels: int, width: int, frames: int) -> AudioSegment:
+    """Speech-like noise: loud and quiet stretches of a few hundred ms."""
+    rng = np.random.default_rng(0)
+    sample_type = np.dtype(f"<i{width}")
+    envelope = np.repeat(rng.uniform(0.05, 0.4, frames // (rate // 4) + 1), rate // 4)
+    samples = rng.standard_normal((frames, channels)) * envelope[:frames, None]
+    limits = np.iinfo(sample_type)
+    samples = np.clip(samples * limits.max, limits.min, limits.max)
+    return AudioSegment(
+        samples.astype(sample_type).tobytes(),
+        frame_rate=rate,
+        sample_width=width,
+        channels=channels,
+    )
+
+
+def per_second_ms(function, seconds: float) -> float:
+    runs = min(timeit.repeat(function, number=3, repeat=5)) / 3
+    return runs / seconds * 1000
+
+
+def main(args) -> None:
+    print(f"{args.seconds:g} s of audio, {args.chunk_ms} ms chunks")
+    print(
+        f"{'format':<22} {'pydub ms/s':>10} {'numpy ms/s':>10} {'max diff':>9} "
+        f"{'chunks':>13}"
+    )
+    for rate, channels, width in FORMATS:
+        # A few frames past the last whole chunk, like real TTS output
+        audio = make_audio(rate, channels, width, int(rate * args.seconds) + 7)
+        old = pydub_volumes(audio, args.chunk_ms)
+        new = _get_volume_by_chunks(audio, args.chunk_ms)
+        shared = min(len(old), len(new))
+        max_diff = max(abs(a - b) for a, b in zip(old[:shared], new[:shared]))
+        print(
+            f"{rate} Hz {channels}ch {8 * width}-bit".ljust(22)
+            + f" {per_second_ms(lambda: pydub_volumes(audio, args.chunk_ms), args.seconds):>10.3f}"
+            f" {per_second_ms(lambda: _get_volume_by_chunks(audio, args.chunk_ms), args.seconds):>10.3f}"
+            f" {max_diff:>9.1e}"
+            f" {f'{len(old)} -> {len(new)}':>13}"
+        )
+
+    audio = make_audio(24000, 1, 2, int(24000 * args.seconds))
+    volumes = _get_volume_by_chunks(audio, args.chunk_ms)
+    print(f"\nJSON bytes of the volumes per second of audio, {len(volumes)} chunks")
+    for encoding in VOLUME_ENCODINGS:
+        size = len(json.dumps(encode_volumes(volumes, encoding)))
+        print(f"{encoding:<6} {size / args.seconds:>8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--chunk-ms", type=int, default=20)
+    main(parser.parse_args())
@@ -4,6 +4,7 @@ from loguru import logger
 from .agents.agent_interface import AgentInterface
 from .agents.basic_memory_agent import BasicMemoryAgent
 from .stateless_llm_factory import LLMFactory as StatelessLLMFactory
+from .stateless_llm.routed_llm import RoutedLLM
 from .agents.hume_ai import HumeAIAgent
 from .agents.letta_agent import LettaAgent
 
@@ -60,6 +61,31 @@ class AgentFactory:
                 llm_provider=llm_provider, system_prompt=system_prompt, **llm_config
             )
 
+            fallback_providers: list = basic_memory_settings.get(
+                "fallback_llm_providers"
+            ) or []
+            if fallback_providers:
+                backends = [llm]
+                for provider in fallback_providers:
+                    fallback_config = dict(llm_configs.get(provider) or {})
+                    if not fallback_config:
+                        raise ValueError(
+                            f"Configuration not found for fallback LLM provider: {provider}"
+                        )
+                    fallback_config.pop("interrupt_method", None)
+                    backends.append(
+                        StatelessLLMFactory.create_llm(
+                            llm_provider=provider,
+                            system_prompt=system_prompt,
+                            **fallback_config,
+                        )
+                    )
+                llm = RoutedLLM(
+                    backends,
+                    names=[llm_provider, *fallback_providers],
+                    hedge_delay_ms=basic_memory_settings.get("hedge_delay_ms", 0),
+                )
+
             tool_prompts = kwargs.get("system_config", {}).get("tool_prompts", {})
 
             # Extract MCP components/data needed by BasicMemoryAgent from kwargs
@@ -77,12 +103,22 @@ class AgentFactory:
                     "faster_first_response", True
                 ),
                 segment_method=basic_memory_settings.get("segment_method", "pysbd"),
+                segment_language=basic_memory_settings.get("segment_language"),
+                segment_min_chars=basic_memory_settings.get("segment_min_chars", 0),
+                segment_max_chars=basic_memory_settings.get("segment_max_chars", 0),
+                adaptive_first_chunk=basic_memory_settings.get(
+                    "adaptive_first_chunk", False
+                ),
                 use_mcpp=basic_memory_settings.get("use_mcpp", False),
                 interrupt_method=interrupt_method,
                 tool_prompts=tool_prompts,
                 tool_manager=tool_manager,
                 tool_executor=tool_executor,
                 mcp_prompt_string=mcp_prompt_string,
+                memory_token_budget=basic_memory_settings.get(
+                    "memory_token_budget", 6000
+                ),
+                summarize_memory=basic_memory_settings.get("summarize_memory", True),
             )
 
         elif conversation_agent_choice == "mem0_agent":
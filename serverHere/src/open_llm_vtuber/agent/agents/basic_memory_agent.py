@@ -1,9 +1,9 @@
+import copy
 from typing import (
     AsyncIterator,
     List,
     Dict,
     Any,
-    Callable,
     Literal,
     Union,
     Optional,
@@ -11,16 +11,20 @@ from typing import (
 from loguru import logger
 from .agent_interface import AgentInterface
 from ..output_types import SentenceOutput, DisplayText
+from ..memory_policy import MemoryPolicy
 from ..stateless_llm.stateless_llm_interface import StatelessLLMInterface
 from ..stateless_llm.claude_llm import AsyncLLM as ClaudeAsyncLLM
 from ..stateless_llm.openai_compatible_llm import AsyncLLM as OpenAICompatibleAsyncLLM
-from ...chat_history_manager import get_history
+from ..stateless_llm.llm_gateway import Priority, priority_for, request_priority
+from ..text_delta import text_delta_sink
+from ...chat_history_manager import HistoryPage, get_history_page
 from ..transformers import (
-    sentence_divider,
-    actions_extractor,
-    tts_filter,
-    display_processor,
+    OutputPipeline,
+    actions_stage,
+    display_stage,
+    tts_stage,
 )
+from ...utils.segmentation_policy import SegmentationPolicy
 from ...config_manager import TTSPreprocessorConfig
 from ..input_types import BatchInput, TextSource
 from prompts import prompt_loader
@@ -30,6 +34,10 @@ from ...mcpp.types import ToolCallObject
 from ...mcpp.tool_executor import ToolExecutor
 
 
+# Messages read per step when loading memory from the end of a history
+_HISTORY_PAGE_SIZE = 50
+
+
 class BasicMemoryAgent(AgentInterface):
     """Agent with basic chat memory and tool calling support."""
 
@@ -43,30 +51,36 @@ class BasicMemoryAgent(AgentInterface):
         tts_preprocessor_config: TTSPreprocessorConfig = None,
         faster_first_response: bool = True,
         segment_method: str = "pysbd",
+        segment_language: Optional[str] = None,
+        segment_min_chars: int = 0,
+        segment_max_chars: int = 0,
+        adaptive_first_chunk: bool = False,
         use_mcpp: bool = False,
         interrupt_method: Literal["system", "user"] = "user",
         tool_prompts: Dict[str, str] = None,
         tool_manager: Optional[ToolManager] = None,
         tool_executor: Optional[ToolExecutor] = None,
         mcp_prompt_string: str = "",
+        memory_token_budget: int = 6000,
+        summarize_memory: bool = True,
     ):
         """Initialize agent with LLM and configuration."""
         super().__init__()
-        self._memory = []
+        self._memory_token_budget = memory_token_budget
+        self._summarize_memory = summarize_memory
+        self._init_session_state()
         self._live2d_model = live2d_model
         self._tts_preprocessor_config = tts_preprocessor_config
         self._faster_first_response = faster_first_response
         self._segment_method = segment_method
+        self._segment_language = segment_language
         self._use_mcpp = use_mcpp
         self.interrupt_method = interrupt_method
         self._tool_prompts = tool_prompts or {}
-        self._interrupt_handled = False
-        self.prompt_mode_flag = False
 
         self._tool_manager = tool_manager
         self._tool_executor = tool_executor
         self._mcp_prompt_string = mcp_prompt_string
-        self._json_detector = StreamJSONDetector()
 
         self._formatted_tools_openai = []
         self._formatted_tools_claude = []
@@ -85,6 +99,23 @@ class BasicMemoryAgent(AgentInterface):
                 "ToolManager not provided, agent will not have pre-formatted tools."
             )
 
+        self._output_pipeline = OutputPipeline(
+            stages=[
+                actions_stage(self._live2d_model),
+                display_stage,
+                tts_stage(self._tts_preprocessor_config),
+            ],
+            faster_first_response=self._faster_first_response,
+            segment_method=self._segment_method,
+            valid_tags=["think"],
+            language=self._segment_language,
+            segmentation_policy=SegmentationPolicy(
+                min_chunk_chars=segment_min_chars,
+                max_chunk_chars=segment_max_chars,
+                adaptive_first_chunk=adaptive_first_chunk,
+            ),
+        )
+
         self._set_llm(llm)
         self.set_system(system if system else self._system)
 
@@ -111,10 +142,67 @@ class BasicMemoryAgent(AgentInterface):
 
         logger.info("BasicMemoryAgent initialized.")
 
+    def _init_session_state(self) -> None:
+        """Create the state that belongs to a single conversation session."""
+        self._memory = []
+        self._memory_policy = MemoryPolicy(
+            token_budget=self._memory_token_budget, summarize=self._summarize_memory
+        )
+        self._interrupt_handled = False
+        self.prompt_mode_flag = False
+        self._json_detector = StreamJSONDetector()
+
+    def create_session(self) -> "BasicMemoryAgent":
+        """
+        Create an agent for a new client session.
+
+        The session agent has its own memory and interrupt state, while the LLM
+        client, tools and system prompt are shared with this agent by reference.
+        Nothing is re-instantiated, so this is cheap to call on every connection.
+        """
+        session = copy.copy(self)
+        session._init_session_state()
+        if hasattr(self._llm, "create_session"):
+            # LLMs with per-session state (e.g. KV cache snapshots)
+            session._llm = self._llm.create_session()
+        return session
+
+    def fork(self) -> "BasicMemoryAgent":
+        """
+        Create a draft agent that answers from this agent's current memory
+        without changing it, e.g. to prepare a reply in advance. Use
+        `record_response` to keep a draft reply once it is actually used.
+        Tools are disabled in the draft, since their effects can't be undone.
+        """
+        draft = copy.copy(self)
+        draft._init_session_state()
+        draft._use_mcpp = False
+        draft._memory = list(self._memory)
+        draft._memory_policy.summary = self._memory_policy.summary
+        # Never start a background summary for a throwaway copy
+        draft._memory_policy.summarize = False
+        return draft
+
+    @property
+    def memory_version(self) -> tuple:
+        """Changes whenever memory is replaced, extended, or shortened."""
+        last = self._memory[-1] if self._memory else None
+        return (id(self._memory), len(self._memory), id(last))
+
+    def record_response(self, text: str) -> None:
+        """Add a reply that was produced outside of `chat` to memory."""
+        self._add_message(text, "assistant")
+
+    async def close(self) -> None:
+        """Release the session memory. Shared LLM and tool resources are left open."""
+        self._memory_policy.reset()
+        self._memory = []
+        if hasattr(self._llm, "release_session"):
+            await self._llm.release_session()
+
     def _set_llm(self, llm: StatelessLLMInterface):
         """Set the LLM for chat completion."""
         self._llm = llm
-        self.chat = self._chat_function_factory()
 
     def set_system(self, system: str):
         """Set the system prompt."""
@@ -173,11 +261,47 @@ class BasicMemoryAgent(AgentInterface):
 
         self._memory.append(message_data)
 
+    def _read_history_tail(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        latest_page: Optional[HistoryPage] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Read a history backwards, page by page, until the memory budget is
+        filled. Older messages would never reach the prompt, so switching to a
+        long chat costs about as much as switching to a short one. Without a
+        budget the whole history is read.
+        """
+        page = latest_page or get_history_page(
+            conf_uid, history_uid, _HISTORY_PAGE_SIZE
+        )
+        messages: List[Dict[str, Any]] = list(page["messages"])
+        before = page["before"]
+        while before and not self._memory_policy.covers(messages):
+            page = get_history_page(conf_uid, history_uid, _HISTORY_PAGE_SIZE, before)
+            messages[:0] = page["messages"]
+            before = page["before"]
+        return messages
+
     def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
-        """Load memory from chat history."""
-        messages = get_history(conf_uid, history_uid)
+        """Load memory from the end of the chat history."""
+        self.set_memory_from_history_page(conf_uid, history_uid, None)
+
+    def set_memory_from_history_page(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        latest_page: Optional[HistoryPage],
+    ) -> None:
+        """
+        Load memory from the end of the chat history, starting from its latest
+        page if the caller already read it, so that page is not read again.
+        """
+        messages = self._read_history_tail(conf_uid, history_uid, latest_page)
 
         self._memory = []
+        self._memory_policy.reset()
         for msg in messages:
             role = "user" if msg["role"] == "human" else "assistant"
             content = msg["content"]
@@ -241,7 +365,7 @@ class BasicMemoryAgent(AgentInterface):
 
     def _to_messages(self, input_data: BatchInput) -> List[Dict[str, Any]]:
         """Prepare messages for LLM API call."""
-        messages = self._memory.copy()
+        messages = self._memory_policy.window(self._memory)
         user_content = []
         text_prompt = self._to_text_prompt(input_data)
         if text_prompt:
@@ -271,7 +395,15 @@ class BasicMemoryAgent(AgentInterface):
                 )
 
         if user_content:
-            user_message = {"role": "user", "content": user_content}
+            # Send plain text the same way it is stored in memory, so the
+            # message is byte-identical when it becomes history next turn.
+            if len(user_content) == 1 and text_prompt:
+                user_message = {"role": "user", "content": text_prompt}
+            else:
+                user_message = {"role": "user", "content": user_content}
+            self._memory_policy.record_prompt(
+                self._get_system_prompt(), messages, [user_message]
+            )
             messages.append(user_message)
 
             skip_memory = False
@@ -299,7 +431,9 @@ class BasicMemoryAgent(AgentInterface):
         current_assistant_message_content = []
 
         while True:
-            stream = self._llm.chat_completion(messages, self._system, tools=tools)
+            stream = self._llm.chat_completion(
+                messages, self._get_system_prompt(), tools=tools
+            )
             pending_tool_calls.clear()
             current_assistant_message_content.clear()
 
@@ -338,7 +472,7 @@ class BasicMemoryAgent(AgentInterface):
                     break
                 elif event["type"] == "error":
                     logger.error(f"LLM API Error: {event['message']}")
-                    yield f"[Error from LLM: {event['message']}]"
+                    yield event
                     return
 
             if pending_tool_calls:
@@ -409,20 +543,20 @@ class BasicMemoryAgent(AgentInterface):
         messages = initial_messages.copy()
         current_turn_text = ""
         pending_tool_calls: Union[List[ToolCallObject], List[Dict[str, Any]]] = []
-        current_system_prompt = self._system
+        current_system_prompt = self._get_system_prompt()
 
         while True:
             if self.prompt_mode_flag:
                 if self._mcp_prompt_string:
-                    current_system_prompt = (
-                        f"{self._system}\n\n{self._mcp_prompt_string}"
+                    current_system_prompt = self._get_system_prompt(
+                        self._mcp_prompt_string
                     )
                 else:
                     logger.warning("Prompt mode active but mcp_prompt_string is empty!")
-                    current_system_prompt = self._system
+                    current_system_prompt = self._get_system_prompt()
                 tools_for_api = None
             else:
-                current_system_prompt = self._system
+                current_system_prompt = self._get_system_prompt()
                 tools_for_api = tools
 
             stream = self._llm.chat_completion(
@@ -435,6 +569,10 @@ class BasicMemoryAgent(AgentInterface):
             goto_next_while_iteration = False
 
             async for event in stream:
+                if isinstance(event, dict) and event.get("type") == "error":
+                    logger.error(f"LLM API Error: {event['message']}")
+                    yield event
+                    return
                 if self.prompt_mode_flag:
                     if isinstance(event, str):
                         current_turn_text += event
@@ -578,97 +716,148 @@ class BasicMemoryAgent(AgentInterface):
                     self._add_message(current_turn_text, "assistant")
                 return
 
-    def _chat_function_factory(
+    async def _chat_with_memory(
         self,
-    ) -> Callable[[BatchInput], AsyncIterator[Union[SentenceOutput, Dict[str, Any]]]]:
-        """Create the chat pipeline function."""
-
-        @tts_filter(self._tts_preprocessor_config)
-        @display_processor()
-        @actions_extractor(self._live2d_model)
-        @sentence_divider(
-            faster_first_response=self._faster_first_response,
-            segment_method=self._segment_method,
-            valid_tags=["think"],
-        )
-        async def chat_with_memory(
-            input_data: BatchInput,
-        ) -> AsyncIterator[Union[str, Dict[str, Any]]]:
-            """Process chat with memory and tools."""
-            self.reset_interrupt()
-            self.prompt_mode_flag = False
-
-            messages = self._to_messages(input_data)
-            tools = None
-            tool_mode = None
-            llm_supports_native_tools = False
-
-            if self._use_mcpp and self._tool_manager:
-                tools = None
-                if isinstance(self._llm, ClaudeAsyncLLM):
-                    tool_mode = "Claude"
-                    tools = self._formatted_tools_claude
-                    llm_supports_native_tools = True
-                elif isinstance(self._llm, OpenAICompatibleAsyncLLM):
-                    tool_mode = "OpenAI"
-                    tools = self._formatted_tools_openai
-                    llm_supports_native_tools = True
-                else:
-                    logger.warning(
-                        f"LLM type {type(self._llm)} not explicitly handled for tool mode determination."
-                    )
+        input_data: BatchInput,
+    ) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """Process chat with memory and tools, yielding raw tokens and tool status."""
+        self.reset_interrupt()
+        self.prompt_mode_flag = False
 
-                if llm_supports_native_tools and not tools:
-                    logger.warning(
-                        f"No tools available/formatted for '{tool_mode}' mode, despite MCP being enabled."
-                    )
+        messages = self._to_messages(input_data)
+        tools = None
+        tool_mode = None
+        llm_supports_native_tools = False
 
-            if self._use_mcpp and tool_mode == "Claude":
-                logger.debug(
-                    f"Starting Claude tool interaction loop with {len(tools)} tools."
+        if self._use_mcpp and self._tool_manager:
+            tools = None
+            # Look through wrappers such as the LLM gateway
+            backend = getattr(self._llm, "backend", self._llm)
+            if isinstance(backend, ClaudeAsyncLLM):
+                tool_mode = "Claude"
+                tools = self._formatted_tools_claude
+                llm_supports_native_tools = True
+            elif isinstance(backend, OpenAICompatibleAsyncLLM):
+                tool_mode = "OpenAI"
+                tools = self._formatted_tools_openai
+                llm_supports_native_tools = True
+            else:
+                logger.warning(
+                    f"LLM type {type(backend)} not explicitly handled for tool mode determination."
                 )
-                async for output in self._claude_tool_interaction_loop(
-                    messages, tools if tools else []
-                ):
-                    yield output
-                return
-            elif self._use_mcpp and tool_mode == "OpenAI":
-                logger.debug(
-                    f"Starting OpenAI tool interaction loop with {len(tools)} tools."
+
+            if llm_supports_native_tools and not tools:
+                logger.warning(
+                    f"No tools available/formatted for '{tool_mode}' mode, despite MCP being enabled."
                 )
-                async for output in self._openai_tool_interaction_loop(
-                    messages, tools if tools else []
-                ):
-                    yield output
-                return
-            else:
-                logger.info("Starting simple chat completion.")
-                token_stream = self._llm.chat_completion(messages, self._system)
-                complete_response = ""
-                async for event in token_stream:
-                    text_chunk = ""
-                    if isinstance(event, dict) and event.get("type") == "text_delta":
-                        text_chunk = event.get("text", "")
-                    elif isinstance(event, str):
-                        text_chunk = event
-                    else:
-                        continue
-                    if text_chunk:
-                        yield text_chunk
-                        complete_response += text_chunk
-                if complete_response:
-                    self._add_message(complete_response, "assistant")
 
-        return chat_with_memory
+        if self._use_mcpp and tool_mode == "Claude":
+            logger.debug(
+                f"Starting Claude tool interaction loop with {len(tools)} tools."
+            )
+            async for output in self._claude_tool_interaction_loop(
+                messages, tools if tools else []
+            ):
+                yield output
+            return
+        elif self._use_mcpp and tool_mode == "OpenAI":
+            logger.debug(
+                f"Starting OpenAI tool interaction loop with {len(tools)} tools."
+            )
+            async for output in self._openai_tool_interaction_loop(
+                messages, tools if tools else []
+            ):
+                yield output
+            return
+        else:
+            logger.info("Starting simple chat completion.")
+            token_stream = self._llm.chat_completion(
+                messages, self._get_system_prompt()
+            )
+            complete_response = ""
+            async for event in token_stream:
+                text_chunk = ""
+                if isinstance(event, dict) and event.get("type") == "text_delta":
+                    text_chunk = event.get("text", "")
+                elif isinstance(event, dict) and event.get("type") == "error":
+                    # Shown to the user, not spoken or added to memory
+                    logger.error(f"LLM API Error: {event['message']}")
+                    yield event
+                    return
+                elif isinstance(event, str):
+                    text_chunk = event
+                else:
+                    continue
+                if text_chunk:
+                    yield text_chunk
+                    complete_response += text_chunk
+            if complete_response:
+                self._add_message(complete_response, "assistant")
 
     async def chat(
         self,
         input_data: BatchInput,
     ) -> AsyncIterator[Union[SentenceOutput, Dict[str, Any]]]:
         """Run chat pipeline."""
-        chat_func_decorated = self._chat_function_factory()
-        async for output in chat_func_decorated(input_data):
+        # Conversation turns run in their own task, so this only affects this turn
+        request_priority.set(priority_for(input_data.metadata))
+        async for output in self._output_pipeline.process(
+            self._tap_text_deltas(self._chat_with_memory(input_data))
+        ):
             yield output
+        self._memory_policy.maintain(self._memory, self._summarize)
+
+    async def _tap_text_deltas(
+        self, token_stream: AsyncIterator[Union[str, Dict[str, Any]]]
+    ) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """Copy raw text tokens to the text delta stream of the turn, if any."""
+        sink = text_delta_sink.get()
+        async for item in token_stream:
+            if sink is not None and isinstance(item, str):
+                sink.push(item)
+            yield item
+
+    def _get_system_prompt(self, tool_prompt: str = "") -> str:
+        """
+        Return the system prompt for this turn. The parts that change least come
+        first so that providers can cache the prefix: persona, tool prompt, then
+        the summary of older memory.
+        """
+        system = f"{self._system}\n\n{tool_prompt}" if tool_prompt else self._system
+        return self._memory_policy.system_prompt(system)
+
+    async def _summarize(self, prompt: str, transcript: str) -> str:
+        """Summarize a conversation transcript with the agent's LLM."""
+        request_priority.set(Priority.BACKGROUND)
+        summary = ""
+        async for event in self._llm.chat_completion(
+            [{"role": "user", "content": transcript}], prompt
+        ):
+            if isinstance(event, dict) and event.get("type") == "text_delta":
+                summary += event.get("text", "")
+            elif isinstance(event, dict) and event.get("type") == "error":
+                raise RuntimeError(event.get("message"))
+            elif isinstance(event, str):
+                summary += event
+        if summary.startswith("Error calling the chat endpoint"):
+            raise RuntimeError(summary)
+        return summary
+
+    @property
+    def memory_metrics(self) -> Dict[str, Any]:
+        """Prompt size and summarization lag of the last turn."""
+        return self._memory_policy.metrics.to_dict()
+
+    async def warm_up(self) -> None:
+        """Send a minimal request to the LLM to open its connection, discarding the reply."""
+        stream = self._llm.chat_completion(
+            [{"role": "user", "content": "Hi"}], "Reply with one word."
+        )
+        try:
+            async for _ in stream:
+                break
+        finally:
+            await stream.aclose()
 
     def reset_interrupt(self) -> None:
         """Reset interrupt flag."""
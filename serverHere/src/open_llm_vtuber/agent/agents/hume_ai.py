@@ -87,7 +87,8 @@ class HumeAIAgent(AgentInterface):
                 new_chat_group_id = data.get("chat_group_id")
 
                 if not resume_chat_group_id and self._current_history_uid:
-                    update_metadate(
+                    await asyncio.to_thread(
+                        update_metadate,
                         self._current_conf_uid,
                         self._current_history_uid,
                         {"resume_id": new_chat_group_id, "agent_type": self.AGENT_TYPE},
@@ -149,10 +150,9 @@ class HumeAIAgent(AgentInterface):
             self._chat_group_id = None
             logger.info("No resume_id found in metadata, will create new chat group")
 
-        # Force reconnection on next chat
-        if self._ws:
-            asyncio.create_task(self._ws.close())
-            self._connected = False
+        # Force reconnection on next chat, `connect` closes the old socket.
+        # May run on a worker thread, so nothing is scheduled on the loop here.
+        self._connected = False
 
     async def chat(self, batch_input: BatchInput) -> AsyncIterator[AudioOutput]:
         """
@@ -8,6 +8,7 @@ from ..transformers import (
     display_processor,
 )
 from ...config_manager import TTSPreprocessorConfig
+from ...utils.thread_stream import stream_from_thread
 from ..input_types import BatchInput, TextSource
 from letta_client import Letta
 
@@ -57,18 +58,18 @@ class LettaAgent(AgentInterface):
     def handle_interrupt(self, heard_response: str) -> None:
         pass
 
-    async def generator_to_async(self, gen):
-        for item in gen:
-            yield item
-
     async def chat(self, input_data: BatchInput) -> AsyncIterator[SentenceOutput]:
         messages = self._to_messages(input_data)
-        stream = self.generator_to_async(
-            self.client.agents.messages.create_stream(
+        # The Letta client is synchronous. The request and every read of the
+        # stream run on a worker thread so the event loop is never blocked.
+        # When the chat is interrupted the worker stops and closes the stream.
+        stream = stream_from_thread(
+            lambda: self.client.agents.messages.create_stream(
                 agent_id=self.id,
                 messages=messages,
                 stream_tokens=True,
-            )
+            ),
+            name="letta-stream",
         )
 
         complete_response = ""
@@ -0,0 +1,274 @@
+"""Token-budgeted sliding-window policy for agent chat memory.
+
+The most recent messages are sent to the LLM verbatim while older messages
+are folded into a rolling summary. Summaries are generated in a background
+task between turns, so building a prompt never waits on the LLM.
+"""
+
+import re
+import time
+import asyncio
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+from prompts import prompt_loader
+
+# CJK scripts are roughly one token per character, other text roughly four
+# characters per token for common BPE tokenizers.
+_CJK_PATTERN = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+)
+_CHARS_PER_TOKEN = 4
+# Role markers and separators added by chat templates
+_MESSAGE_OVERHEAD_TOKENS = 4
+# Rough cost of an image content block
+_IMAGE_TOKENS = 85
+
+SummarizeFunc = Callable[[str, str], Awaitable[str]]
+
+
+@lru_cache(maxsize=8192)
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text without a tokenizer."""
+    if not text:
+        return 0
+    cjk_chars = len(_CJK_PATTERN.findall(text))
+    other_chars = len(text) - cjk_chars
+    return cjk_chars + (other_chars + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(message: Dict[str, Any]) -> int:
+    """Estimate the number of tokens of a chat message."""
+    content = message.get("content")
+    tokens = _MESSAGE_OVERHEAD_TOKENS
+    if isinstance(content, str):
+        tokens += estimate_tokens(content)
+    elif isinstance(content, list):
+        for item in content:
+            if item.get("type") == "text":
+                tokens += estimate_tokens(item.get("text", ""))
+            else:
+                tokens += _IMAGE_TOKENS
+    return tokens
+
+
+@dataclass
+class MemoryMetrics:
+    """Metrics about the prompt size and the summarization backlog."""
+
+    # Estimated tokens of the last prompt (system + history + new input)
+    prompt_tokens: int = 0
+    # Messages of the last prompt taken verbatim from memory
+    window_messages: int = 0
+    # Messages over budget that are waiting to be folded into the summary
+    pending_summary_messages: int = 0
+    # Seconds since memory went over budget without being summarized
+    summary_lag_seconds: float = 0.0
+    # Duration of the last summarization call
+    last_summary_seconds: float = 0.0
+    # Total messages folded into the summary
+    summarized_messages: int = 0
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for logging and JSON serialization"""
+        return asdict(self)
+
+
+class MemoryPolicy:
+    """Keeps the history sent to the LLM within a token budget."""
+
+    def __init__(
+        self,
+        token_budget: int = 6000,
+        summarize: bool = True,
+        min_recent_messages: int = 2,
+    ):
+        """
+        Args:
+            token_budget: Token budget for the history part of the prompt. 0 disables the policy.
+            summarize: Fold messages over budget into a rolling summary. If False they are dropped.
+            min_recent_messages: Messages that are always kept verbatim, even over budget.
+        """
+        self.token_budget = token_budget
+        self.summarize = summarize
+        self.min_recent_messages = min_recent_messages
+        self.summary = ""
+        self.metrics = MemoryMetrics()
+        self._summary_task: Optional[asyncio.Task] = None
+        self._over_budget_since: Optional[float] = None
+        self._summary_prompt: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.token_budget > 0
+
+    def reset(self) -> None:
+        """Forget the summary, e.g. when memory is replaced by another history."""
+        if self._summary_task and not self._summary_task.done():
+            # Memory may be replaced from a worker thread, see set_memory_from_history
+            task = self._summary_task
+            task.get_loop().call_soon_threadsafe(task.cancel)
+        self._summary_task = None
+        self.summary = ""
+        self._over_budget_since = None
+        self.metrics = MemoryMetrics()
+
+    def covers(self, messages: List[Dict[str, Any]]) -> bool:
+        """
+        Whether the newest messages of a history already fill the budget, so
+        that older messages would never be sent and need not be loaded.
+        """
+        if not self.enabled:
+            return False
+        tokens = sum(estimate_message_tokens(m) for m in messages)
+        return tokens >= self.token_budget and len(messages) >= self.min_recent_messages
+
+    def system_prompt(self, system: str) -> str:
+        """Return the system prompt with the rolling summary appended."""
+        if not self.summary:
+            return system
+        return f"{system}\n\nSummary of the earlier conversation:\n{self.summary}"
+
+    def window(self, memory: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Return the most recent messages of memory that fit in the budget.
+        This runs on every turn and only walks back from the end of memory.
+        """
+        if not self.enabled:
+            return memory.copy()
+
+        budget = self.token_budget - estimate_tokens(self.summary)
+        used = 0
+        start = len(memory)
+        while start > 0:
+            tokens = estimate_message_tokens(memory[start - 1])
+            kept = len(memory) - start
+            if used + tokens > budget and kept >= self.min_recent_messages:
+                break
+            used += tokens
+            start -= 1
+
+        if start > 0:
+            if self._over_budget_since is None:
+                self._over_budget_since = time.monotonic()
+        else:
+            self._over_budget_since = None
+        self.metrics.pending_summary_messages = start
+        self.metrics.summary_lag_seconds = (
+            time.monotonic() - self._over_budget_since
+            if self._over_budget_since is not None
+            else 0.0
+        )
+        return memory[start:]
+
+    def record_prompt(
+        self,
+        system: str,
+        window: List[Dict[str, Any]],
+        new_messages: List[Dict[str, Any]],
+    ) -> None:
+        """Record the estimated size of the prompt sent this turn."""
+        self.metrics.window_messages = len(window)
+        self.metrics.prompt_tokens = (
+            estimate_tokens(system)
+            + sum(estimate_message_tokens(m) for m in window)
+            + sum(estimate_message_tokens(m) for m in new_messages)
+        )
+        logger.debug(f"Memory metrics: {self.metrics.to_dict()}")
+
+    def _overflow_count(self, memory: List[Dict[str, Any]]) -> int:
+        """
+        Number of oldest messages to fold so that memory gets back to half of
+        the budget. Folding down to half instead of exactly to the budget means
+        summarization runs every few turns rather than every turn.
+        """
+        total = estimate_tokens(self.summary) + sum(
+            estimate_message_tokens(m) for m in memory
+        )
+        if total <= self.token_budget:
+            return 0
+
+        target = self.token_budget // 2
+        count = 0
+        max_count = max(len(memory) - self.min_recent_messages, 0)
+        while total > target and count < max_count:
+            total -= estimate_message_tokens(memory[count])
+            count += 1
+        return count
+
+    def maintain(
+        self, memory: List[Dict[str, Any]], summarize_func: SummarizeFunc
+    ) -> None:
+        """
+        Shrink memory after a turn. Messages over budget are folded into the
+        summary by a background task, or dropped if summarization is disabled.
+        Returns immediately.
+        """
+        if not self.enabled:
+            return
+        if self._summary_task and not self._summary_task.done():
+            return
+
+        count = self._overflow_count(memory)
+        if count == 0:
+            return
+
+        if not self.summarize:
+            del memory[:count]
+            self._over_budget_since = None
+            return
+
+        folded = memory[:count]
+        self._summary_task = asyncio.create_task(
+            self._fold_into_summary(memory, folded, summarize_func)
+        )
+
+    async def _fold_into_summary(
+        self,
+        memory: List[Dict[str, Any]],
+        folded: List[Dict[str, Any]],
+        summarize_func: SummarizeFunc,
+    ) -> None:
+        """Summarize the folded messages and remove them from memory."""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in folded)
+        if self.summary:
+            transcript = f"Previous summary:\n{self.summary}\n\nConversation:\n{transcript}"
+
+        start = time.perf_counter()
+        try:
+            summary = await summarize_func(self._get_summary_prompt(), transcript)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Memory summarization failed: {e}")
+            return
+
+        if not summary:
+            logger.warning("Memory summarization returned nothing. Keeping messages.")
+            return
+
+        # Memory may have been replaced or rewritten while the summary was generated
+        if len(memory) < len(folded) or any(
+            a is not b for a, b in zip(memory, folded)
+        ):
+            logger.debug("Memory changed during summarization. Discarding summary.")
+            return
+
+        del memory[: len(folded)]
+        self.summary = summary.strip()
+        self._over_budget_since = None
+        self.metrics.pending_summary_messages = 0
+        self.metrics.summary_lag_seconds = 0.0
+        self.metrics.last_summary_seconds = time.perf_counter() - start
+        self.metrics.summarized_messages += len(folded)
+        logger.info(
+            f"Folded {len(folded)} messages into memory summary "
+            f"in {self.metrics.last_summary_seconds:.2f}s"
+        )
+
+    def _get_summary_prompt(self) -> str:
+        if self._summary_prompt is None:
+            self._summary_prompt = prompt_loader.load_util("memory_summary_prompt")
+        return self._summary_prompt
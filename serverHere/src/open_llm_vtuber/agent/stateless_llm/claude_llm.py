@@ -10,6 +10,8 @@ from loguru import logger
 from anthropic import AsyncAnthropic, NOT_GIVEN
 
 from .stateless_llm_interface import StatelessLLMInterface
+from .prompt_cache import CACHE_CONTROL, PromptCacheStats, add_history_breakpoints
+from .http_transport import get_http_client
 
 
 class AsyncLLM(StatelessLLMInterface):
@@ -19,6 +21,7 @@ class AsyncLLM(StatelessLLMInterface):
         base_url: str = None,
         llm_api_key: str = None,
         system: str = None,
+        prompt_caching: bool = True,
     ):
         """
         Initialize Claude LLM.
@@ -28,13 +31,18 @@ class AsyncLLM(StatelessLLMInterface):
             base_url (str): Base URL for Claude API
             llm_api_key (str): Claude API key
             system (str): System prompt
+            prompt_caching (bool): Place cache breakpoints on the system prompt and history
         """
         self.model = model
         self.system = system
+        self.prompt_caching = prompt_caching
+        self.cache_stats = PromptCacheStats()
 
         # Initialize Claude client
         self.client = AsyncAnthropic(
-            api_key=llm_api_key, base_url=base_url if base_url else None
+            api_key=llm_api_key,
+            base_url=base_url if base_url else None,
+            http_client=get_http_client(base_url or "https://api.anthropic.com"),
         )
 
         logger.info(f"Initialized Claude AsyncLLM with model: {self.model}")
@@ -116,12 +124,26 @@ class AsyncLLM(StatelessLLMInterface):
                 if msg["role"] != "system"
             ]
 
+            system_prompt = system if system else (self.system if self.system else "")
+            if self.prompt_caching:
+                # Tools, system prompt and history form a stable prefix, so
+                # cache them instead of reprocessing them on every turn.
+                converted_messages = add_history_breakpoints(converted_messages)
+                if system_prompt:
+                    system_prompt = [
+                        {
+                            "type": "text",
+                            "text": system_prompt,
+                            "cache_control": CACHE_CONTROL,
+                        }
+                    ]
+
             logger.debug(f"Sending messages to Claude API: {converted_messages}")
             logger.debug(f"Tools provided: {tools}")
 
             async with self.client.messages.stream(
                 messages=converted_messages,
-                system=system if system else (self.system if self.system else ""),
+                system=system_prompt,
                 model=self.model,
                 max_tokens=1024,
                 tools=tools if tools else NOT_GIVEN,
@@ -132,6 +154,14 @@ class AsyncLLM(StatelessLLMInterface):
                 async for event in stream:
                     if event.type == "message_start":
                         logger.debug("Stream: message_start")
+                        usage = event.message.usage
+                        self.cache_stats.record(
+                            self.model,
+                            cache_read=getattr(usage, "cache_read_input_tokens", 0) or 0,
+                            cache_write=getattr(usage, "cache_creation_input_tokens", 0)
+                            or 0,
+                            uncached=usage.input_tokens or 0,
+                        )
                         yield {
                             "type": "message_start",
                             "data": event.message.model_dump(exclude_none=True),
@@ -0,0 +1,107 @@
+"""Shared HTTP connection pools for LLM clients.
+
+All LLM clients that talk to the same origin share one `httpx.AsyncClient`,
+so connections opened by one character or session are reused by the others
+and survive config switches. While an origin is idle, its connections are
+kept warm with a cheap HEAD request, so the first request of a turn does not
+pay for DNS, TCP and TLS setup again.
+"""
+
+import asyncio
+import threading
+import time
+from importlib.util import find_spec
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+# Ping idle origins this often, below the usual 60s server keep-alive timeout
+KEEP_WARM_INTERVAL = 30.0
+# Stop pinging origins that have not been used for this long
+KEEP_WARM_MAX_IDLE = 30 * 60.0
+
+_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=120.0
+)
+_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+_HTTP2_AVAILABLE = find_spec("h2") is not None
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_last_used: Dict[str, float] = {}
+_lock = threading.Lock()
+_keep_warm_task: Optional[asyncio.Task] = None
+
+
+def _origin(base_url: str) -> str:
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Return the shared client for the origin of a URL, creating it on first use.
+
+    HTTP/2 is used for HTTPS origins when the `h2` package is installed.
+    The client must not be closed by its users.
+    """
+    origin = _origin(base_url)
+    with _lock:
+        client = _clients.get(origin)
+        if client is None:
+
+            async def on_request(request: httpx.Request) -> None:
+                _last_used[origin] = time.monotonic()
+                _ensure_keep_warm()
+
+            client = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE and origin.startswith("https"),
+                limits=_LIMITS,
+                timeout=_TIMEOUT,
+                event_hooks={"request": [on_request]},
+            )
+            _clients[origin] = client
+            logger.debug(f"Created shared HTTP client for {origin}")
+        return client
+
+
+def _ensure_keep_warm() -> None:
+    global _keep_warm_task
+    if _keep_warm_task is None or _keep_warm_task.done():
+        _keep_warm_task = asyncio.get_running_loop().create_task(_keep_warm())
+
+
+async def _keep_warm() -> None:
+    """Ping origins that are idle but were used recently."""
+    while True:
+        await asyncio.sleep(KEEP_WARM_INTERVAL)
+        now = time.monotonic()
+        for origin, client in list(_clients.items()):
+            last_used = _last_used.get(origin)
+            if last_used is None:
+                continue
+            idle = now - last_used
+            if idle < KEEP_WARM_INTERVAL or idle > KEEP_WARM_MAX_IDLE:
+                continue
+            try:
+                # Any response keeps the connection open, errors included
+                await client.head(origin, timeout=5.0)
+            except Exception as e:
+                logger.debug(f"Keep-warm ping to {origin} failed: {e}")
+            # The ping does not count as use
+            _last_used[origin] = last_used
+
+
+async def close_http_clients() -> None:
+    """Close all shared clients, e.g. at server shutdown."""
+    global _keep_warm_task
+    if _keep_warm_task and not _keep_warm_task.done():
+        _keep_warm_task.cancel()
+    _keep_warm_task = None
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _last_used.clear()
+    for client in clients:
+        await client.aclose()
@@ -2,34 +2,57 @@
 This class provides a stateless interface to llama.cpp for language generation.
 """
 
+import copy
+import uuid
 import asyncio
 from typing import AsyncIterator, List, Dict, Any
-from llama_cpp import Llama
 from loguru import logger
 
 from .stateless_llm_interface import StatelessLLMInterface
+from .llama_cpp_manager import LlamaCppModelManager
+from ...utils.thread_stream import stream_from_thread
 
 
 class LLM(StatelessLLMInterface):
     def __init__(
         self,
         model_path: str,
+        state_cache_mb: int = 1024,
         **kwargs,
     ):
         """
         Initializes a stateless instance of the LLM class using llama.cpp.
+        The model is loaded once per model path and shared with other instances.
 
         Parameters:
         - model_path (str): Path to the GGUF model file
+        - state_cache_mb (int): Memory cap for per-session KV snapshots, in MB
         - **kwargs: Additional arguments passed to Llama constructor
         """
         logger.info(f"Initializing llama cpp with model path: {model_path}")
         self.model_path = model_path
         try:
-            self.llm = Llama(model_path=model_path, **kwargs)
+            self._manager = LlamaCppModelManager.get(
+                model_path, state_cache_mb=state_cache_mb, **kwargs
+            )
         except Exception as e:
             logger.critical(f"Failed to initialize Llama model: {e}")
             raise
+        self.llm = self._manager.llm
+        self._session_id = str(uuid.uuid4())
+
+    def create_session(self) -> "LLM":
+        """
+        Return an instance for a new client session. It shares the model and
+        gets its own KV snapshot, so sessions don't evict each other's cache.
+        """
+        session = copy.copy(self)
+        session._session_id = str(uuid.uuid4())
+        return session
+
+    async def release_session(self) -> None:
+        """Drop the KV snapshot of this session."""
+        await asyncio.to_thread(self._manager.release_session, self._session_id)
 
     async def chat_completion(
         self, messages: List[Dict[str, Any]], system: str = None
@@ -55,17 +78,19 @@ class LLM(StatelessLLMInterface):
                     *messages,
                 ]
 
-            # Create chat completion in a separate thread to avoid blocking
-            chat_completion = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.llm.create_chat_completion(
-                    messages=messages_with_system,
-                    stream=True,
-                ),
+            # Generate on a dedicated thread. The stream returned by llama.cpp
+            # is lazy, so iterating it on the event loop would block the loop
+            # for every token. Closing this generator (e.g. on interrupt) stops
+            # the generation after the current token. Sessions wait for the
+            # model in turn.
+            chat_completion = stream_from_thread(
+                lambda: self._manager.generate(self._session_id, messages_with_system),
+                name="llama-cpp-generate",
+                lock=self._manager.turn(self._session_id),
             )
 
             # Process chunks
-            for chunk in chat_completion:
+            async for chunk in chat_completion:
                 if chunk.get("choices") and chunk["choices"][0].get("delta"):
                     content = chunk["choices"][0]["delta"].get("content", "")
                     if content:
@@ -0,0 +1,145 @@
+"""Shared llama.cpp model with per-session KV cache snapshots.
+
+One `Llama` model is loaded per model path and shared by every session. The
+model keeps the KV cache of the last prompt it evaluated, and llama.cpp only
+evaluates the tokens after the longest common prefix. When another session
+takes over the model, the KV cache of the previous session is saved, and it is
+restored when that session comes back, so each turn only evaluates new tokens.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from llama_cpp import Llama, LlamaState
+from loguru import logger
+
+
+class _FairScheduler:
+    """
+    Gives the model to one request at a time, taking sessions in turn.
+
+    A session that was just served goes to the back of the line, so a session
+    sending many requests cannot starve the others.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._busy = False
+
+    def _is_next(self, ticket: object) -> bool:
+        if self._busy or not self._queues:
+            return False
+        return next(iter(self._queues.values()))[0] is ticket
+
+    def _pop_next(self) -> None:
+        session_id, queue = next(iter(self._queues.items()))
+        queue.popleft()
+        del self._queues[session_id]
+        if queue:
+            self._queues[session_id] = queue
+
+    @contextmanager
+    def turn(self, session_id: str) -> Iterator[None]:
+        """Block until it is this session's turn, and hold the model until exit."""
+        ticket = object()
+        with self._cond:
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            while not self._is_next(ticket):
+                self._cond.wait()
+            self._pop_next()
+            self._busy = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+
+class LlamaCppModelManager:
+    """Owns one Llama model, its request queue and the KV snapshots of its sessions."""
+
+    _managers: Dict[str, "LlamaCppModelManager"] = {}
+    _managers_lock = threading.Lock()
+
+    @classmethod
+    def get(
+        cls, model_path: str, state_cache_mb: int = 1024, **kwargs
+    ) -> "LlamaCppModelManager":
+        """Return the manager of the model, loading the model on first use."""
+        with cls._managers_lock:
+            manager = cls._managers.get(model_path)
+            if manager is None:
+                manager = cls(model_path, state_cache_mb=state_cache_mb, **kwargs)
+                cls._managers[model_path] = manager
+            return manager
+
+    def __init__(self, model_path: str, state_cache_mb: int = 1024, **kwargs):
+        """
+        Args:
+            model_path: Path to the GGUF model file
+            state_cache_mb: Memory cap for saved KV snapshots, in MB. 0 disables snapshots.
+            **kwargs: Additional arguments passed to Llama constructor
+        """
+        self.model_path = model_path
+        self.llm = Llama(model_path=model_path, **kwargs)
+        self.state_cache_bytes = state_cache_mb * 1024 * 1024
+        self._scheduler = _FairScheduler()
+        # Only touched by the thread that holds the scheduler turn
+        self._states: "OrderedDict[str, LlamaState]" = OrderedDict()
+        self._states_bytes = 0
+        self._loaded_session: Optional[str] = None
+
+    def turn(self, session_id: str):
+        """Context manager that waits for and holds the model for a session."""
+        return self._scheduler.turn(session_id)
+
+    def _store_state(self, session_id: str, state: LlamaState) -> None:
+        """Save a snapshot, evicting the least recently used ones over the cap."""
+        size = state.llama_state_size
+        if size > self.state_cache_bytes:
+            return
+        self._states[session_id] = state
+        self._states_bytes += size
+        while self._states_bytes > self.state_cache_bytes:
+            evicted_id, evicted = self._states.popitem(last=False)
+            self._states_bytes -= evicted.llama_state_size
+            logger.debug(f"Evicted KV snapshot of session {evicted_id}")
+
+    def _pop_state(self, session_id: str) -> Optional[LlamaState]:
+        state = self._states.pop(session_id, None)
+        if state is not None:
+            self._states_bytes -= state.llama_state_size
+        return state
+
+    def _switch_to(self, session_id: str) -> None:
+        """Swap the KV cache of the loaded session for the one of this session."""
+        if self._loaded_session == session_id:
+            return
+        if self._loaded_session is not None and self.state_cache_bytes > 0:
+            self._store_state(self._loaded_session, self.llm.save_state())
+        state = self._pop_state(session_id)
+        if state is not None:
+            self.llm.load_state(state)
+            logger.debug(f"Restored KV snapshot of session {session_id}")
+        self._loaded_session = session_id
+
+    def generate(
+        self, session_id: str, messages: List[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a chat completion for a session. Blocking; call it from the
+        thread that holds `turn(session_id)`.
+        """
+        self._switch_to(session_id)
+        yield from self.llm.create_chat_completion(messages=messages, stream=True)
+
+    def release_session(self, session_id: str) -> None:
+        """Drop the snapshot of a session that has ended."""
+        with self._scheduler.turn(session_id):
+            self._pop_state(session_id)
+            if self._loaded_session == session_id:
+                self._loaded_session = None
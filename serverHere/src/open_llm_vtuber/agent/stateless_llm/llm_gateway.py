@@ -0,0 +1,375 @@
+"""Admission control in front of LLM backends.
+
+Every backend (one provider endpoint and model) gets one `LLMGateway`, shared
+by all sessions and characters that use it. The gateway limits how many
+completions run at once and how many tokens are sent per minute. Requests
+that have to wait are queued by priority: interactive voice and text turns go
+before proactive speech, which goes before live-stream messages and
+background work like memory summaries. Within a priority, sessions share the
+backend by weighted fair queuing, so one busy session cannot starve the
+others. When the queue is full, the least important requests are shed with a
+short error instead of piling up behind the backend.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .stateless_llm_interface import StatelessLLMInterface
+from ..memory_policy import estimate_message_tokens, estimate_tokens
+
+
+class Priority(IntEnum):
+    """Priority of an LLM request. Lower values are served first."""
+
+    INTERACTIVE = 0
+    PROACTIVE = 1
+    LIVE = 2
+    BACKGROUND = 3
+
+
+# Priority of the LLM requests made by the current task
+request_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "llm_request_priority", default=Priority.INTERACTIVE
+)
+
+
+def priority_for(metadata: Optional[Dict[str, Any]]) -> Priority:
+    """Map the metadata of a conversation input to a request priority."""
+    if not metadata:
+        return Priority.INTERACTIVE
+    if metadata.get("proactive_speak"):
+        return Priority.PROACTIVE
+    if metadata.get("live_input"):
+        return Priority.LIVE
+    return Priority.INTERACTIVE
+
+
+# Error message of an interactive request that was shed
+OVERLOADED_MESSAGE = (
+    "Sorry, I'm a bit overwhelmed right now. Please try again in a moment."
+)
+
+
+class LLMOverloadedError(Exception):
+    """Raised when a request is shed because the backend queue is full."""
+
+
+@dataclass
+class GatewayLimits:
+    """
+    Limits of one LLM backend.
+
+    Attributes:
+        max_concurrency: Maximum number of completions streaming at once. 0 means no limit.
+        tokens_per_minute: Maximum estimated prompt and output tokens per minute. 0 means no limit.
+        max_queue: Maximum number of waiting requests before requests are shed. 0 means no limit.
+    """
+
+    max_concurrency: int = 0
+    tokens_per_minute: int = 0
+    max_queue: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_concurrency or self.tokens_per_minute or self.max_queue)
+
+
+@dataclass
+class GatewayMetrics:
+    """Queue and admission metrics of one backend."""
+
+    active: int = 0
+    queued: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    # Moving average and maximum of the time spent waiting for admission
+    queue_wait_avg_seconds: float = 0.0
+    queue_wait_max_seconds: float = 0.0
+    queue_wait_by_priority: Dict[str, float] = field(default_factory=dict)
+    tokens_last_minute: int = 0
+
+    def record_wait(self, priority: Priority, seconds: float, alpha: float = 0.2):
+        self.admitted += 1
+        self.queue_wait_avg_seconds += alpha * (seconds - self.queue_wait_avg_seconds)
+        self.queue_wait_max_seconds = max(self.queue_wait_max_seconds, seconds)
+        previous = self.queue_wait_by_priority.get(priority.name.lower(), seconds)
+        self.queue_wait_by_priority[priority.name.lower()] = previous + alpha * (
+            seconds - previous
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for logging and JSON serialization"""
+        return asdict(self)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: Priority
+    finish_tag: float
+    sequence: int
+    session_id: str = field(compare=False)
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class LLMGateway:
+    """Concurrency, token rate and fair queuing for one LLM backend."""
+
+    _gateways: Dict[str, "LLMGateway"] = {}
+
+    @classmethod
+    def get(cls, key: str, limits: GatewayLimits) -> "LLMGateway":
+        """Return the gateway of a backend, creating it on first use."""
+        gateway = cls._gateways.get(key)
+        if gateway is None:
+            gateway = cls(key, limits)
+            cls._gateways[key] = gateway
+        elif gateway.limits != limits:
+            logger.info(f"Updating LLM gateway limits of {key}: {limits}")
+            gateway.limits = limits
+        return gateway
+
+    def __init__(self, name: str, limits: GatewayLimits):
+        self.name = name
+        self.limits = limits
+        self.metrics = GatewayMetrics()
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+        # Weighted fair queuing: each session's requests get increasing finish
+        # tags, and the waiter with the smallest tag in a priority goes next.
+        self._virtual_time = 0.0
+        self._session_finish: Dict[str, float] = {}
+        self._active = 0
+        self._token_log: Deque[Tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def _expire_tokens(self, now: float) -> None:
+        while self._token_log and now - self._token_log[0][0] >= 60:
+            self._tokens_in_window -= self._token_log.popleft()[1]
+        self.metrics.tokens_last_minute = self._tokens_in_window
+
+    def record_tokens(self, tokens: int) -> None:
+        """Count tokens against the tokens-per-minute limit."""
+        if tokens <= 0:
+            return
+        self._token_log.append((time.monotonic(), tokens))
+        self._tokens_in_window += tokens
+        self.metrics.tokens_last_minute = self._tokens_in_window
+
+    def _token_delay(self, tokens: int) -> float:
+        """Seconds until a request of this size fits in the token budget."""
+        limit = self.limits.tokens_per_minute
+        if not limit:
+            return 0.0
+        now = time.monotonic()
+        self._expire_tokens(now)
+        # A request larger than the whole budget may run alone
+        if self._tokens_in_window + tokens <= limit or not self._token_log:
+            return 0.0
+        freed = self._tokens_in_window
+        for timestamp, count in self._token_log:
+            freed -= count
+            if freed + tokens <= limit:
+                return max(timestamp + 60 - now, 0.01)
+        return 60.0
+
+    def _drop_cancelled(self) -> None:
+        """
+        Drop waiters whose request was cancelled.
+
+        A cancelled task's future is done right away, but the task only
+        removes its waiter once it runs again.
+        """
+        self._waiters = [w for w in self._waiters if not w.future.done()]
+
+    def _dispatch(self) -> None:
+        """Admit waiting requests in order while limits allow."""
+        if self._wakeup:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._drop_cancelled()
+        while self._waiters:
+            if (
+                self.limits.max_concurrency
+                and self._active >= self.limits.max_concurrency
+            ):
+                break
+            waiter = min(self._waiters)
+            delay = self._token_delay(waiter.tokens)
+            if delay > 0:
+                self._wakeup = asyncio.get_running_loop().call_later(
+                    delay, self._dispatch
+                )
+                break
+            self._waiters.remove(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.finish_tag)
+            self._active += 1
+            self.record_tokens(waiter.tokens)
+            waiter.future.set_result(True)
+        self.metrics.active = self._active
+        self.metrics.queued = len(self._waiters)
+
+    def _shed(self, incoming: _Waiter) -> None:
+        """Make room in a full queue by rejecting its least important request."""
+        worst = max(self._waiters, key=lambda w: (w.priority, w.sequence))
+        if incoming.priority >= worst.priority:
+            raise LLMOverloadedError(f"LLM backend {self.name} is overloaded")
+        self._waiters.remove(worst)
+        self.metrics.rejected += 1
+        worst.future.set_exception(
+            LLMOverloadedError(f"LLM backend {self.name} is overloaded")
+        )
+
+    async def acquire(self, session_id: str, priority: Priority, tokens: int) -> float:
+        """
+        Wait until the request may run and return the time spent waiting.
+
+        Raises:
+            LLMOverloadedError: The queue is full of requests at least as important.
+        """
+        start = time.monotonic()
+        start_tag = max(self._virtual_time, self._session_finish.get(session_id, 0.0))
+        waiter = _Waiter(
+            priority=priority,
+            finish_tag=start_tag + max(tokens, 1),
+            sequence=next(self._sequence),
+            session_id=session_id,
+            tokens=tokens,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=start,
+        )
+        self._drop_cancelled()
+        if self.limits.max_queue and len(self._waiters) >= self.limits.max_queue:
+            try:
+                self._shed(waiter)
+            except LLMOverloadedError:
+                self.metrics.rejected += 1
+                raise
+        self._session_finish[session_id] = waiter.finish_tag
+        self._waiters.append(waiter)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self.metrics.queued = len(self._waiters)
+            elif not waiter.future.cancelled() and waiter.future.exception() is None:
+                # Admitted just before the cancellation arrived
+                self.release()
+            raise
+
+        waited = time.monotonic() - start
+        self.metrics.record_wait(priority, waited)
+        if waited > 0.05:
+            logger.debug(
+                f"LLM gateway {self.name}: {priority.name.lower()} request of "
+                f"session {session_id} waited {waited:.2f}s. {self.metrics.to_dict()}"
+            )
+        return waited
+
+    def release(self) -> None:
+        """Free the slot of a finished request."""
+        self._active -= 1
+        self._dispatch()
+
+    def forget_session(self, session_id: str) -> None:
+        """Drop the fair queuing state of a session that has ended."""
+        self._session_finish.pop(session_id, None)
+
+    @asynccontextmanager
+    async def admit(
+        self, session_id: str, priority: Priority, tokens: int
+    ) -> AsyncIterator[None]:
+        """Hold a slot of the backend for the duration of the block."""
+        await self.acquire(session_id, priority, tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class GatedLLM(StatelessLLMInterface):
+    """
+    Wraps a stateless LLM so that its completions go through an `LLMGateway`.
+
+    Attributes that the wrapper does not define are read from the wrapped LLM.
+    """
+
+    _session_ids = itertools.count()
+
+    def __init__(
+        self,
+        backend: StatelessLLMInterface,
+        gateway: LLMGateway,
+        session_id: str = "default",
+    ):
+        self.backend = backend
+        self.gateway = gateway
+        self.session_id = session_id
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def create_session(self) -> "GatedLLM":
+        """Return a wrapper that queues as a separate session."""
+        backend = self.backend
+        if hasattr(backend, "create_session"):
+            backend = backend.create_session()
+        return GatedLLM(
+            backend, self.gateway, session_id=f"session-{next(self._session_ids)}"
+        )
+
+    async def release_session(self) -> None:
+        self.gateway.forget_session(self.session_id)
+        if hasattr(self.backend, "release_session"):
+            await self.backend.release_session()
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        system: str = None,
+        tools: List[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Any]:
+        """Wait for admission, then stream the completion of the wrapped LLM."""
+        priority = request_priority.get()
+        prompt_tokens = estimate_tokens(system or "") + sum(
+            estimate_message_tokens(m) for m in messages
+        )
+        kwargs = {"tools": tools} if tools is not None else {}
+
+        try:
+            await self.gateway.acquire(self.session_id, priority, prompt_tokens)
+        except LLMOverloadedError as e:
+            logger.warning(f"{e}. Dropping {priority.name.lower()} request.")
+            if priority == Priority.INTERACTIVE:
+                # Reported to the user, but not spoken or kept as a reply
+                yield {"type": "error", "message": OVERLOADED_MESSAGE}
+            return
+
+        output_chars = 0
+        try:
+            async for event in self.backend.chat_completion(messages, system, **kwargs):
+                if isinstance(event, str):
+                    output_chars += len(event)
+                elif isinstance(event, dict) and event.get("type") == "text_delta":
+                    output_chars += len(event.get("text", ""))
+                yield event
+        finally:
+            # Rough output estimate, see memory_policy.estimate_tokens
+            self.gateway.record_tokens(output_chars // 4)
+            self.gateway.release()
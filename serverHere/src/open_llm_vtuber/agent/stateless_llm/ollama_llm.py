@@ -1,7 +1,11 @@
 import atexit
+import asyncio
+import threading
+import httpx
 import requests
 from loguru import logger
 from .openai_compatible_llm import AsyncLLM
+from .http_transport import get_http_client
 
 
 class OllamaLLM(AsyncLLM):
@@ -27,29 +31,47 @@ class OllamaLLM(AsyncLLM):
             project_id=project_id,
             temperature=temperature,
         )
+        self._preload_task = None
         try:
-            # preload model
-            logger.info("Preloading model for Ollama")
-            # Send the POST request to preload model
-            logger.debug(
-                requests.post(
-                    base_url.replace("/v1", "") + "/api/chat",
-                    json={
-                        "model": model,
-                        "keep_alive": keep_alive,
-                    },
-                )
-            )
-        except requests.exceptions.ConnectionError as e:
+            # Preload on the event loop if there is one, otherwise on a thread,
+            # so creating the LLM never waits for the model to load
+            loop = asyncio.get_running_loop()
+            self._preload_task = loop.create_task(self.preload())
+        except RuntimeError:
+            threading.Thread(
+                target=lambda: asyncio.run(self.preload(shared_client=False)),
+                name="ollama-preload",
+                daemon=True,
+            ).start()
+        # If keep_alive is less than 0, register cleanup to unload the model
+        if unload_at_exit:
+            atexit.register(self.cleanup)
+
+    async def preload(self, shared_client: bool = True) -> None:
+        """
+        Load the model into Ollama's memory.
+
+        Args:
+            shared_client: Use the shared connection pool. Must be False when
+                called outside the server's event loop.
+        """
+        url = self.base_url.replace("/v1", "") + "/api/chat"
+        payload = {"model": self.model, "keep_alive": self.keep_alive}
+        logger.info("Preloading model for Ollama")
+        try:
+            if shared_client:
+                response = await get_http_client(url).post(url, json=payload, timeout=None)
+            else:
+                async with httpx.AsyncClient(timeout=None) as client:
+                    response = await client.post(url, json=payload)
+            logger.debug(f"Ollama preload: {response}")
+        except httpx.ConnectError as e:
             logger.error(f"Failed to preload model: {e}")
             logger.critical(
                 "Fail to connect to Ollama backend. Is Ollama server running? Try running `ollama list` to start the server and try again.\nThe AI will repeat 'Error connecting chat endpoint' until the server is running."
             )
         except Exception as e:
             logger.error(f"Failed to preload model: {e}")
-        # If keep_alive is less than 0, register cleanup to unload the model
-        if unload_at_exit:
-            atexit.register(self.cleanup)
 
     def __del__(self):
         """Destructor to unload the model"""
@@ -18,6 +18,8 @@ from openai.types.chat.chat_completion_chunk import ChoiceDeltaToolCall
 from loguru import logger
 
 from .stateless_llm_interface import StatelessLLMInterface
+from .prompt_cache import PromptCacheStats
+from .http_transport import get_http_client
 from ...mcpp.types import ToolCallObject
 
 
@@ -50,13 +52,43 @@ class AsyncLLM(StatelessLLMInterface):
             organization=organization_id,
             project=project_id,
             api_key=llm_api_key,
+            http_client=get_http_client(base_url),
         )
         self.support_tools = True
+        self.cache_stats = PromptCacheStats()
 
         logger.info(
             f"Initialized AsyncLLM with the parameters: {self.base_url}, {self.model}"
         )
 
+    def _record_cache_usage(self, chunk: ChatCompletionChunk) -> None:
+        """
+        Record prompt cache usage if the server reports it. Servers name the
+        cached token count differently: OpenAI and vLLM use
+        `prompt_tokens_details.cached_tokens`, DeepSeek uses
+        `prompt_cache_hit_tokens` and llama.cpp reports `timings.cache_n`.
+        """
+        extra = chunk.model_extra or {}
+        usage = chunk.usage
+        timings = extra.get("timings")
+        if usage:
+            prompt_tokens = usage.prompt_tokens or 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = (details.cached_tokens if details else None) or (
+                usage.model_extra or {}
+            ).get("prompt_cache_hit_tokens", 0)
+        elif isinstance(timings, dict) and "cache_n" in timings:
+            cached = timings.get("cache_n", 0)
+            prompt_tokens = cached + timings.get("prompt_n", 0)
+        else:
+            return
+        self.cache_stats.record(
+            self.model,
+            cache_read=cached or 0,
+            cache_write=0,
+            uncached=prompt_tokens - (cached or 0),
+        )
+
     async def chat_completion(
         self,
         messages: List[Dict[str, Any]],
@@ -111,6 +143,7 @@ class AsyncLLM(StatelessLLMInterface):
             )
 
             async for chunk in stream:
+                self._record_cache_usage(chunk)
                 # Guard against chunks with missing choices field (e.g., from OpenWebUI)
                 if not chunk.choices:
                     continue
@@ -0,0 +1,81 @@
+"""Helpers for provider-side prompt prefix caching."""
+
+import copy
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List
+
+from loguru import logger
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+@dataclass
+class PromptCacheStats:
+    """Prompt token counts reported by the API, split by cache status."""
+
+    requests: int = 0
+    # Prompt tokens read from the cache
+    cache_read_tokens: int = 0
+    # Prompt tokens written to the cache (Claude only)
+    cache_write_tokens: int = 0
+    # Prompt tokens processed without the cache
+    uncached_tokens: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.cache_read_tokens + self.cache_write_tokens + self.uncached_tokens
+        return self.cache_read_tokens / total if total else 0.0
+
+    def record(
+        self, model: str, cache_read: int, cache_write: int, uncached: int
+    ) -> None:
+        """Add the usage of one request and log it."""
+        self.requests += 1
+        self.cache_read_tokens += cache_read
+        self.cache_write_tokens += cache_write
+        self.uncached_tokens += uncached
+        logger.debug(
+            f"Prompt cache ({model}): read {cache_read}, written {cache_write}, "
+            f"uncached {uncached} tokens. Session hit ratio: {self.hit_ratio:.0%}"
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for logging and JSON serialization"""
+        return {**asdict(self), "hit_ratio": self.hit_ratio}
+
+
+def with_cache_breakpoint(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a Claude message with cache_control on its last block."""
+    message = copy.copy(message)
+    content = message.get("content")
+    if isinstance(content, str):
+        message["content"] = [
+            {"type": "text", "text": content, "cache_control": CACHE_CONTROL}
+        ]
+    elif isinstance(content, list) and content:
+        content = list(content)
+        content[-1] = {**content[-1], "cache_control": CACHE_CONTROL}
+        message["content"] = content
+    return message
+
+
+def add_history_breakpoints(
+    messages: List[Dict[str, Any]], count: int = 2
+) -> List[Dict[str, Any]]:
+    """
+    Put cache breakpoints on the last `count` user messages.
+
+    The breakpoint on the newest message writes the whole prompt to the cache,
+    the one on the previous user message reads what the last turn wrote.
+    Together with the system prompt this stays within Claude's limit of four
+    breakpoints. The input list and its messages are not modified.
+    """
+    messages = list(messages)
+    marked = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if marked >= count:
+            break
+        if messages[i].get("role") == "user" and messages[i].get("content"):
+            messages[i] = with_cache_breakpoint(messages[i])
+            marked += 1
+    return messages
@@ -0,0 +1,339 @@
+"""Composite LLM that routes each request over several backends.
+
+Backends are tried in the configured order, skipping those that recently
+failed and moving those that are much slower than the others to the back.
+If a backend returns an error before its first token, the request fails over
+to the next one. With hedging enabled, if no token has arrived after the
+hedge delay, the same request is also sent to the next backend, and whichever
+answers first is streamed while the other is cancelled.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from .stateless_llm_interface import StatelessLLMInterface
+
+# A backend is marked down for a while after this many failures in a row
+_MAX_CONSECUTIVE_FAILURES = 3
+_DOWN_SECONDS = 30.0
+# A backend whose average TTFT is this many times the fastest one is tried last
+_SLOW_FACTOR = 2.0
+
+
+def _is_error(event: Any) -> bool:
+    """Whether the first content event of a stream is an error reported in-band."""
+    if isinstance(event, str):
+        return event.startswith("Error calling the chat endpoint")
+    return isinstance(event, dict) and event.get("type") == "error"
+
+
+def _is_content(event: Any) -> bool:
+    """
+    Whether an event shows that the backend is answering: a token, a tool
+    call or an error. Bookkeeping events such as Claude's message_start come
+    before any token is generated, so they don't count as the first token.
+    """
+    if isinstance(event, dict):
+        return event.get("type") in ("text_delta", "tool_use_start", "error")
+    return True
+
+
+@dataclass
+class BackendStats:
+    """Health and time-to-first-token statistics of one backend."""
+
+    name: str
+    requests: int = 0
+    failures: int = 0
+    hedges_won: int = 0
+    consecutive_failures: int = 0
+    down_until: float = 0.0
+    # Moving average of the time to first token, in seconds
+    ttft_avg: Optional[float] = None
+    ttft_samples: Deque[float] = field(default_factory=lambda: deque(maxlen=500))
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def ttft_percentile(self, percentile: float) -> Optional[float]:
+        if not self.ttft_samples:
+            return None
+        samples = sorted(self.ttft_samples)
+        index = min(int(len(samples) * percentile / 100), len(samples) - 1)
+        return samples[index]
+
+    def record_success(self, ttft: float, alpha: float = 0.2) -> None:
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.ttft_samples.append(ttft)
+        self.ttft_avg = (
+            ttft if self.ttft_avg is None else self.ttft_avg + alpha * (ttft - self.ttft_avg)
+        )
+
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= _MAX_CONSECUTIVE_FAILURES:
+            self.down_until = time.monotonic() + _DOWN_SECONDS
+            logger.warning(
+                f"LLM backend {self.name} failed {self.consecutive_failures} times "
+                f"in a row. Skipping it for {_DOWN_SECONDS:.0f}s."
+            )
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for logging and JSON serialization"""
+        return {
+            "name": self.name,
+            "requests": self.requests,
+            "failures": self.failures,
+            "hedges_won": self.hedges_won,
+            "healthy": self.healthy,
+            "ttft_avg": self.ttft_avg,
+            "ttft_p50": self.ttft_percentile(50),
+            "ttft_p99": self.ttft_percentile(99),
+        }
+
+
+_END = object()
+
+
+@dataclass
+class _Attempt:
+    """One backend streaming a request on its own task."""
+
+    index: int
+    started_at: float
+    hedged: bool = False
+    # Resolves with the first content event, an exception, or _END for a
+    # stream without content
+    first_event: asyncio.Future = None
+    # Events before the first content event, replayed if the attempt wins
+    preamble: List[Any] = field(default_factory=list)
+    # Events after the first one, then _END or an exception
+    rest: asyncio.Queue = field(default_factory=asyncio.Queue)
+    task: asyncio.Task = None
+
+
+class RoutedLLM(StatelessLLMInterface):
+    """Streams each completion from the best available of several backends."""
+
+    def __init__(
+        self,
+        backends: List[StatelessLLMInterface],
+        names: List[str],
+        hedge_delay_ms: int = 0,
+        stats: Optional[List[BackendStats]] = None,
+    ):
+        """
+        Args:
+            backends: LLMs in order of preference
+            names: Names of the backends, used in logs and metrics
+            hedge_delay_ms: Send the request to the next backend too if no token
+                arrived after this many milliseconds. 0 disables hedging.
+            stats: Statistics to share with another RoutedLLM over the same backends
+        """
+        self.backends = backends
+        self.hedge_delay = hedge_delay_ms / 1000
+        self.stats = stats or [BackendStats(name) for name in names]
+
+    @property
+    def backend(self) -> StatelessLLMInterface:
+        """The preferred backend. Tool formats are chosen from its type."""
+        primary = self.backends[0]
+        return getattr(primary, "backend", primary)
+
+    def create_session(self) -> "RoutedLLM":
+        backends = [
+            b.create_session() if hasattr(b, "create_session") else b
+            for b in self.backends
+        ]
+        return RoutedLLM(
+            backends,
+            [s.name for s in self.stats],
+            int(self.hedge_delay * 1000),
+            stats=self.stats,
+        )
+
+    async def release_session(self) -> None:
+        for backend in self.backends:
+            if hasattr(backend, "release_session"):
+                await backend.release_session()
+
+    @property
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Health and TTFT statistics of every backend."""
+        return [s.to_dict() for s in self.stats]
+
+    def _candidates(self, tools: Any) -> List[int]:
+        """Backend indexes in the order they should be tried."""
+        indexes = list(range(len(self.backends)))
+        if tools is not None:
+            # Tools are formatted for the type of the preferred backend
+            primary_type = type(self.backend)
+            indexes = [
+                i
+                for i in indexes
+                if type(getattr(self.backends[i], "backend", self.backends[i]))
+                is primary_type
+            ]
+        measured = [
+            self.stats[i].ttft_avg
+            for i in indexes
+            if self.stats[i].healthy and self.stats[i].ttft_avg is not None
+        ]
+        fastest = min(measured) if measured else None
+
+        def rank(i: int):
+            stats = self.stats[i]
+            slow = (
+                fastest is not None
+                and stats.ttft_avg is not None
+                and stats.ttft_avg > fastest * _SLOW_FACTOR
+            )
+            return (not stats.healthy, slow, i)
+
+        return sorted(indexes, key=rank)
+
+    async def _pump(self, attempt: _Attempt, stream: AsyncIterator[Any]) -> None:
+        """Read a backend stream on the attempt's own task."""
+        try:
+            async for event in stream:
+                if attempt.first_event.done():
+                    attempt.rest.put_nowait(event)
+                elif _is_content(event):
+                    attempt.first_event.set_result(event)
+                else:
+                    attempt.preamble.append(event)
+        except Exception as e:
+            if not attempt.first_event.done():
+                attempt.first_event.set_exception(e)
+            else:
+                attempt.rest.put_nowait(e)
+        finally:
+            if not attempt.first_event.done():
+                attempt.first_event.set_result(_END)
+            attempt.rest.put_nowait(_END)
+            await stream.aclose()
+
+    @staticmethod
+    async def _cancel(attempt: _Attempt) -> None:
+        """Stop an attempt, which closes its stream."""
+        attempt.task.cancel()
+        await asyncio.gather(attempt.task, return_exceptions=True)
+        if not attempt.first_event.done():
+            attempt.first_event.cancel()
+        elif not attempt.first_event.cancelled():
+            # Mark a pending exception as retrieved
+            attempt.first_event.exception()
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        system: str = None,
+        tools: List[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Any]:
+        """Stream the completion of the first backend that answers."""
+        candidates = self._candidates(tools)
+        kwargs = {"tools": tools} if tools is not None else {}
+        loop = asyncio.get_running_loop()
+        attempts: List[_Attempt] = []
+        failed: List[_Attempt] = []
+        winner: Optional[_Attempt] = None
+        first_event = None
+        last_error = None
+
+        def start(hedged: bool = False) -> None:
+            index = candidates[len(attempts)]
+            attempt = _Attempt(
+                index=index,
+                started_at=time.monotonic(),
+                hedged=hedged,
+                first_event=loop.create_future(),
+            )
+            stream = self.backends[index].chat_completion(messages, system, **kwargs)
+            attempt.task = asyncio.create_task(self._pump(attempt, stream))
+            attempts.append(attempt)
+
+        try:
+            start()
+            while winner is None:
+                running = [a for a in attempts if a not in failed]
+                more = len(attempts) < len(candidates)
+                if not running:
+                    if not more:
+                        break
+                    start()
+                    continue
+
+                can_hedge = self.hedge_delay > 0 and more
+                done, _ = await asyncio.wait(
+                    [a.first_event for a in running],
+                    timeout=self.hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.info(
+                        f"No token from {self.stats[running[-1].index].name} after "
+                        f"{self.hedge_delay * 1000:.0f}ms. Hedging the request."
+                    )
+                    start(hedged=True)
+                    continue
+
+                for attempt in running:
+                    if attempt.first_event not in done:
+                        continue
+                    stats = self.stats[attempt.index]
+                    try:
+                        event = attempt.first_event.result()
+                    except Exception as e:
+                        logger.warning(f"LLM backend {stats.name} failed: {e}")
+                        event = _END
+                    if event is _END or _is_error(event):
+                        if event is not _END:
+                            last_error = event
+                        stats.record_failure()
+                        failed.append(attempt)
+                        logger.warning(f"Failing over from LLM backend {stats.name}")
+                        continue
+                    winner, first_event = attempt, event
+                    ttft = time.monotonic() - attempt.started_at
+                    stats.record_success(ttft)
+                    if attempt.hedged:
+                        stats.hedges_won += 1
+                    logger.debug(
+                        f"TTFT of {stats.name}: {ttft:.3f}s. Backends: {self.metrics}"
+                    )
+                    break
+        finally:
+            for attempt in attempts:
+                if attempt is not winner:
+                    await self._cancel(attempt)
+
+        if winner is None:
+            logger.error("All LLM backends failed.")
+            yield last_error or (
+                "Error calling the chat endpoint: All LLM backends failed. "
+                "See the logs for details."
+            )
+            return
+
+        try:
+            for event in winner.preamble:
+                yield event
+            yield first_event
+            while True:
+                event = await winner.rest.get()
+                if event is _END:
+                    break
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            await self._cancel(winner)
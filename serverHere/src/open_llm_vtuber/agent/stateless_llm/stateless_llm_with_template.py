@@ -4,13 +4,14 @@ compatible endpoints for language generation where the language model is not
 trained using a ChatML format.
 """
 
-import requests
 import json
+from functools import lru_cache
 from jinja2 import Template
 from loguru import logger
 from typing import AsyncIterator, List, Dict, Any
 
 from .stateless_llm_interface import StatelessLLMInterface
+from .http_transport import get_http_client
 
 
 TEMPLATES = {
@@ -83,6 +84,12 @@ TEMPLATES = {
 }
 
 
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    """Compile a chat template once and reuse it."""
+    return Template(TEMPLATES[name]["template"])
+
+
 class AsyncLLMWithTemplate(StatelessLLMInterface):
     def __init__(
         self,
@@ -106,14 +113,18 @@ class AsyncLLMWithTemplate(StatelessLLMInterface):
         - template (str, optional): The Jinja template to use. Defaults to "LLAMA3".
         - temperature (float, optional): What sampling temperature to use, between 0 and 2. Defaults to 1.0.
         """
+        template = template or "CHATML"
+        self.base_url = base_url
         self.completion_url = base_url
         self.model = model
         self.temperature = temperature
-        self.template = Template(TEMPLATES[template]["template"])
+        self.template = get_template(template)
         self.eot_token = TEMPLATES[template]["eot_token"]
         self.prompt_headers = {
             "Authorization": llm_api_key or "Bearer your_api_key_here"
         }
+        # Pooled client, so connections are reused across turns
+        self.client = get_http_client(base_url)
         logger.info(
             f"Initialized AsyncLLM with the parameters: {self.completion_url} ({template})"
         )
@@ -138,7 +149,6 @@ class AsyncLLMWithTemplate(StatelessLLMInterface):
         """
         logger.debug(f"Messages: {messages}")
         bos_token = "<|begin_of_text|>"
-        stream = None
         try:
             # If system prompt is provided, add it to the messages
             messages_with_system: List[Dict[str, Any]] = messages
@@ -157,17 +167,23 @@ class AsyncLLMWithTemplate(StatelessLLMInterface):
                 "temperature": self.temperature,
                 "prompt": prompt,
             }
-            with requests.post(
-                self.completion_url, headers=self.prompt_headers, json=data, stream=True
+            # Leaving the stream context (end of answer, interrupt or error)
+            # closes the response, so the server stops generating.
+            async with self.client.stream(
+                "POST", self.completion_url, headers=self.prompt_headers, json=data
             ) as response:
-                for line in response.iter_lines():
-                    if line:
-                        line = self._clean_raw_bytes(line)
-                        next_token = self._process_line(line)
-                        if next_token:
-                            if next_token == self.eot_token:
-                                break
-                            yield next_token
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    line = self._clean_raw_line(line)
+                    if line is None:
+                        break
+                    next_token = self._process_line(line)
+                    if next_token:
+                        if next_token == self.eot_token:
+                            break
+                        yield next_token
         except Exception as e:
             logger.error(f"LLM API WITH TEMPLATE: Error occurred: {e}")
             logger.info(f"Base URL: {self.base_url}")
@@ -175,21 +191,18 @@ class AsyncLLMWithTemplate(StatelessLLMInterface):
             logger.info(f"Messages: {messages}")
             logger.info(f"temperature: {self.temperature}")
             yield "Error calling the chat endpoint: Error occurred while generating response. See the logs for details."
-        finally:
-            # make sure the stream is properly closed
-            # so when interrupted, no more tokens will being generated.
-            if stream:
-                logger.debug("Chat completion finished.")
-                await stream.close()
-                logger.debug("Stream closed.")
-
-    def _clean_raw_bytes(self, line):
-        line = line.decode("utf-8")
+
+    def _clean_raw_line(self, line: str):
+        """Parse one SSE line. Returns None at the end of the stream."""
         line = line.removeprefix("data: ")
-        line = json.loads(line)
-        return line
+        if line.strip() == "[DONE]":
+            return None
+        return json.loads(line)
 
     def _process_line(self, line):
         if not (("stop" in line) and (line["stop"])):
-            token = line["content"]
-            return token
+            if "content" in line:
+                return line["content"]
+            # OpenAI-style /v1/completions chunks
+            choices = line.get("choices") or [{}]
+            return choices[0].get("text")
@@ -9,6 +9,7 @@ from .stateless_llm.stateless_llm_with_template import (
 from .stateless_llm.openai_compatible_llm import AsyncLLM as OpenAICompatibleLLM
 from .stateless_llm.ollama_llm import OllamaLLM
 from .stateless_llm.claude_llm import AsyncLLM as ClaudeLLM
+from .stateless_llm.llm_gateway import GatedLLM, GatewayLimits, LLMGateway
 
 
 class LLMFactory:
@@ -21,7 +22,30 @@ class LLMFactory:
             **kwargs: Additional arguments
         """
         logger.info(f"Initializing LLM: {llm_provider}")
+        llm = LLMFactory._create_backend(llm_provider, **kwargs)
 
+        limits = GatewayLimits(
+            max_concurrency=kwargs.get("max_concurrency") or 0,
+            tokens_per_minute=kwargs.get("tokens_per_minute") or 0,
+            max_queue=kwargs.get("max_queue") or 0,
+        )
+        if not limits.enabled:
+            return llm
+        # Characters using the same endpoint and model share one gateway
+        backend_key = ":".join(
+            str(part)
+            for part in (
+                llm_provider,
+                kwargs.get("base_url") or kwargs.get("model_path"),
+                kwargs.get("model"),
+            )
+            if part
+        )
+        return GatedLLM(llm, LLMGateway.get(backend_key, limits))
+
+    @staticmethod
+    def _create_backend(llm_provider, **kwargs) -> Type[StatelessLLMInterface]:
+        """Create the LLM client of a provider."""
         if (
             llm_provider == "openai_compatible_llm"
             or llm_provider == "openai_llm"
@@ -66,6 +90,7 @@ class LLMFactory:
 
             return LlamaLLM(
                 model_path=kwargs.get("model_path"),
+                state_cache_mb=kwargs.get("state_cache_mb", 1024),
             )
         elif llm_provider == "claude_llm":
             return ClaudeLLM(
@@ -73,6 +98,7 @@ class LLMFactory:
                 base_url=kwargs.get("base_url"),
                 model=kwargs.get("model"),
                 llm_api_key=kwargs.get("llm_api_key"),
+                prompt_caching=kwargs.get("prompt_caching", True),
             )
         else:
             raise ValueError(f"Unsupported LLM provider: {llm_provider}")
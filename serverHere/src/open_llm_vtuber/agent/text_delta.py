@@ -0,0 +1,154 @@
+"""Display text streamed to the client as the LLM produces it.
+
+Clients that opt in receive `text-delta` messages with the raw reply text
+before sentences are segmented and synthesized. Think tag content and
+emotion tags are stripped, and deltas produced within one event-loop tick
+are sent as one message. The deltas are only a preview: they are not ordered
+with the audio payloads, which still carry the final display text.
+"""
+
+import asyncio
+import contextvars
+import json
+from typing import Callable, Awaitable, Iterable, List, Optional
+
+from loguru import logger
+
+_THINK_OPEN = "<think>"
+_THINK_CLOSE = "</think>"
+# Longest text held back while waiting to see whether it starts a tag
+_MAX_PENDING = 32
+
+
+class TextDeltaFilter:
+    """
+    Strips think tags and emotion tags from a stream of text chunks.
+
+    Tags may be split across chunks, so text that could be the start of a tag
+    is held back until the next chunk shows what it is.
+    """
+
+    def __init__(self, emotion_keys: Iterable[str] = ()):
+        self._emotion_tags = {f"[{key}]".lower() for key in emotion_keys}
+        self._in_think = False
+        self._pending = ""
+
+    def _tag_at(self, text: str, index: int) -> Optional[int]:
+        """
+        Length of the tag starting at `index`, 0 if it may still become one
+        with more text, or None if no tag starts there.
+        """
+        rest = text[index:].lower()
+        candidates = [_THINK_CLOSE] if self._in_think else [_THINK_OPEN]
+        if not self._in_think and rest.startswith("["):
+            candidates.extend(self._emotion_tags)
+        for tag in candidates:
+            if rest.startswith(tag):
+                return len(tag)
+        if len(rest) < _MAX_PENDING and any(tag.startswith(rest) for tag in candidates):
+            return 0
+        return None
+
+    def feed(self, chunk: str) -> str:
+        """Return the text of a chunk that can be shown now."""
+        text = self._pending + chunk
+        self._pending = ""
+        output: List[str] = []
+        index = 0
+        start = 0
+        while index < len(text):
+            if text[index] not in "<[":
+                index += 1
+                continue
+            tag_length = self._tag_at(text, index)
+            if tag_length is None:
+                index += 1
+                continue
+            if not self._in_think:
+                output.append(text[start:index])
+            if tag_length == 0:
+                self._pending = text[index:]
+                return "".join(output)
+            tag = text[index : index + tag_length].lower()
+            if tag == _THINK_OPEN:
+                self._in_think = True
+            elif tag == _THINK_CLOSE:
+                self._in_think = False
+            index += tag_length
+            start = index
+        if not self._in_think:
+            output.append(text[start:])
+        return "".join(output)
+
+    def flush(self) -> str:
+        """Return the text held back at the end of the stream."""
+        pending, self._pending = self._pending, ""
+        return "" if self._in_think else pending
+
+
+# Stream that receives the reply text of the current conversation turn
+text_delta_sink: contextvars.ContextVar[Optional["TextDeltaStream"]] = (
+    contextvars.ContextVar("text_delta_sink", default=None)
+)
+
+
+class TextDeltaStream:
+    """Sends filtered reply text to a client, coalesced per event-loop tick."""
+
+    def __init__(
+        self,
+        websocket_send: Callable[[str], Awaitable[None]],
+        emotion_keys: Iterable[str] = (),
+    ):
+        self._send = websocket_send
+        self._filter = TextDeltaFilter(emotion_keys)
+        self._buffer: List[str] = []
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+
+    def push(self, chunk: str) -> None:
+        """Queue a raw text chunk of the reply. Never blocks."""
+        if self._closed:
+            return
+        text = self._filter.feed(chunk)
+        if text:
+            self._buffer.append(text)
+            self._ready.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._ready.wait()
+            # Let the tokens of this tick arrive before sending
+            await asyncio.sleep(0)
+            self._ready.clear()
+            text = "".join(self._buffer)
+            self._buffer.clear()
+            if text:
+                try:
+                    await self._send(json.dumps({"type": "text-delta", "text": text}))
+                except Exception as e:
+                    logger.debug(f"Failed to send text delta: {e}")
+                    return
+            if self._closed and not self._buffer:
+                return
+
+    async def close(self) -> None:
+        """Send the remaining text and an end marker."""
+        if self._closed:
+            return
+        text = self._filter.flush()
+        if text:
+            self._buffer.append(text)
+        self._closed = True
+        self._ready.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        try:
+            await self._send(json.dumps({"type": "text-delta", "done": True}))
+        except Exception as e:
+            logger.debug(f"Failed to send text delta end: {e}")
+
+    def cancel(self) -> None:
+        """Stop sending, e.g. when the turn is interrupted."""
+        self._closed = True
+        self._task.cancel()
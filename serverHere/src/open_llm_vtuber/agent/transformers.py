@@ -1,18 +1,31 @@
-from typing import AsyncIterator, Tuple, Callable, List, Union, Dict, Any
+from typing import AsyncIterator, Tuple, Callable, List, Union, Dict, Any, Optional
+import time
 from functools import wraps
 from .output_types import Actions, SentenceOutput, DisplayText
 from ..utils.tts_preprocessor import tts_filter as filter_text
 from ..live2d_model import Live2dModel
-from ..config_manager import TTSPreprocessorConfig
+from ..config_manager import TTSPreprocessorConfig, TranslatorConfig
 from ..utils.sentence_divider import SentenceDivider
 from ..utils.sentence_divider import SentenceWithTags, TagState
+from ..utils.segmentation_policy import (
+    SegmentationPolicy,
+    SentenceCoalescer,
+    segmentation_stats,
+)
 from loguru import logger
 
+# Used when an agent is given no TTS preprocessor config
+_DEFAULT_TTS_PREPROCESSOR_CONFIG = TTSPreprocessorConfig(
+    remove_special_char=True,
+    translator_config=TranslatorConfig(translate_audio=False, translate_provider="deeplx"),
+)
+
 
 def sentence_divider(
     faster_first_response: bool = True,
     segment_method: str = "pysbd",
     valid_tags: List[str] = None,
+    language: Optional[str] = None,
 ):
     """
     Decorator that transforms token stream into sentences with tags
@@ -21,6 +34,7 @@ def sentence_divider(
         faster_first_response: bool - Whether to enable faster first response
         segment_method: str - Method for sentence segmentation
         valid_tags: List[str] - List of valid tags to process
+        language: Optional[str] - Language for pysbd, detected per response if None
     """
 
     def decorator(
@@ -38,6 +52,7 @@ def sentence_divider(
                 faster_first_response=faster_first_response,
                 segment_method=segment_method,
                 valid_tags=valid_tags or [],
+                language=language,
             )
             stream_from_func = func(*args, **kwargs)
 
@@ -177,7 +192,7 @@ def tts_filter(
             *args, **kwargs
         ) -> AsyncIterator[Union[SentenceOutput, Dict[str, Any]]]:  # Yield type hint
             stream = func(*args, **kwargs)
-            config = tts_preprocessor_config or TTSPreprocessorConfig()
+            config = tts_preprocessor_config or _DEFAULT_TTS_PREPROCESSOR_CONFIG
 
             async for item in stream:
                 if (
@@ -215,3 +230,145 @@ def tts_filter(
         return wrapper
 
     return decorator
+
+
+# A stage reads the sentence and fills in the output in place.
+OutputStage = Callable[[SentenceWithTags, SentenceOutput], None]
+
+
+def actions_stage(live2d_model: Live2dModel) -> OutputStage:
+    """Output stage that extracts emotions from non-tag text into actions."""
+
+    def stage(sentence: SentenceWithTags, output: SentenceOutput) -> None:
+        if any(tag.state in (TagState.START, TagState.END) for tag in sentence.tags):
+            return
+        expressions = live2d_model.extract_emotion(sentence.text)
+        if expressions:
+            output.actions.expressions = expressions
+
+    return stage
+
+
+def display_stage(sentence: SentenceWithTags, output: SentenceOutput) -> None:
+    """Output stage that shows think tags as parentheses."""
+    for tag in sentence.tags:
+        if tag.name == "think":
+            if tag.state == TagState.START:
+                output.display_text.text = "("
+            elif tag.state == TagState.END:
+                output.display_text.text = ")"
+
+
+def tts_stage(tts_preprocessor_config: TTSPreprocessorConfig = None) -> OutputStage:
+    """Output stage that filters the display text for TTS. Skips think tag content."""
+    config = tts_preprocessor_config or _DEFAULT_TTS_PREPROCESSOR_CONFIG
+
+    def stage(sentence: SentenceWithTags, output: SentenceOutput) -> None:
+        if any(tag.name == "think" for tag in sentence.tags):
+            output.tts_text = ""
+            return
+        output.tts_text = filter_text(
+            text=output.display_text.text,
+            remove_special_char=config.remove_special_char,
+            ignore_brackets=config.ignore_brackets,
+            ignore_parentheses=config.ignore_parentheses,
+            ignore_asterisks=config.ignore_asterisks,
+            ignore_angle_brackets=config.ignore_angle_brackets,
+        )
+
+    return stage
+
+
+class OutputPipeline:
+    """
+    Turns a token stream into SentenceOutput objects in a single pass.
+
+    Does the work of the sentence_divider, actions_extractor, display_processor
+    and tts_filter decorators without stacking one async generator per step.
+    Build it once per agent; every call to `process` gets its own divider.
+    Dicts in the stream (tool status etc.) are passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        stages: List[OutputStage],
+        faster_first_response: bool = True,
+        segment_method: str = "pysbd",
+        valid_tags: List[str] = None,
+        language: Optional[str] = None,
+        segmentation_policy: Optional[SegmentationPolicy] = None,
+    ):
+        """
+        Args:
+            stages: Callables applied in order to every sentence
+            faster_first_response: Whether to enable faster first response
+            segment_method: Method for sentence segmentation
+            valid_tags: List of valid tags to process
+            language: Language for pysbd, detected per response if None
+            segmentation_policy: How sentences are grouped into TTS chunks
+        """
+        self.stages = stages
+        self.faster_first_response = faster_first_response
+        self.segment_method = segment_method
+        self.valid_tags = valid_tags or []
+        self.language = language
+        self.segmentation_policy = segmentation_policy or SegmentationPolicy()
+
+    def process_sentence(self, sentence: SentenceWithTags) -> SentenceOutput:
+        """Run all stages on one sentence."""
+        output = SentenceOutput(
+            display_text=DisplayText(text=sentence.text),
+            tts_text=sentence.text,
+            actions=Actions(),
+        )
+        for stage in self.stages:
+            stage(sentence, output)
+        return output
+
+    async def process(
+        self, token_stream: AsyncIterator[Union[str, Dict[str, Any]]]
+    ) -> AsyncIterator[Union[SentenceOutput, Dict[str, Any]]]:
+        """Divide the token stream into sentences and run the stages on each."""
+        policy = self.segmentation_policy
+        divider = SentenceDivider(
+            faster_first_response=self.faster_first_response,
+            segment_method=self.segment_method,
+            valid_tags=self.valid_tags,
+            language=self.language,
+            first_chunk_min_chars=policy.first_chunk_chars(),
+            max_sentence_chars=policy.max_chunk_chars,
+        )
+        coalescer = SentenceCoalescer(policy.min_chunk_chars)
+        if policy.adaptive_first_chunk:
+            token_stream = self._measure_token_rate(token_stream)
+
+        async for item in divider.process_stream(token_stream):
+            if isinstance(item, SentenceWithTags):
+                for sentence in coalescer.push(item):
+                    yield self.process_sentence(sentence)
+            else:
+                # Don't hold a sentence back while tools run
+                for sentence in coalescer.flush():
+                    yield self.process_sentence(sentence)
+                yield item
+        for sentence in coalescer.flush():
+            yield self.process_sentence(sentence)
+
+    @staticmethod
+    async def _measure_token_rate(
+        token_stream: AsyncIterator[Union[str, Dict[str, Any]]],
+    ) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """Pass the stream through and record the LLM output rate."""
+        chars = 0
+        first_token_time = None
+        async for item in token_stream:
+            if isinstance(item, str):
+                if first_token_time is None:
+                    first_token_time = time.perf_counter()
+                else:
+                    chars += len(item)
+            yield item
+        if first_token_time is not None:
+            segmentation_stats.record_llm_rate(
+                chars, time.perf_counter() - first_token_time
+            )
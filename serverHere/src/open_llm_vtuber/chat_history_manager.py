@@ -1,93 +1,111 @@
-import os
-import re
-import json
-import uuid
-from datetime import datetime
-from typing import Literal, List, TypedDict, Optional
-from loguru import logger
-
-
-class HistoryMessage(TypedDict):
-    role: Literal["human", "ai"]
-    timestamp: str
-    content: str
-    # Optional display information for the message
-    name: Optional[str]
-    avatar: Optional[str]
-
-
-def _is_safe_filename(filename: str) -> bool:
-    """Validate filename for safety and allowed characters"""
-    if not filename or len(filename) > 255:
-        return False
-
-    # Allow alphanumeric, hyphen, underscore, and common unicode characters
-    # Block any filesystem special characters, control characters, and path separators
-    pattern = re.compile(r"^[\w\-_\u0020-\u007E\u00A0-\uFFFF]+$")
-    return bool(pattern.match(filename))
-
-
-def _sanitize_path_component(component: str) -> str:
-    """Sanitize and validate a path component"""
-    # Remove any path components, get just the basename
-    sanitized = os.path.basename(component.strip())
-
-    if not _is_safe_filename(sanitized):
-        raise ValueError(f"Invalid characters in path component: {component}")
-
-    return sanitized
-
-
-def _ensure_conf_dir(conf_uid: str) -> str:
-    """Ensure the directory for a specific conf exists and return its path"""
-    if not conf_uid:
-        raise ValueError("conf_uid cannot be empty")
-
-    safe_conf_uid = _sanitize_path_component(conf_uid)
-    base_dir = os.path.join("chat_history", safe_conf_uid)
-    os.makedirs(base_dir, exist_ok=True)
-    return base_dir
-
-
-def _get_safe_history_path(conf_uid: str, history_uid: str) -> str:
-    """Get sanitized path for history file"""
-    safe_conf_uid = _sanitize_path_component(conf_uid)
-    safe_history_uid = _sanitize_path_component(history_uid)
-    base_dir = os.path.join("chat_history", safe_conf_uid)
-    full_path = os.path.normpath(os.path.join(base_dir, f"{safe_history_uid}.json"))
-    if not full_path.startswith(base_dir):
-        raise ValueError("Invalid path: Path traversal detected")
-    return full_path
+"""Chat history access for the rest of the server.
+
+The functions of this module forward to the configured history storage, see
+`history_storage`. The JSON Lines storage in the `chat_history` directory is
+used until `set_history_storage` is called with another one.
+
+Once `start_history_writer` was called, `store_message` only queues the
+message and returns, and the other functions wait for queued messages to be
+written before they read or change a history. Call those from the event loop
+through `asyncio.to_thread`.
+"""
+
+from typing import Literal, List, Optional
+
+from .history_storage.history_storage_interface import (
+    HistoryMessage,
+    HistoryPage,
+    HistorySearchResult,
+    HistoryStorageInterface,
+    new_message,
+)
+from .history_storage.history_writer import HistoryWriter, WritePolicy
+from .history_storage.json_history_storage import JSONHistoryStorage
+
+__all__ = [
+    "HistoryMessage",
+    "HistoryPage",
+    "HistorySearchResult",
+    "get_history_storage",
+    "set_history_storage",
+    "start_history_writer",
+    "get_history_writer",
+    "history_turn_ended",
+    "close_history",
+    "create_new_history",
+    "store_message",
+    "get_metadata",
+    "update_metadate",
+    "get_history",
+    "get_history_tail",
+    "get_history_page",
+    "search_history",
+    "delete_history",
+    "get_history_list",
+    "modify_latest_message",
+    "rename_history_file",
+]
+
+_storage: HistoryStorageInterface = JSONHistoryStorage()
+_writer: Optional[HistoryWriter] = None
+
+
+def get_history_storage() -> HistoryStorageInterface:
+    """Return the history storage in use"""
+    return _storage
+
+
+def set_history_storage(storage: HistoryStorageInterface) -> None:
+    """Replace the history storage, closing the previous one"""
+    global _storage
+    _wait_for_writes()
+    previous, _storage = _storage, storage
+    if _writer:
+        _writer.storage = storage
+    if previous is not storage:
+        previous.close()
+
+
+def start_history_writer(
+    policy: WritePolicy = "turn", flush_interval: float = 1.0, max_queue: int = 1000
+) -> None:
+    """Write stored messages in the background, see `HistoryWriter`"""
+    global _writer
+    if _writer:
+        _writer.close()
+        _writer = None
+    if policy != "immediate":
+        _writer = HistoryWriter(_storage, policy, flush_interval, max_queue)
+
+
+def get_history_writer() -> Optional[HistoryWriter]:
+    """Return the background writer, or None if messages are written at once"""
+    return _writer
+
+
+def history_turn_ended() -> None:
+    """Let the writer know a conversation turn ended, see `WritePolicy`"""
+    if _writer:
+        _writer.turn_ended()
+
+
+def close_history() -> None:
+    """Write queued messages and close the storage, e.g. at server shutdown"""
+    global _writer
+    if _writer:
+        _writer.close()
+        _writer = None
+    _storage.close()
+
+
+def _wait_for_writes() -> None:
+    if _writer:
+        _writer.flush()
 
 
 def create_new_history(conf_uid: str) -> str:
-    """Create a new history file with a unique ID and return the history_uid"""
-    if not conf_uid:
-        logger.warning("No conf_uid provided")
-        return ""
-
-    # Use uuid.uuid4().hex to generate a UUID without hyphens
-    # New format: UUID_YYYY-MM-DD_HH-MM-SS
-    history_uid = f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex}"
-    conf_dir = _ensure_conf_dir(conf_uid)  # conf_uid is sanitized here
-
-    # Create history file with empty metadata
-    try:
-        filepath = os.path.join(conf_dir, f"{history_uid}.json")
-        initial_data = [
-            {
-                "role": "metadata",
-                "timestamp": datetime.now().isoformat(timespec="seconds"),
-            }
-        ]
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(initial_data, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logger.error(f"Failed to create new history file: {e}")
-        return ""
-
-    logger.debug(f"Created new history file with empty metadata: {filepath}")
-    return history_uid
+    """Create a new history with a unique ID and return the history_uid"""
+    return _storage.create_new_history(conf_uid)
 
 
 def store_message(
@@ -98,7 +116,7 @@ def store_message(
     name: str | None = None,
     avatar: str | None = None,
 ):
-    """Store a message in a specific history file
+    """Append a message to a specific history
 
     Args:
         conf_uid: Configuration unique identifier
@@ -108,204 +126,68 @@ def store_message(
         name: Optional display name (default None)
         avatar: Optional avatar URL (default None)
     """
-    if not conf_uid or not history_uid:
-        if not conf_uid:
-            logger.warning("Missing conf_uid")
-        if not history_uid:
-            logger.warning("Missing history_uid")
-        return
-
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    logger.debug(f"Storing {role} message to {filepath}")
-
-    history_data = []
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                history_data = json.load(f)
-        except Exception:
-            logger.error(f"Failed to load history file: {filepath}")
-            pass
-
-    now_str = datetime.now().isoformat(timespec="seconds")
-    new_item = {
-        "role": role,
-        "timestamp": now_str,
-        "content": content,
-    }
-
-    # Add optional display information if provided
-    if name is not None:
-        new_item["name"] = name
-    if avatar is not None:
-        new_item["avatar"] = avatar
-
-    history_data.append(new_item)
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(history_data, f, ensure_ascii=False, indent=2)
-    logger.debug(f"Successfully stored {role} message")
+    if _writer:
+        # Stamped now, written later
+        _writer.submit(conf_uid, history_uid, new_message(role, content, name, avatar))
+    else:
+        _storage.store_message(conf_uid, history_uid, role, content, name, avatar)
 
 
 def get_metadata(conf_uid: str, history_uid: str) -> dict:
-    """Get metadata from history file"""
-    if not conf_uid or not history_uid:
-        return {}
-
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    if not os.path.exists(filepath):
-        return {}
-
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-
-        if history_data and history_data[0]["role"] == "metadata":
-            return history_data[0]
-    except Exception as e:
-        logger.error(f"Failed to get metadata: {e}")
-    return {}
+    """Get metadata of a history"""
+    _wait_for_writes()
+    return _storage.get_metadata(conf_uid, history_uid)
 
 
 def update_metadate(conf_uid: str, history_uid: str, metadata: dict) -> bool:
-    """Set metadata in history file
+    """Set metadata of a history
 
     Updates existing metadata with new fields, preserving existing ones.
-    If no metadata exists, creates new metadata entry.
     """
-    if not conf_uid or not history_uid:
-        return False
-
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    if not os.path.exists(filepath):
-        return False
-
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-
-        if history_data and history_data[0]["role"] == "metadata":
-            # Update existing metadata while preserving other fields
-            history_data[0].update(metadata)
-        else:
-            # Create new metadata with timestamp if none exists
-            new_metadata = {
-                "role": "metadata",
-                "timestamp": datetime.now().isoformat(timespec="seconds"),
-            }
-            new_metadata.update(metadata)  # Add new fields
-            history_data.insert(0, new_metadata)
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
-
-        logger.debug(f"Updated metadata for history {history_uid}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to set metadata: {e}")
-    return False
+    _wait_for_writes()
+    return _storage.update_metadata(conf_uid, history_uid, metadata)
 
 
 def get_history(conf_uid: str, history_uid: str) -> List[HistoryMessage]:
     """Read chat history for the given conf_uid and history_uid"""
-    if not conf_uid or not history_uid:
-        if not conf_uid:
-            logger.warning("Missing conf_uid")
-        if not history_uid:
-            logger.warning("Missing history_uid")
-        return []
+    _wait_for_writes()
+    return _storage.get_history(conf_uid, history_uid)
+
 
-    filepath = _get_safe_history_path(conf_uid, history_uid)
+def get_history_tail(
+    conf_uid: str, history_uid: str, count: int
+) -> List[HistoryMessage]:
+    """Read the last `count` messages of a history, oldest first"""
+    _wait_for_writes()
+    return _storage.get_history_tail(conf_uid, history_uid, count)
 
-    if not os.path.exists(filepath):
-        logger.warning(f"History file not found: {filepath}")
-        return []
 
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-            # Filter out metadata
-            return [msg for msg in history_data if msg["role"] != "metadata"]
-    except Exception:
-        return []
+def get_history_page(
+    conf_uid: str, history_uid: str, limit: int, before: Optional[str] = None
+) -> HistoryPage:
+    """Read up to `limit` messages before the cursor, or the latest ones"""
+    _wait_for_writes()
+    return _storage.get_history_page(conf_uid, history_uid, limit, before)
+
+
+def search_history(
+    conf_uid: str, query: str, limit: int = 20, history_uid: Optional[str] = None
+) -> List[HistorySearchResult]:
+    """Find messages of a conf containing the query, newest first"""
+    _wait_for_writes()
+    return _storage.search_history(conf_uid, query, limit, history_uid)
 
 
 def delete_history(conf_uid: str, history_uid: str) -> bool:
-    """Delete a specific history file"""
-    if not conf_uid or not history_uid:
-        logger.warning("Missing conf_uid or history_uid")
-        return False
-
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    try:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            logger.debug(f"Successfully deleted history file: {filepath}")
-            return True
-    except Exception as e:
-        logger.error(f"Failed to delete history file: {e}")
-    return False
+    """Delete a specific history"""
+    _wait_for_writes()
+    return _storage.delete_history(conf_uid, history_uid)
 
 
 def get_history_list(conf_uid: str) -> List[dict]:
     """Get list of histories with their latest messages"""
-    if not conf_uid:
-        return []
-
-    histories = []
-    conf_dir = _ensure_conf_dir(conf_uid)
-    empty_history_uids = []
-
-    try:
-        for filename in os.listdir(conf_dir):
-            if not filename.endswith(".json"):
-                continue
-
-            history_uid = filename[:-5]
-            filepath = os.path.join(conf_dir, filename)
-
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    messages = json.load(f)
-
-                    # Filter out metadata for checking if history is empty
-                    actual_messages = [
-                        msg for msg in messages if msg["role"] != "metadata"
-                    ]
-                    if not actual_messages:
-                        empty_history_uids.append(history_uid)
-                        continue
-
-                    latest_message = actual_messages[-1]
-                    history_info = {
-                        "uid": history_uid,
-                        "latest_message": latest_message,
-                        "timestamp": (
-                            latest_message["timestamp"] if latest_message else None
-                        ),
-                    }
-                    histories.append(history_info)
-            except Exception as e:
-                logger.error(f"Error reading history file {filename}: {e}")
-                continue
-
-        # Clean up empty histories if there are other non-empty ones
-        if len(empty_history_uids) > 0 and len(os.listdir(conf_dir)) > 1:
-            for uid in empty_history_uids:
-                try:
-                    os.remove(os.path.join(conf_dir, f"{uid}.json"))
-                    logger.info(f"Removed empty history file: {uid}")
-                except Exception as e:
-                    logger.error(f"Failed to remove empty history file {uid}: {e}")
-
-        histories.sort(
-            key=lambda x: x["timestamp"] if x["timestamp"] else "", reverse=True
-        )
-        return histories
-
-    except Exception as e:
-        logger.error(f"Error listing histories: {e}")
-        return []
+    _wait_for_writes()
+    return _storage.get_history_list(conf_uid)
 
 
 def modify_latest_message(
@@ -314,61 +196,14 @@ def modify_latest_message(
     role: Literal["human", "ai", "system"],
     new_content: str,
 ) -> bool:
-    """Modify the latest message in a specific history file if it matches the given role"""
-    if not conf_uid or not history_uid:
-        logger.warning("Missing conf_uid or history_uid")
-        return False
-
-    filepath = _get_safe_history_path(conf_uid, history_uid)
-    if not os.path.exists(filepath):
-        logger.warning(f"History file not found: {filepath}")
-        return False
-
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-
-        if not history_data:
-            logger.warning("History is empty")
-            return False
-
-        latest_message = history_data[-1]
-        if latest_message["role"] != role:
-            logger.warning(
-                f"Latest message role ({latest_message['role']}) doesn't match requested role ({role})"
-            )
-            return False
-
-        latest_message["content"] = new_content
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(history_data, f, ensure_ascii=False, indent=2)
-
-        logger.debug(f"Successfully modified latest {role} message")
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to modify latest message: {e}")
-        return False
+    """Modify the latest message in a specific history if it matches the given role"""
+    _wait_for_writes()
+    return _storage.modify_latest_message(conf_uid, history_uid, role, new_content)
 
 
 def rename_history_file(
     conf_uid: str, old_history_uid: str, new_history_uid: str
 ) -> bool:
-    """Rename a history file with a new history_uid"""
-    if not conf_uid or not old_history_uid or not new_history_uid:
-        logger.warning("Missing required parameters for rename")
-        return False
-
-    old_filepath = _get_safe_history_path(conf_uid, old_history_uid)
-    new_filepath = _get_safe_history_path(conf_uid, new_history_uid)
-
-    try:
-        if os.path.exists(old_filepath):
-            os.rename(old_filepath, new_filepath)
-            logger.info(
-                f"Renamed history file from {old_history_uid} to {new_history_uid}"
-            )
-            return True
-    except Exception as e:
-        logger.error(f"Failed to rename history file: {e}")
-    return False
+    """Rename a history with a new history_uid"""
+    _wait_for_writes()
+    return _storage.rename_history(conf_uid, old_history_uid, new_history_uid)
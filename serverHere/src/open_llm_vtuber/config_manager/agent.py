@@ -10,35 +10,55 @@ from .stateless_llm import StatelessLLMConfigs
 
 # ======== Configurations for different Agents ========
 
+LLMProvider = Literal[
+    "stateless_llm_with_template",
+    "openai_compatible_llm",
+    "claude_llm",
+    "llama_cpp_llm",
+    "ollama_llm",
+    "lmstudio_llm",
+    "openai_llm",
+    "gemini_llm",
+    "zhipu_llm",
+    "deepseek_llm",
+    "groq_llm",
+    "mistral_llm",
+]
+
 
 class BasicMemoryAgentConfig(I18nMixin, BaseModel):
     """Configuration for the basic memory agent."""
 
-    llm_provider: Literal[
-        "stateless_llm_with_template",
-        "openai_compatible_llm",
-        "claude_llm",
-        "llama_cpp_llm",
-        "ollama_llm",
-        "lmstudio_llm",
-        "openai_llm",
-        "gemini_llm",
-        "zhipu_llm",
-        "deepseek_llm",
-        "groq_llm",
-        "mistral_llm",
-    ] = Field(..., alias="llm_provider")
+    llm_provider: LLMProvider = Field(..., alias="llm_provider")
+    fallback_llm_providers: List[LLMProvider] = Field(
+        [], alias="fallback_llm_providers"
+    )
+    hedge_delay_ms: int = Field(0, alias="hedge_delay_ms")
 
     faster_first_response: Optional[bool] = Field(True, alias="faster_first_response")
     segment_method: Literal["regex", "pysbd"] = Field("pysbd", alias="segment_method")
+    segment_language: Optional[str] = Field(None, alias="segment_language")
+    segment_min_chars: int = Field(0, alias="segment_min_chars")
+    segment_max_chars: int = Field(0, alias="segment_max_chars")
+    adaptive_first_chunk: bool = Field(False, alias="adaptive_first_chunk")
     use_mcpp: Optional[bool] = Field(False, alias="use_mcpp")
     mcp_enabled_servers: Optional[List[str]] = Field(["time", "ddgSearch", "useWinTerminal"], alias="mcp_enabled_servers")
+    memory_token_budget: int = Field(6000, alias="memory_token_budget")
+    summarize_memory: bool = Field(True, alias="summarize_memory")
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "llm_provider": Description(
             en="LLM provider to use for this agent",
             zh="Basic Memory Agent 智能体使用的大语言模型选项",
         ),
+        "fallback_llm_providers": Description(
+            en="LLM providers to fail over to, in order, when llm_provider fails or is slow (default: none)",
+            zh="当 llm_provider 出错或响应过慢时依次切换使用的备用大语言模型（默认：无）",
+        ),
+        "hedge_delay_ms": Description(
+            en="If no token arrived after this many milliseconds, also send the request to the next fallback provider and use whichever answers first. 0 disables hedging (default: 0)",
+            zh="如果在该毫秒数内没有收到任何 token，则同时向下一个备用提供商发送请求，并使用先回复的结果。0 表示禁用（默认：0）",
+        ),
         "faster_first_response": Description(
             en="Whether to respond as soon as encountering a comma in the first sentence to reduce latency (default: True)",
             zh="是否在第一句回应时遇上逗号就直接生成音频以减少首句延迟（默认：True）",
@@ -47,6 +67,22 @@ class BasicMemoryAgentConfig(I18nMixin, BaseModel):
             en="Method for segmenting sentences: 'regex' or 'pysbd' (default: 'pysbd')",
             zh="分割句子的方法：'regex' 或 'pysbd'（默认：'pysbd'）",
         ),
+        "segment_language": Description(
+            en="Language code for pysbd sentence segmentation, e.g. 'en' or 'zh'. Detected once per response if not set",
+            zh="pysbd 分句使用的语言代码，例如 'en' 或 'zh'。未设置时每次回复检测一次",
+        ),
+        "segment_min_chars": Description(
+            en="Merge consecutive short sentences into one TTS chunk of at least this many characters, 0 to disable (default: 0)",
+            zh="将连续的短句合并为至少包含此字符数的 TTS 片段，0 表示禁用（默认：0）",
+        ),
+        "segment_max_chars": Description(
+            en="Split sentences longer than this many characters into several TTS chunks, 0 to disable (default: 0)",
+            zh="将超过此字符数的句子拆分为多个 TTS 片段，0 表示禁用（默认：0）",
+        ),
+        "adaptive_first_chunk": Description(
+            en="Size the first TTS chunk from the measured TTS latency and LLM output rate instead of always cutting at the first comma (default: False)",
+            zh="根据测得的 TTS 延迟和大语言模型输出速度决定首个 TTS 片段的长度，而不是总在第一个逗号处切分（默认：False）",
+        ),
         "use_mcpp": Description(
             en="Whether to use MCP (Model Context Protocol) for the agent (default: True)",
             zh="是否使用为智能体启用 MCP (Model Context Protocol) Plus（默认：False）",
@@ -55,6 +91,14 @@ class BasicMemoryAgentConfig(I18nMixin, BaseModel):
             en="List of MCP servers to enable for the agent",
             zh="为智能体启用 MCP 服务器列表",
         ),
+        "memory_token_budget": Description(
+            en="Approximate token budget for the chat history sent to the LLM, 0 to send all history (default: 6000)",
+            zh="发送给大语言模型的聊天记录的大致 token 预算，0 表示发送全部记录（默认：6000）",
+        ),
+        "summarize_memory": Description(
+            en="Whether to summarize messages over the token budget in the background instead of dropping them (default: True)",
+            zh="是否在后台总结超出 token 预算的消息，而不是直接丢弃（默认：True）",
+        ),
     }
 
 
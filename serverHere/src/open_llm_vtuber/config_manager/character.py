@@ -1,6 +1,6 @@
 # config_manager/character.py
 from pydantic import Field, field_validator
-from typing import Dict, ClassVar
+from typing import Dict, ClassVar, List
 from .i18n import I18nMixin, Description
 from .asr import ASRConfig
 from .tts import TTSConfig
@@ -27,6 +27,10 @@ class CharacterConfig(I18nMixin):
     tts_preprocessor_config: TTSPreprocessorConfig = Field(
         ..., alias="tts_preprocessor_config"
     )
+    filler_delay_ms: int = Field(0, alias="filler_delay_ms")
+    filler_phrases: List[str] = Field(
+        ["Hmm...", "Let me see..."], alias="filler_phrases"
+    )
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "conf_name": Description(
@@ -67,6 +71,14 @@ class CharacterConfig(I18nMixin):
         "avatar": Description(
             en="Avatar image path for the character", zh="角色头像图片路径"
         ),
+        "filler_delay_ms": Description(
+            en="Play a short filler clip if the first sentence of a reply is not ready after this many milliseconds. 0 disables fillers (default: 0)",
+            zh="如果回复的第一句话在该毫秒数后仍未准备好，则播放一段简短的填充语音。0 表示禁用（默认：0）",
+        ),
+        "filler_phrases": Description(
+            en="Filler phrases, synthesized once with the character's voice and cached",
+            zh="填充语句，使用角色的声音合成一次后缓存",
+        ),
     }
 
     @field_validator("persona_prompt")
@@ -11,6 +11,9 @@ class StatelessLLMBaseConfig(I18nMixin):
     interrupt_method: Literal["system", "user"] = Field(
         "user", alias="interrupt_method"
     )
+    max_concurrency: int = Field(0, alias="max_concurrency")
+    tokens_per_minute: int = Field(0, alias="tokens_per_minute")
+    max_queue: int = Field(0, alias="max_queue")
     DESCRIPTIONS: ClassVar[dict[str, Description]] = {
         "interrupt_method": Description(
             en="""The method to use for prompting the interruption signal.
@@ -19,6 +22,18 @@ class StatelessLLMBaseConfig(I18nMixin):
             zh="""用于表示中断信号的方法(提示词模式)。如果LLM支持在聊天记忆中的任何位置插入系统提示词，请使用“system”。
             否则，请使用“user”。您不需要更改此设置。""",
         ),
+        "max_concurrency": Description(
+            en="Maximum number of requests streaming from this backend at once, shared by all sessions. 0 means no limit (default: 0)",
+            zh="所有会话共享的该后端最大并发请求数。0 表示不限制（默认：0）",
+        ),
+        "tokens_per_minute": Description(
+            en="Maximum estimated tokens sent to and received from this backend per minute. 0 means no limit (default: 0)",
+            zh="每分钟发送和接收该后端的最大估算 token 数。0 表示不限制（默认：0）",
+        ),
+        "max_queue": Description(
+            en="Maximum number of requests waiting for this backend. When full, live-stream and proactive requests are dropped first. 0 means no limit (default: 0)",
+            zh="等待该后端的最大请求数。队列满时优先丢弃直播和主动发言请求。0 表示不限制（默认：0）",
+        ),
     }
 
 
@@ -192,6 +207,7 @@ class ClaudeConfig(StatelessLLMBaseConfig):
     interrupt_method: Literal["system", "user"] = Field(
         "user", alias="interrupt_method"
     )
+    prompt_caching: bool = Field(True, alias="prompt_caching")
 
     _CLAUDE_DESCRIPTIONS: ClassVar[dict[str, Description]] = {
         "base_url": Description(
@@ -201,6 +217,10 @@ class ClaudeConfig(StatelessLLMBaseConfig):
         "model": Description(
             en="Name of the Claude model to use", zh="要使用的 Claude 模型名称"
         ),
+        "prompt_caching": Description(
+            en="Cache the system prompt and chat history with Claude prompt caching (default: True)",
+            zh="使用 Claude 提示缓存来缓存系统提示词和聊天记录（默认：True）",
+        ),
     }
 
     DESCRIPTIONS: ClassVar[dict[str, Description]] = {
@@ -216,11 +236,16 @@ class LlamaCppConfig(StatelessLLMBaseConfig):
     interrupt_method: Literal["system", "user"] = Field(
         "system", alias="interrupt_method"
     )
+    state_cache_mb: int = Field(1024, alias="state_cache_mb")
 
     _LLAMA_DESCRIPTIONS: ClassVar[dict[str, Description]] = {
         "model_path": Description(
             en="Path to the GGUF model file", zh="GGUF 模型文件路径"
         ),
+        "state_cache_mb": Description(
+            en="Memory cap in MB for the KV cache snapshots kept per session, 0 to disable (default: 1024)",
+            zh="为每个会话保存的 KV 缓存快照的内存上限（MB），0 表示禁用（默认：1024）",
+        ),
     }
 
     DESCRIPTIONS: ClassVar[dict[str, Description]] = {
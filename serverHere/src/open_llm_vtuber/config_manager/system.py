@@ -1,6 +1,6 @@
 # config_manager/system.py
 from pydantic import Field, model_validator
-from typing import Dict, ClassVar
+from typing import Dict, ClassVar, Literal
 from .i18n import I18nMixin, Description
 
 
@@ -13,6 +13,20 @@ class SystemConfig(I18nMixin):
     config_alts_dir: str = Field(..., alias="config_alts_dir")
     tool_prompts: Dict[str, str] = Field(..., alias="tool_prompts")
     enable_proxy: bool = Field(False, alias="enable_proxy")
+    warmup_engines: bool = Field(False, alias="warmup_engines")
+    warmup_llm: bool = Field(False, alias="warmup_llm")
+    pregenerate_proactive_speech: bool = Field(
+        False, alias="pregenerate_proactive_speech"
+    )
+    history_storage: Literal["json", "sqlite"] = Field(
+        "json", alias="history_storage"
+    )
+    history_db_path: str = Field("chat_history/history.db", alias="history_db_path")
+    history_write_policy: Literal["immediate", "turn", "interval"] = Field(
+        "turn", alias="history_write_policy"
+    )
+    history_flush_interval_ms: int = Field(1000, alias="history_flush_interval_ms")
+    history_write_queue_size: int = Field(1000, alias="history_write_queue_size")
 
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "conf_version": Description(en="Configuration version", zh="配置文件版本"),
@@ -29,6 +43,38 @@ class SystemConfig(I18nMixin):
             en="Enable proxy mode for multiple clients",
             zh="启用代理模式以支持多个客户端使用一个 ws 连接",
         ),
+        "warmup_engines": Description(
+            en="Run ASR, TTS and VAD once on dummy input after loading so the first user request is not slowed down. Cloud engines are billed for these calls",
+            zh="加载后用空输入运行一次 ASR、TTS 和 VAD，避免首个用户请求变慢。云端引擎的这些调用会计费",
+        ),
+        "warmup_llm": Description(
+            en="Also send a minimal request to the LLM during warm-up to open connections",
+            zh="预热时也向 LLM 发送一个最小请求以建立连接",
+        ),
+        "pregenerate_proactive_speech": Description(
+            en="Prepare the next proactive speech with LLM and TTS while the conversation is idle, so the AI can speak up without delay. Uses extra LLM and TTS calls",
+            zh="在对话空闲时预先用 LLM 和 TTS 准备下一次主动发言，使 AI 能够立即开口。会额外消耗 LLM 和 TTS 调用",
+        ),
+        "history_storage": Description(
+            en="Where chat histories are stored: 'json' for one file per chat in chat_history, 'sqlite' for one database with paging and full-text search",
+            zh="聊天记录的存储方式：'json' 为 chat_history 中每个对话一个文件，'sqlite' 为支持分页和全文搜索的单个数据库",
+        ),
+        "history_db_path": Description(
+            en="Path of the SQLite database when history_storage is 'sqlite'",
+            zh="history_storage 为 'sqlite' 时 SQLite 数据库的路径",
+        ),
+        "history_write_policy": Description(
+            en="When chat messages are written to storage: 'immediate' during the conversation turn, 'turn' in the background at the end of each turn, 'interval' in the background every flush interval",
+            zh="聊天消息写入存储的时机：'immediate' 在对话轮次中立即写入，'turn' 在每轮对话结束时后台写入，'interval' 每个刷新间隔后台写入",
+        ),
+        "history_flush_interval_ms": Description(
+            en="Longest time in milliseconds a chat message waits before it is written in the background",
+            zh="聊天消息在后台写入前最长等待的时间（毫秒）",
+        ),
+        "history_write_queue_size": Description(
+            en="Chat messages waiting to be written before a write is forced and a warning is logged",
+            zh="等待写入的聊天消息数量上限，超过后立即写入并记录警告",
+        ),
     }
 
     @model_validator(mode="after")
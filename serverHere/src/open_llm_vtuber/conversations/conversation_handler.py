@@ -12,8 +12,13 @@ from ..service_context import ServiceContext
 from .group_conversation import process_group_conversation
 from .single_conversation import process_single_conversation
 from .conversation_utils import EMOJI_LIST
+from .proactive_speech import (
+    PROACTIVE_SPEAK_METADATA,
+    ProactiveSpeechCache,
+    load_proactive_speak_prompt,
+    play_prepared_speech,
+)
 from .types import GroupConversationState
-from prompts import prompt_loader
 
 
 async def handle_conversation_trigger(
@@ -31,28 +36,35 @@ async def handle_conversation_trigger(
 ) -> None:
     """Handle triggers that start a conversation"""
     metadata = None
+    group = chat_group_manager.get_client_group(client_uid)
+    is_group = bool(group and len(group.members) > 1)
+
+    # Any new turn makes speech prepared from the old memory outdated
+    proactive_cache = ProactiveSpeechCache.get(client_uid)
+    prepared = (
+        proactive_cache.take(context)
+        if msg_type == "ai-speak-signal" and not is_group
+        else None
+    )
+    proactive_cache.invalidate()
+
+    if prepared:
+        current_conversation_tasks[client_uid] = asyncio.create_task(
+            play_prepared_speech(
+                context=context,
+                websocket_send=websocket.send_text,
+                client_uid=client_uid,
+                prepared=prepared,
+            )
+        )
+        return
 
     if msg_type == "ai-speak-signal":
-        try:
-            # Get proactive speak prompt from config
-            prompt_name = "proactive_speak_prompt"
-            prompt_file = context.system_config.tool_prompts.get(prompt_name)
-            if prompt_file:
-                user_input = prompt_loader.load_util(prompt_file)
-            else:
-                logger.warning("Proactive speak prompt not configured, using default")
-                user_input = "Please say something."
-        except Exception as e:
-            logger.error(f"Error loading proactive speak prompt: {e}")
-            user_input = "Please say something."
+        user_input = load_proactive_speak_prompt(context)
 
         # Add metadata to indicate this is a proactive speak request
         # that should be skipped in both memory and history
-        metadata = {
-            "proactive_speak": True,
-            "skip_memory": True,  # Skip storing in AI's internal memory
-            "skip_history": True,  # Skip storing in local conversation history
-        }
+        metadata = dict(PROACTIVE_SPEAK_METADATA)
 
         await websocket.send_text(
             json.dumps(
@@ -64,6 +76,9 @@ async def handle_conversation_trigger(
         )
     elif msg_type == "text-input":
         user_input = data.get("text", "")
+        if data.get("source") == "live":
+            # Live-stream messages yield the LLM to users talking directly
+            metadata = {"live_input": True}
     else:  # mic-audio-end
         user_input = np.array(received_data_buffers[client_uid], dtype=np.float32)
         received_data_buffers[client_uid] = []
@@ -71,8 +86,7 @@ async def handle_conversation_trigger(
     images = data.get("images")
     session_emoji = np.random.choice(EMOJI_LIST)
 
-    group = chat_group_manager.get_client_group(client_uid)
-    if group and len(group.members) > 1:
+    if is_group:
         # Use group_id as task key for group conversations
         task_key = group.group_id
         if (
@@ -6,6 +6,7 @@ import json
 from loguru import logger
 
 from ..message_handler import message_handler
+from ..chat_history_manager import history_turn_ended
 from .types import WebSocketSend, BroadcastContext
 from .tts_manager import TTSTaskManager
 from ..agent.output_types import SentenceOutput, AudioOutput
@@ -215,6 +216,7 @@ async def send_conversation_end_signal(
 def cleanup_conversation(tts_manager: TTSTaskManager, session_emoji: str) -> None:
     """Clean up conversation resources"""
     tts_manager.clear()
+    history_turn_ended()
     logger.debug(f"🧹 Clearing up conversation {session_emoji}.")
 
 
@@ -0,0 +1,67 @@
+"""Short acknowledgement clips played while the first sentence is generated.
+
+Clips such as "Hmm..." are synthesized once per TTS engine (and therefore per
+voice) and cached as ready-to-send audio payloads. They carry no display text
+and never pass through the agent, so they are not added to memory or history.
+"""
+
+import asyncio
+import random
+import uuid
+import weakref
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from ..tts.tts_interface import TTSInterface
+from ..utils.stream_audio import prepare_audio_payload
+
+_clips: "weakref.WeakKeyDictionary[TTSInterface, Dict[str, dict]]" = (
+    weakref.WeakKeyDictionary()
+)
+_synthesis_tasks: "weakref.WeakKeyDictionary[TTSInterface, asyncio.Task]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _synthesize(tts_engine: TTSInterface, phrases: List[str]) -> None:
+    clips = _clips.setdefault(tts_engine, {})
+    for phrase in phrases:
+        if phrase in clips:
+            continue
+        audio_path = None
+        try:
+            audio_path = await tts_engine.async_generate_audio(
+                text=phrase, file_name_no_ext=f"filler_{uuid.uuid4().hex[:8]}"
+            )
+            clips[phrase] = await prepare_audio_payload(audio_path=audio_path)
+        except Exception as e:
+            logger.warning(f"Failed to synthesize filler clip '{phrase}': {e}")
+            # Don't retry on every turn
+            clips[phrase] = None
+        finally:
+            if audio_path:
+                tts_engine.remove_file(audio_path, verbose=False)
+    logger.debug(
+        f"Filler clips ready for {type(tts_engine).__name__}: "
+        f"{[phrase for phrase, clip in clips.items() if clip]}"
+    )
+
+
+def prepare_filler_clips(tts_engine: TTSInterface, phrases: List[str]) -> None:
+    """Start synthesizing the clips of an engine in the background if needed."""
+    clips = _clips.get(tts_engine, {})
+    task = _synthesis_tasks.get(tts_engine)
+    if any(phrase not in clips for phrase in phrases) and (
+        task is None or task.done()
+    ):
+        _synthesis_tasks[tts_engine] = asyncio.create_task(
+            _synthesize(tts_engine, phrases)
+        )
+
+
+def get_filler_payload(tts_engine: TTSInterface, phrases: List[str]) -> Optional[dict]:
+    """Return the audio payload of a random filler phrase, or None if none is ready."""
+    clips = _clips.get(tts_engine, {})
+    available = [clips[phrase] for phrase in phrases if clips.get(phrase)]
+    return dict(random.choice(available)) if available else None
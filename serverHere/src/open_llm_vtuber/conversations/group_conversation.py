@@ -366,6 +366,9 @@ async def process_member_response(
                     logger.warning(
                         "Cannot broadcast tool status: broadcast_func or group_members missing."
                     )
+            elif isinstance(output_item, dict) and output_item.get("type") == "error":
+                # LLM errors are shown, not spoken or stored as a reply
+                await current_ws_send(json.dumps(output_item))
             elif isinstance(output_item, (SentenceOutput, AudioOutput)):
                 # Handle SentenceOutput or AudioOutput: Send to current user, broadcast audio later if needed
                 response_part = await process_agent_output(
@@ -0,0 +1,212 @@
+"""Proactive speech prepared while a session is idle.
+
+After a conversation turn, the next proactive utterance is generated in the
+background with the proactive speak prompt and synthesized to audio. When the
+client sends `ai-speak-signal`, the prepared audio is played right away
+instead of waiting for the LLM and TTS. The prepared speech is dropped as soon
+as the conversation moves on, because it was generated from the old memory.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import ClassVar, Dict, List, Optional
+
+from loguru import logger
+
+from ..agent.output_types import SentenceOutput
+from ..chat_history_manager import store_message
+from ..message_handler import message_handler
+from .conversation_utils import (
+    create_batch_input,
+    handle_sentence_output,
+    send_conversation_start_signals,
+    send_conversation_end_signal,
+)
+from .tts_manager import TTSTaskManager
+from .types import WebSocketSend
+from prompts import prompt_loader
+
+PROACTIVE_SPEAK_METADATA = {
+    "proactive_speak": True,
+    "skip_memory": True,  # Skip storing in AI's internal memory
+    "skip_history": True,  # Skip storing in local conversation history
+}
+
+
+def load_proactive_speak_prompt(context) -> str:
+    """Load the proactive speak prompt configured for a context."""
+    try:
+        prompt_file = context.system_config.tool_prompts.get("proactive_speak_prompt")
+        if prompt_file:
+            return prompt_loader.load_util(prompt_file)
+        logger.warning("Proactive speak prompt not configured, using default")
+    except Exception as e:
+        logger.error(f"Error loading proactive speak prompt: {e}")
+    return "Please say something."
+
+
+@dataclass
+class PreparedSpeech:
+    """A proactive utterance synthesized in advance."""
+
+    text: str
+    # Audio payloads as sent to the client, in order
+    payloads: List[str]
+    agent: object
+    memory_version: tuple
+    created_at: float
+
+
+class ProactiveSpeechCache:
+    """Prepares and holds the next proactive utterance of one client."""
+
+    _caches: ClassVar[Dict[str, "ProactiveSpeechCache"]] = {}
+
+    @classmethod
+    def get(cls, client_uid: str) -> "ProactiveSpeechCache":
+        if client_uid not in cls._caches:
+            cls._caches[client_uid] = cls()
+        return cls._caches[client_uid]
+
+    @classmethod
+    def remove(cls, client_uid: str) -> None:
+        cache = cls._caches.pop(client_uid, None)
+        if cache:
+            cache.invalidate()
+
+    def __init__(self, idle_delay: float = 2.0):
+        """
+        Args:
+            idle_delay: Seconds to wait after a turn before preparing, so a
+                quick follow-up from the user doesn't start wasted work
+        """
+        self.idle_delay = idle_delay
+        self._task: Optional[asyncio.Task] = None
+        self._prepared: Optional[PreparedSpeech] = None
+
+    def invalidate(self) -> None:
+        """Drop the prepared speech and stop preparing a new one."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._prepared = None
+
+    def schedule(self, context) -> None:
+        """Prepare the next proactive utterance in the background."""
+        self.invalidate()
+        if not getattr(context.system_config, "pregenerate_proactive_speech", False):
+            return
+        if not hasattr(context.agent_engine, "fork"):
+            return
+        self._task = asyncio.create_task(self._prepare(context))
+
+    def take(self, context) -> Optional[PreparedSpeech]:
+        """Return the prepared speech if it still matches the conversation."""
+        prepared, self._prepared = self._prepared, None
+        self.invalidate()
+        if prepared is None:
+            return None
+        agent = context.agent_engine
+        if prepared.agent is not agent or prepared.memory_version != agent.memory_version:
+            logger.debug("Prepared proactive speech is outdated. Discarding it.")
+            return None
+        return prepared
+
+    async def _prepare(self, context) -> None:
+        await asyncio.sleep(self.idle_delay)
+        agent = context.agent_engine
+        memory_version = agent.memory_version
+        start = time.perf_counter()
+
+        payloads: List[str] = []
+
+        async def collect(payload: str) -> None:
+            payloads.append(payload)
+
+        tts_manager = TTSTaskManager(
+            volume_encoding=getattr(context, "volume_encoding", "float")
+        )
+        text = ""
+        try:
+            batch_input = create_batch_input(
+                input_text=load_proactive_speak_prompt(context),
+                images=None,
+                from_name=context.character_config.human_name,
+                metadata=dict(PROACTIVE_SPEAK_METADATA),
+            )
+            async for output in agent.fork().chat(batch_input):
+                if not isinstance(output, SentenceOutput):
+                    continue
+                output.display_text.name = context.character_config.character_name
+                output.display_text.avatar = context.character_config.avatar
+                text += await handle_sentence_output(
+                    output,
+                    context.live2d_model,
+                    context.tts_engine,
+                    collect,
+                    tts_manager,
+                    context.translate_engine,
+                )
+            await tts_manager.wait_until_sent()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to prepare proactive speech: {e}")
+            return
+        finally:
+            tts_manager.clear()
+
+        if not text or agent.memory_version != memory_version:
+            return
+        self._prepared = PreparedSpeech(
+            text=text,
+            payloads=payloads,
+            agent=agent,
+            memory_version=memory_version,
+            created_at=time.monotonic(),
+        )
+        logger.info(
+            f"Prepared proactive speech in {time.perf_counter() - start:.2f}s: {text}"
+        )
+
+
+async def play_prepared_speech(
+    context,
+    websocket_send: WebSocketSend,
+    client_uid: str,
+    prepared: PreparedSpeech,
+) -> str:
+    """Play a prepared proactive utterance as a conversation turn."""
+    await send_conversation_start_signals(websocket_send)
+    logger.info(f"Playing prepared proactive speech: {prepared.text}")
+    for payload in prepared.payloads:
+        await websocket_send(payload)
+    await websocket_send(json.dumps({"type": "backend-synth-complete"}))
+
+    # The prompt is skipped in memory and history like a live proactive turn,
+    # the reply is kept once it has been played
+    context.agent_engine.record_response(prepared.text)
+    if context.history_uid:
+        store_message(
+            conf_uid=context.character_config.conf_uid,
+            history_uid=context.history_uid,
+            role="ai",
+            content=prepared.text,
+            name=context.character_config.character_name,
+            avatar=context.character_config.avatar,
+        )
+
+    if prepared.payloads:
+        response = await message_handler.wait_for_response(
+            client_uid, "frontend-playback-complete"
+        )
+        if not response:
+            logger.warning(f"No playback completion response from {client_uid}")
+            return prepared.text
+
+    await websocket_send(json.dumps({"type": "force-new-message"}))
+    await send_conversation_end_signal(websocket_send, None)
+    ProactiveSpeechCache.get(client_uid).schedule(context)
+    return prepared.text
@@ -15,11 +15,14 @@ from .conversation_utils import (
 )
 from .types import WebSocketSend
 from .tts_manager import TTSTaskManager
+from .proactive_speech import ProactiveSpeechCache
+from .filler_audio import get_filler_payload, prepare_filler_clips
 from ..chat_history_manager import store_message
 from ..service_context import ServiceContext
 
 # Import necessary types from agent outputs
 from ..agent.output_types import SentenceOutput, AudioOutput
+from ..agent.text_delta import TextDeltaStream, text_delta_sink
 
 
 async def process_single_conversation(
@@ -36,14 +39,31 @@ async def process_single_conversation(
         session_emoji = np.random.choice(EMOJI_LIST)
     
     # Create TTSTaskManager for this conversation
-    tts_manager = TTSTaskManager()
+    tts_manager = TTSTaskManager(
+        volume_encoding=getattr(context, "volume_encoding", "float")
+    )
     full_response = ""  # Initialize full_response here
+    text_deltas: Optional[TextDeltaStream] = None
+    text_delta_token = None
 
     try:
         # Send initial signals
         await send_conversation_start_signals(websocket_send)
         logger.info(f"New Conversation Chain {session_emoji} started!")
 
+        # Fill a slow start with a short acknowledgement, but not before
+        # the AI speaks up on its own
+        filler_delay_ms = context.character_config.filler_delay_ms
+        filler_phrases = context.character_config.filler_phrases
+        use_filler = (
+            filler_delay_ms > 0
+            and filler_phrases
+            and not (metadata and metadata.get("proactive_speak"))
+        )
+        if use_filler:
+            # Synthesize the clips while the user input is transcribed
+            prepare_filler_clips(context.tts_engine, filler_phrases)
+
         # Process user input
         input_text = await process_user_input(
             user_input, context.asr_engine, websocket_send
@@ -75,6 +95,22 @@ async def process_single_conversation(
         if images:
             logger.info(f"With {len(images)} images")
 
+        # Preview the reply text while it is generated, if the client asked for it
+        if getattr(context, "text_delta_enabled", False):
+            text_deltas = TextDeltaStream(
+                websocket_send,
+                context.live2d_model.emo_map.keys() if context.live2d_model else (),
+            )
+            text_delta_token = text_delta_sink.set(text_deltas)
+
+        if use_filler:
+            # Time the LLM's first sentence only, not the transcription
+            tts_manager.schedule_filler(
+                lambda: get_filler_payload(context.tts_engine, filler_phrases),
+                filler_delay_ms / 1000,
+                websocket_send,
+            )
+
         try:
             # agent.chat yields Union[SentenceOutput, Dict[str, Any]]
             agent_output_stream = context.agent_engine.chat(batch_input)
@@ -90,6 +126,10 @@ async def process_single_conversation(
 
                     await websocket_send(json.dumps(output_item))
 
+                elif isinstance(output_item, dict) and output_item.get("type") == "error":
+                    # LLM errors are shown, not spoken or stored as a reply
+                    await websocket_send(json.dumps(output_item))
+
                 elif isinstance(output_item, (SentenceOutput, AudioOutput)):
                     # Handle SentenceOutput or AudioOutput
                     response_part = await process_agent_output(
@@ -127,6 +167,9 @@ async def process_single_conversation(
             # full_response will contain partial response before error
         # --- End processing agent response ---
 
+        if text_deltas:
+            await text_deltas.close()
+
         # Wait for any pending TTS tasks
         if tts_manager.task_list:
             await asyncio.gather(*tts_manager.task_list)
@@ -149,6 +192,7 @@ async def process_single_conversation(
             )
             logger.info(f"AI response: {full_response}")
 
+        ProactiveSpeechCache.get(client_uid).schedule(context)
         return full_response  # Return accumulated full_response
 
     except asyncio.CancelledError:
@@ -161,4 +205,8 @@ async def process_single_conversation(
         )
         raise
     finally:
+        if text_deltas:
+            text_deltas.cancel()
+        if text_delta_token is not None:
+            text_delta_sink.reset(text_delta_token)
         cleanup_conversation(tts_manager, session_emoji)
@@ -1,22 +1,33 @@
 import asyncio
 import json
 import re
+import time
 import uuid
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict
 from loguru import logger
 
 from ..agent.output_types import DisplayText, Actions
 from ..live2d_model import Live2dModel
 from ..tts.tts_interface import TTSInterface
-from ..utils.stream_audio import prepare_audio_payload
+from ..utils.stream_audio import (
+    VolumeEncoding,
+    encode_payload_volumes,
+    prepare_audio_payload,
+)
+from ..utils.segmentation_policy import segmentation_stats
 from .types import WebSocketSend
 
 
 class TTSTaskManager:
     """Manages TTS tasks and ensures ordered delivery to frontend while allowing parallel TTS generation"""
 
-    def __init__(self) -> None:
+    def __init__(self, volume_encoding: VolumeEncoding = "float") -> None:
+        """
+        Args:
+            volume_encoding: Encoding of the lip-sync volumes sent to the client
+        """
+        self.volume_encoding = volume_encoding
         self.task_list: List[asyncio.Task] = []
         self._lock = asyncio.Lock()
         # Queue to store ordered payloads
@@ -26,6 +37,49 @@ class TTSTaskManager:
         # Counter for maintaining order
         self._sequence_counter = 0
         self._next_sequence_to_send = 0
+        self._filler_task: Optional[asyncio.Task] = None
+
+    def schedule_filler(
+        self,
+        get_payload: Callable[[], Optional[Dict]],
+        delay: float,
+        websocket_send: WebSocketSend,
+    ) -> None:
+        """
+        Play a filler clip if no sentence has been queued after `delay` seconds.
+
+        The clip takes the first place in the delivery order, so it always plays
+        before the real sentences. It is skipped if a sentence arrives in time.
+
+        Args:
+            get_payload: Returns a ready audio payload, or None to skip the filler
+            delay: Seconds to wait for the first sentence
+            websocket_send: WebSocket send function
+        """
+
+        async def play_filler() -> None:
+            await asyncio.sleep(delay)
+            if self._sequence_counter:
+                return
+            payload = get_payload()
+            if not payload:
+                return
+            current_sequence = self._sequence_counter
+            self._sequence_counter += 1
+            if not self._sender_task or self._sender_task.done():
+                self._sender_task = asyncio.create_task(
+                    self._process_payload_queue(websocket_send)
+                )
+            logger.debug(f"No sentence after {delay:.2f}s, playing filler audio")
+            await self._payload_queue.put((payload, current_sequence))
+
+        self._cancel_filler()
+        self._filler_task = asyncio.create_task(play_filler())
+
+    def _cancel_filler(self) -> None:
+        if self._filler_task and not self._filler_task.done():
+            self._filler_task.cancel()
+        self._filler_task = None
 
     async def speak(
         self,
@@ -47,6 +101,7 @@ class TTSTaskManager:
             tts_engine: TTS engine instance
             websocket_send: WebSocket send function
         """
+        self._cancel_filler()
         if len(re.sub(r'[\s.,!?，。！？\'"』」）】\s]+', "", tts_text)) == 0:
             logger.debug("Empty TTS text, sending silent display payload")
             # Get current sequence number for silent payload
@@ -105,7 +160,11 @@ class TTSTaskManager:
                 # Send payloads in order
                 while self._next_sequence_to_send in buffered_payloads:
                     next_payload = buffered_payloads.pop(self._next_sequence_to_send)
-                    await websocket_send(json.dumps(next_payload))
+                    await websocket_send(
+                        json.dumps(
+                            encode_payload_volumes(next_payload, self.volume_encoding)
+                        )
+                    )
                     self._next_sequence_to_send += 1
 
                 self._payload_queue.task_done()
@@ -139,7 +198,9 @@ class TTSTaskManager:
         """Process TTS generation and queue the result for ordered delivery"""
         audio_file_path = None
         try:
+            start_time = time.perf_counter()
             audio_file_path = await self._generate_audio(tts_engine, tts_text)
+            segmentation_stats.record_tts_latency(time.perf_counter() - start_time)
             payload = await prepare_audio_payload(
                 audio_path=audio_file_path,
                 display_text=display_text,
@@ -171,8 +232,15 @@ class TTSTaskManager:
             file_name_no_ext=f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}",
         )
 
+    async def wait_until_sent(self) -> None:
+        """Wait until every queued payload has been synthesized and sent."""
+        if self.task_list:
+            await asyncio.gather(*self.task_list)
+        await self._payload_queue.join()
+
     def clear(self) -> None:
         """Clear all pending tasks and reset state"""
+        self._cancel_filler()
         self.task_list.clear()
         if self._sender_task:
             self._sender_task.cancel()
@@ -1,4 +1,4 @@
-from typing import List, Dict, Callable, Optional, TypedDict, Awaitable, ClassVar
+from typing import List, Dict, Callable, Optional, TypedDict, Awaitable, ClassVar, Union
 from dataclasses import dataclass, field
 from pydantic import BaseModel
 
@@ -14,7 +14,9 @@ class AudioPayload(TypedDict):
 
     type: str
     audio: Optional[str]
-    volumes: Optional[List[float]]
+    # Floats, or a compact form named by volume_encoding
+    volumes: Optional[Union[List[float], List[int], str]]
+    volume_encoding: Optional[str]
     slice_length: Optional[int]
     display_text: Optional[DisplayText]
     actions: Optional[Actions]
@@ -0,0 +1,18 @@
+from .history_storage_interface import HistoryStorageInterface
+
+
+class HistoryStorageFactory:
+    @staticmethod
+    def get_history_storage(storage_type: str, **kwargs) -> HistoryStorageInterface:
+        if storage_type == "json":
+            from .json_history_storage import JSONHistoryStorage
+
+            return JSONHistoryStorage(base_dir=kwargs.get("base_dir", "chat_history"))
+        elif storage_type == "sqlite":
+            from .sqlite_history_storage import SQLiteHistoryStorage
+
+            return SQLiteHistoryStorage(
+                db_path=kwargs.get("db_path", "chat_history/history.db")
+            )
+        else:
+            raise ValueError(f"Unknown history storage type: {storage_type}")
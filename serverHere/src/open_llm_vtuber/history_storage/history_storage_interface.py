@@ -0,0 +1,162 @@
+import abc
+from datetime import datetime
+from typing import List, Literal, Optional, TypedDict
+
+
+class HistoryMessage(TypedDict):
+    role: Literal["human", "ai"]
+    timestamp: str
+    content: str
+    # Optional display information for the message
+    name: Optional[str]
+    avatar: Optional[str]
+
+
+class HistoryPage(TypedDict):
+    # Messages of the page, oldest first
+    messages: List[HistoryMessage]
+    # Cursor to pass as `before` to get the previous page, None on the first page
+    before: Optional[str]
+
+
+class HistorySearchResult(TypedDict):
+    history_uid: str
+    message: HistoryMessage
+
+
+def new_message(
+    role: Literal["human", "ai"],
+    content: str,
+    name: str | None = None,
+    avatar: str | None = None,
+) -> HistoryMessage:
+    """Build a message stamped with the current time"""
+    message = {
+        "role": role,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "content": content,
+    }
+    # Add optional display information if provided
+    if name is not None:
+        message["name"] = name
+    if avatar is not None:
+        message["avatar"] = avatar
+    return message
+
+
+class HistoryStorageInterface(metaclass=abc.ABCMeta):
+    """
+    Storage of chat histories.
+
+    Histories are grouped by the conf_uid of the character they belong to and
+    identified by a history_uid. Each history has a metadata dict and a list
+    of messages in the order they were stored.
+    """
+
+    @abc.abstractmethod
+    def create_new_history(self, conf_uid: str) -> str:
+        """Create an empty history and return its history_uid, or "" on failure"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def append_messages(
+        self, conf_uid: str, history_uid: str, messages: List[HistoryMessage]
+    ) -> None:
+        """Append messages to a history in one write, creating the history if needed"""
+        raise NotImplementedError
+
+    def store_message(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        role: Literal["human", "ai"],
+        content: str,
+        name: str | None = None,
+        avatar: str | None = None,
+    ) -> None:
+        """Append a message to a history, creating the history if needed"""
+        self.append_messages(
+            conf_uid, history_uid, [new_message(role, content, name, avatar)]
+        )
+
+    @abc.abstractmethod
+    def get_metadata(self, conf_uid: str, history_uid: str) -> dict:
+        """Return the metadata of a history, or {} if it does not exist"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update_metadata(self, conf_uid: str, history_uid: str, metadata: dict) -> bool:
+        """Merge fields into the metadata of a history"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_history(self, conf_uid: str, history_uid: str) -> List[HistoryMessage]:
+        """Return all messages of a history, oldest first"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_history_tail(
+        self, conf_uid: str, history_uid: str, count: int
+    ) -> List[HistoryMessage]:
+        """Return the last `count` messages of a history, oldest first"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_history_page(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        limit: int,
+        before: Optional[str] = None,
+    ) -> HistoryPage:
+        """
+        Return up to `limit` messages that were stored before the cursor, or the
+        latest messages if no cursor is given.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def search_history(
+        self,
+        conf_uid: str,
+        query: str,
+        limit: int = 20,
+        history_uid: Optional[str] = None,
+    ) -> List[HistorySearchResult]:
+        """Find messages containing the query, newest first"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_history_list(self, conf_uid: str) -> List[dict]:
+        """
+        Return the non-empty histories of a conf with their latest message,
+        newest first.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete_history(self, conf_uid: str, history_uid: str) -> bool:
+        """Delete a history"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def modify_latest_message(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        role: Literal["human", "ai", "system"],
+        new_content: str,
+    ) -> bool:
+        """Replace the content of the latest message if it has the given role"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def rename_history(
+        self, conf_uid: str, old_history_uid: str, new_history_uid: str
+    ) -> bool:
+        """Give a history a new history_uid"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the resources of the storage"""
+        pass
@@ -0,0 +1,182 @@
+"""Write-behind queue for chat history messages.
+
+`store_message` is called in the middle of conversation turns. With a writer
+running, messages are stamped and queued instead of written, and a background
+thread appends them to the storage in batches, one write per history. Reads
+through `chat_history_manager` wait for the queue to drain first, so they
+always see every stored message; call them off the event loop.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Literal, Optional, Tuple
+
+from loguru import logger
+
+from .history_storage_interface import HistoryMessage, HistoryStorageInterface
+
+# When queued messages are written:
+# - "immediate": at once by the caller, without a queue
+# - "turn": at the end of every conversation turn, and at least every flush interval
+# - "interval": every flush interval
+WritePolicy = Literal["immediate", "turn", "interval"]
+
+
+@dataclass
+class HistoryWriterMetrics:
+    """Queue and flush metrics of the history writer."""
+
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    flushes: int = 0
+    messages_written: int = 0
+    failed_messages: int = 0
+    # Messages submitted while the queue was over its size limit
+    overflowed_messages: int = 0
+    # Moving average and maximum of the time spent writing one batch
+    flush_latency_avg_seconds: float = 0.0
+    flush_latency_max_seconds: float = 0.0
+
+    def record_flush(self, messages: int, seconds: float, alpha: float = 0.2):
+        self.flushes += 1
+        self.messages_written += messages
+        self.flush_latency_avg_seconds += alpha * (
+            seconds - self.flush_latency_avg_seconds
+        )
+        self.flush_latency_max_seconds = max(self.flush_latency_max_seconds, seconds)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for logging and JSON serialization"""
+        return asdict(self)
+
+
+_Entry = Tuple[str, str, HistoryMessage]
+
+
+class HistoryWriter:
+    """Appends queued history messages to a storage on a background thread."""
+
+    def __init__(
+        self,
+        storage: HistoryStorageInterface,
+        policy: WritePolicy = "turn",
+        flush_interval: float = 1.0,
+        max_queue: int = 1000,
+    ):
+        """
+        Args:
+            storage: Storage the messages are written to
+            policy: When queued messages are written, see `WritePolicy`
+            flush_interval: Longest time in seconds a message stays queued
+            max_queue: Queued messages before a flush is forced. `submit` never
+                blocks: messages over the limit are still queued and counted
+                as overflowed.
+        """
+        self.storage = storage
+        self.policy = policy
+        self.flush_interval = flush_interval
+        self.metrics = HistoryWriterMetrics()
+        self.max_queue = max(max_queue, 1)
+        # Unbounded, so the event loop never waits for the disk in `submit`
+        self._queue: "queue.Queue[_Entry]" = queue.Queue()
+        self._flush_requested = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="history-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, conf_uid: str, history_uid: str, message: HistoryMessage) -> None:
+        """Queue a message. Never blocks."""
+        if self._closed and not self._thread.is_alive():
+            self.storage.append_messages(conf_uid, history_uid, [message])
+            return
+        self._queue.put_nowait((conf_uid, history_uid, message))
+        depth = self._queue.qsize()
+        if depth > self.max_queue:
+            if not self.metrics.overflowed_messages:
+                logger.warning(
+                    f"History write queue is over {self.max_queue} messages. "
+                    "The disk is not keeping up."
+                )
+            self.metrics.overflowed_messages += 1
+            self._flush_requested.set()
+        self.metrics.queue_depth = depth
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, depth)
+
+    def request_flush(self) -> None:
+        """Ask for queued messages to be written now, without waiting."""
+        self._flush_requested.set()
+
+    def flush(self) -> None:
+        """Write queued messages and wait until they are written."""
+        self._flush_requested.set()
+        self._queue.join()
+
+    def turn_ended(self) -> None:
+        """Called when a conversation turn ends."""
+        if self.policy == "turn":
+            self.request_flush()
+
+    def _drain(self) -> List[_Entry]:
+        entries = []
+        while True:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                return entries
+
+    def _write(self, entries: List[_Entry]) -> None:
+        # One append per history, keeping the order of the messages
+        batches: Dict[Tuple[str, str], List[HistoryMessage]] = {}
+        for conf_uid, history_uid, message in entries:
+            batches.setdefault((conf_uid, history_uid), []).append(message)
+
+        start = time.perf_counter()
+        written = 0
+        for (conf_uid, history_uid), messages in batches.items():
+            try:
+                self.storage.append_messages(conf_uid, history_uid, messages)
+                written += len(messages)
+            except Exception as e:
+                self.metrics.failed_messages += len(messages)
+                logger.error(
+                    f"Failed to write {len(messages)} message(s) to history "
+                    f"{history_uid}: {e}"
+                )
+        self.metrics.record_flush(written, time.perf_counter() - start)
+
+    def _run(self) -> None:
+        while True:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            entries = self._drain()
+            if entries:
+                try:
+                    self._write(entries)
+                finally:
+                    for _ in entries:
+                        self._queue.task_done()
+                self.metrics.queue_depth = self._queue.qsize()
+            if self._closed and self._queue.empty():
+                return
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Write the remaining messages and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_requested.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("History writer did not finish writing in time")
+            return
+        # Messages submitted while the thread was stopping
+        entries = self._drain()
+        if entries:
+            self._write(entries)
+            for _ in entries:
+                self._queue.task_done()
+        logger.debug(f"History writer stopped. {self.metrics.to_dict()}")
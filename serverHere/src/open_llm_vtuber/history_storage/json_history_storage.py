@@ -0,0 +1,774 @@
+"""Chat history stored as JSON Lines files.
+
+Each history is a JSON Lines file: the first line is a metadata header and
+every following line is one message. Messages are appended without reading
+or rewriting the file, and the latest messages are read from the end of the
+file, so the cost of storing and listing does not grow with the length of a
+chat. Histories in the older format, one JSON array per file, are converted
+on first access.
+
+Every conf directory also has an index with the message count and latest
+message of each history, kept up to date as messages are stored, so the
+history list is built without opening every file. The index is kept in
+memory and written to disk at most every few seconds and on close, so
+storing a message does not rewrite the entries of every history. The index
+is only a cache: entries whose file changed since they were written are
+rescanned, and it is rebuilt from the history files if it is missing or
+unreadable.
+"""
+
+import os
+import re
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, Literal, List, Optional, Set, Tuple
+from loguru import logger
+
+from .history_storage_interface import (
+    HistoryMessage,
+    HistoryPage,
+    HistorySearchResult,
+    HistoryStorageInterface,
+)
+
+HISTORY_FORMAT_VERSION = 1
+_HISTORY_EXT = ".jsonl"
+_LEGACY_EXT = ".json"
+# Block size for reading a history file backwards
+_TAIL_BLOCK_SIZE = 8192
+_INDEX_FILENAME = "history_index.idx"
+_INDEX_VERSION = 1
+# Characters of the latest message kept in the index
+_PREVIEW_CHARS = 200
+# Minimum seconds between two writes of the index of a conf
+_INDEX_SAVE_INTERVAL = 5.0
+
+
+def _is_safe_filename(filename: str) -> bool:
+    """Validate filename for safety and allowed characters"""
+    if not filename or len(filename) > 255:
+        return False
+
+    # Allow alphanumeric, hyphen, underscore, and common unicode characters
+    # Block any filesystem special characters, control characters, and path separators
+    pattern = re.compile(r"^[\w\-_\u0020-\u007E\u00A0-\uFFFF]+$")
+    return bool(pattern.match(filename))
+
+
+def _sanitize_path_component(component: str) -> str:
+    """Sanitize and validate a path component"""
+    # Remove any path components, get just the basename
+    sanitized = os.path.basename(component.strip())
+
+    if not _is_safe_filename(sanitized):
+        raise ValueError(f"Invalid characters in path component: {component}")
+
+    return sanitized
+
+
+def _new_header(**fields: Any) -> dict:
+    header = {
+        "role": "metadata",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "format_version": HISTORY_FORMAT_VERSION,
+    }
+    header.update(fields)
+    return header
+
+
+def _dump_line(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _parse_line(line: bytes | str) -> Optional[dict]:
+    """Parse one line, skipping blank lines and lines torn by a crash."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        logger.warning("Skipping unreadable line in history file")
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _write_file_atomic(filepath: str, records: List[dict]) -> None:
+    """Write a whole history file so that a crash leaves the old or the new one."""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(_dump_line(record) for record in records)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+def _append_records(filepath: str, records: List[dict]) -> None:
+    """Append records to a history file in one write, flushed to disk."""
+    with open(filepath, "ab") as f:
+        # A crash during the previous append may have left a partial line
+        if f.tell() > 0:
+            with open(filepath, "rb") as r:
+                r.seek(-1, os.SEEK_END)
+                if r.read(1) != b"\n":
+                    f.write(b"\n")
+        f.write("".join(_dump_line(record) for record in records).encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _iter_lines_reversed(
+    filepath: str, end: Optional[int] = None
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield the lines of a file before byte offset `end` from last to first,
+    with the offset each line starts at, without reading all of the file.
+    """
+    with open(filepath, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell() if end is None else min(end, f.tell())
+        remainder = b""
+        while position > 0:
+            read_size = min(_TAIL_BLOCK_SIZE, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+            lines = block.split(b"\n")
+            # The first piece may be the end of a line that starts further back
+            remainder = lines.pop(0)
+            line_end = position + len(block)
+            for line in reversed(lines):
+                line_end -= len(line)
+                yield line_end, line
+                # Step over the newline before this line
+                line_end -= 1
+        yield 0, remainder
+
+
+def _read_records(filepath: str) -> List[dict]:
+    records = []
+    with open(filepath, "rb") as f:
+        for line in f:
+            record = _parse_line(line)
+            if record is not None:
+                records.append(record)
+    return records
+
+
+def _read_header(filepath: str) -> Optional[dict]:
+    with open(filepath, "rb") as f:
+        record = _parse_line(f.readline())
+    if record and record.get("role") == "metadata":
+        return record
+    return None
+
+
+def _preview(message: dict) -> dict:
+    preview = dict(message)
+    content = preview.get("content")
+    if isinstance(content, str) and len(content) > _PREVIEW_CHARS:
+        preview["content"] = content[:_PREVIEW_CHARS]
+    return preview
+
+
+def _file_state(filepath: str) -> dict:
+    stat = os.stat(filepath)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _scan_index_entry(filepath: str) -> dict:
+    """Build the index entry of a history by reading its file."""
+    messages = [r for r in _read_records(filepath) if r.get("role") != "metadata"]
+    latest = _preview(messages[-1]) if messages else None
+    return {
+        "message_count": len(messages),
+        "latest_message": latest,
+        "timestamp": latest["timestamp"] if latest else None,
+        **_file_state(filepath),
+    }
+
+
+def _last_line_offset(filepath: str) -> Optional[int]:
+    """Byte offset where the last non-empty line of a file starts."""
+    for offset, line in _iter_lines_reversed(filepath):
+        if line.strip():
+            return offset
+    return None
+
+
+class JSONHistoryStorage(HistoryStorageInterface):
+    """Stores each history in its own JSON Lines file, in a folder per conf."""
+
+    def __init__(self, base_dir: str = "chat_history"):
+        self.base_dir = base_dir
+        # The history list is built on a worker thread while messages are stored.
+        # Held across a change of a history file and the index update for it.
+        self._index_lock = threading.RLock()
+        # Index of each conf, and the confs whose index changed since it was written
+        self._indexes: Dict[str, dict] = {}
+        self._unsaved_indexes: Set[str] = set()
+        self._index_saved_at: Dict[str, float] = {}
+
+    def _ensure_conf_dir(self, conf_uid: str) -> str:
+        """Ensure the directory for a specific conf exists and return its path"""
+        if not conf_uid:
+            raise ValueError("conf_uid cannot be empty")
+
+        safe_conf_uid = _sanitize_path_component(conf_uid)
+        conf_dir = os.path.join(self.base_dir, safe_conf_uid)
+        os.makedirs(conf_dir, exist_ok=True)
+        return conf_dir
+
+    def _get_safe_history_path(
+        self, conf_uid: str, history_uid: str, ext: str = _HISTORY_EXT
+    ) -> str:
+        """Get sanitized path for history file"""
+        safe_conf_uid = _sanitize_path_component(conf_uid)
+        safe_history_uid = _sanitize_path_component(history_uid)
+        conf_dir = os.path.normpath(os.path.join(self.base_dir, safe_conf_uid))
+        full_path = os.path.normpath(
+            os.path.join(conf_dir, f"{safe_history_uid}{ext}")
+        )
+        if not full_path.startswith(conf_dir):
+            raise ValueError("Invalid path: Path traversal detected")
+        return full_path
+
+    def _migrate_legacy_history(self, conf_uid: str, history_uid: str) -> None:
+        """Convert a history stored as one JSON array to JSON Lines."""
+        legacy_path = self._get_safe_history_path(conf_uid, history_uid, _LEGACY_EXT)
+        if not os.path.exists(legacy_path):
+            return
+        filepath = self._get_safe_history_path(conf_uid, history_uid)
+        if os.path.exists(filepath):
+            # A previous migration finished but could not remove the old file
+            os.remove(legacy_path)
+            return
+
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                history_data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to read legacy history file {legacy_path}: {e}")
+            return
+
+        if history_data and history_data[0].get("role") == "metadata":
+            header = _new_header(**history_data[0])
+            header["format_version"] = HISTORY_FORMAT_VERSION
+            messages = history_data[1:]
+        else:
+            header = _new_header()
+            messages = history_data
+        # Metadata entries were only ever expected first
+        messages = [msg for msg in messages if msg.get("role") != "metadata"]
+
+        _write_file_atomic(filepath, [header, *messages])
+        os.remove(legacy_path)
+        logger.info(f"Migrated history {history_uid} to JSON Lines")
+
+    def _history_path(self, conf_uid: str, history_uid: str) -> str:
+        """Path of a history file, converting a legacy file first if needed."""
+        self._migrate_legacy_history(conf_uid, history_uid)
+        return self._get_safe_history_path(conf_uid, history_uid)
+
+    def _list_history_uids(self, conf_dir: str) -> List[str]:
+        uids = set()
+        for filename in os.listdir(conf_dir):
+            for ext in (_HISTORY_EXT, _LEGACY_EXT):
+                if filename.endswith(ext):
+                    uids.add(filename[: -len(ext)])
+        return sorted(uids)
+
+    # ==== Index
+
+    def _index_path(self, conf_uid: str) -> str:
+        return os.path.join(self._ensure_conf_dir(conf_uid), _INDEX_FILENAME)
+
+    def _load_index(self, conf_uid: str) -> Optional[dict]:
+        """Read the history index of a conf, or None if it must be rebuilt."""
+        path = self._index_path(conf_uid)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") != _INDEX_VERSION or not isinstance(
+                index.get("histories"), dict
+            ):
+                raise ValueError("unexpected index format")
+            return index
+        except Exception as e:
+            logger.warning(
+                f"History index of {conf_uid} is unreadable, rebuilding: {e}"
+            )
+            return None
+
+    def _save_index(self, conf_uid: str, index: dict) -> None:
+        path = self._index_path(conf_uid)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _get_index(self, conf_uid: str) -> Optional[dict]:
+        """The index of a conf, read from disk on first use."""
+        index = self._indexes.get(conf_uid)
+        if index is None:
+            index = self._load_index(conf_uid)
+            if index is not None:
+                self._indexes[conf_uid] = index
+        return index
+
+    def _index_changed(self, conf_uid: str, index: dict) -> None:
+        """Keep a changed index, writing it if it was not written recently."""
+        self._indexes[conf_uid] = index
+        self._unsaved_indexes.add(conf_uid)
+        saved_at = self._index_saved_at.get(conf_uid)
+        if saved_at is None or time.monotonic() - saved_at >= _INDEX_SAVE_INTERVAL:
+            self._flush_index(conf_uid)
+
+    def _flush_index(self, conf_uid: str) -> None:
+        if conf_uid not in self._unsaved_indexes:
+            return
+        self._save_index(conf_uid, self._indexes[conf_uid])
+        self._unsaved_indexes.discard(conf_uid)
+        self._index_saved_at[conf_uid] = time.monotonic()
+
+    def _update_index(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        messages: Optional[List[dict]] = None,
+        replace_latest: bool = False,
+        remove: bool = False,
+    ) -> None:
+        """
+        Apply one change of a history file to the index of its conf.
+
+        Args:
+            messages: Messages that were appended, or the new latest message
+                if `replace_latest` is set
+            remove: The history was deleted
+        """
+        try:
+            with self._index_lock:
+                index = self._get_index(conf_uid)
+                if index is None:
+                    # The next listing rebuilds it from the files
+                    return
+                histories = index["histories"]
+                if remove:
+                    histories.pop(history_uid, None)
+                else:
+                    filepath = self._get_safe_history_path(conf_uid, history_uid)
+                    entry = histories.get(history_uid)
+                    if entry is None:
+                        entry = _scan_index_entry(filepath)
+                    else:
+                        if messages:
+                            if not replace_latest:
+                                entry["message_count"] += len(messages)
+                            entry["latest_message"] = _preview(messages[-1])
+                            entry["timestamp"] = messages[-1].get("timestamp")
+                        entry.update(_file_state(filepath))
+                    histories[history_uid] = entry
+                self._index_changed(conf_uid, index)
+        except Exception as e:
+            logger.warning(f"Failed to update history index of {conf_uid}: {e}")
+
+    # ==== HistoryStorageInterface
+
+    def create_new_history(self, conf_uid: str) -> str:
+        """Create a new history file with a unique ID and return the history_uid"""
+        if not conf_uid:
+            logger.warning("No conf_uid provided")
+            return ""
+
+        # Use uuid.uuid4().hex to generate a UUID without hyphens
+        # New format: UUID_YYYY-MM-DD_HH-MM-SS
+        history_uid = (
+            f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex}"
+        )
+        self._ensure_conf_dir(conf_uid)  # conf_uid is sanitized here
+
+        # Create history file with only the metadata header
+        try:
+            filepath = self._get_safe_history_path(conf_uid, history_uid)
+            _write_file_atomic(filepath, [_new_header()])
+        except Exception as e:
+            logger.error(f"Failed to create new history file: {e}")
+            return ""
+
+        self._update_index(conf_uid, history_uid)
+        logger.debug(f"Created new history file with empty metadata: {filepath}")
+        return history_uid
+
+    def append_messages(
+        self, conf_uid: str, history_uid: str, messages: List[HistoryMessage]
+    ) -> None:
+        """Append messages to a specific history file"""
+        if not conf_uid or not history_uid:
+            if not conf_uid:
+                logger.warning("Missing conf_uid")
+            if not history_uid:
+                logger.warning("Missing history_uid")
+            return
+        if not messages:
+            return
+
+        self._ensure_conf_dir(conf_uid)
+        filepath = self._history_path(conf_uid, history_uid)
+        logger.debug(f"Storing {len(messages)} message(s) to {filepath}")
+
+        # The index entry is updated by adding the new messages, so a listing
+        # must not scan the file between the write and the update
+        with self._index_lock:
+            if not os.path.exists(filepath):
+                _write_file_atomic(filepath, [_new_header(), *messages])
+            else:
+                _append_records(filepath, messages)
+            self._update_index(conf_uid, history_uid, messages)
+        logger.debug("Successfully stored messages")
+
+    def get_metadata(self, conf_uid: str, history_uid: str) -> dict:
+        """Get metadata from history file"""
+        if not conf_uid or not history_uid:
+            return {}
+
+        try:
+            filepath = self._history_path(conf_uid, history_uid)
+            if not os.path.exists(filepath):
+                return {}
+            return _read_header(filepath) or {}
+        except Exception as e:
+            logger.error(f"Failed to get metadata: {e}")
+        return {}
+
+    def update_metadata(self, conf_uid: str, history_uid: str, metadata: dict) -> bool:
+        """Set metadata in history file
+
+        Updates existing metadata with new fields, preserving existing ones.
+        If no metadata exists, creates new metadata entry. The header is the
+        first line, so this rewrites the file, which is rare compared to
+        storing messages.
+        """
+        if not conf_uid or not history_uid:
+            return False
+
+        try:
+            filepath = self._history_path(conf_uid, history_uid)
+            if not os.path.exists(filepath):
+                return False
+
+            records = _read_records(filepath)
+            if records and records[0].get("role") == "metadata":
+                # Update existing metadata while preserving other fields
+                records[0].update(metadata)
+            else:
+                # Create new metadata with timestamp if none exists
+                records.insert(0, _new_header(**metadata))
+
+            _write_file_atomic(filepath, records)
+            self._update_index(conf_uid, history_uid)
+            logger.debug(f"Updated metadata for history {history_uid}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to set metadata: {e}")
+        return False
+
+    def get_history(self, conf_uid: str, history_uid: str) -> List[HistoryMessage]:
+        """Read chat history for the given conf_uid and history_uid"""
+        if not conf_uid or not history_uid:
+            if not conf_uid:
+                logger.warning("Missing conf_uid")
+            if not history_uid:
+                logger.warning("Missing history_uid")
+            return []
+
+        try:
+            filepath = self._history_path(conf_uid, history_uid)
+            if not os.path.exists(filepath):
+                logger.warning(f"History file not found: {filepath}")
+                return []
+            # Filter out metadata
+            return [
+                msg for msg in _read_records(filepath) if msg["role"] != "metadata"
+            ]
+        except Exception as e:
+            logger.error(f"Failed to read history {history_uid}: {e}")
+            return []
+
+    def _read_backwards(
+        self, conf_uid: str, history_uid: str, count: int, end: Optional[int] = None
+    ) -> Tuple[List[HistoryMessage], Optional[int]]:
+        """
+        Read up to `count` messages before byte offset `end`, oldest first,
+        with the offset of the oldest one.
+        """
+        filepath = self._history_path(conf_uid, history_uid)
+        if not os.path.exists(filepath):
+            return [], None
+        messages = []
+        first_offset = None
+        for offset, line in _iter_lines_reversed(filepath, end):
+            record = _parse_line(line)
+            if record is None or record.get("role") == "metadata":
+                continue
+            messages.append(record)
+            first_offset = offset
+            if len(messages) >= count:
+                break
+        messages.reverse()
+        return messages, first_offset
+
+    def get_history_tail(
+        self, conf_uid: str, history_uid: str, count: int
+    ) -> List[HistoryMessage]:
+        """Read the last `count` messages of a history, oldest first.
+
+        Only the end of the file is read, so this is cheap for long histories.
+        """
+        if not conf_uid or not history_uid or count <= 0:
+            return []
+
+        try:
+            return self._read_backwards(conf_uid, history_uid, count)[0]
+        except Exception as e:
+            logger.error(f"Failed to read the end of history {history_uid}: {e}")
+            return []
+
+    def get_history_page(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        limit: int,
+        before: Optional[str] = None,
+    ) -> HistoryPage:
+        """Read a page of messages backwards from the cursor, a byte offset."""
+        if not conf_uid or not history_uid or limit <= 0:
+            return {"messages": [], "before": None}
+
+        try:
+            end = int(before) if before else None
+            messages, first_offset = self._read_backwards(
+                conf_uid, history_uid, limit, end
+            )
+        except Exception as e:
+            logger.error(f"Failed to read a page of history {history_uid}: {e}")
+            return {"messages": [], "before": None}
+
+        # Only the header is left before the first message of the history
+        has_more = len(messages) == limit and first_offset
+        return {
+            "messages": messages,
+            "before": str(first_offset) if has_more else None,
+        }
+
+    def search_history(
+        self,
+        conf_uid: str,
+        query: str,
+        limit: int = 20,
+        history_uid: Optional[str] = None,
+    ) -> List[HistorySearchResult]:
+        """Find messages containing the query by scanning the history files.
+
+        The match is a case-insensitive substring match. Use the SQLite
+        storage for full-text search over large histories.
+        """
+        if not conf_uid or not query:
+            return []
+
+        needle = query.casefold()
+        results = []
+        try:
+            conf_dir = self._ensure_conf_dir(conf_uid)
+            history_uids = (
+                [history_uid] if history_uid else self._list_history_uids(conf_dir)
+            )
+            for uid in history_uids:
+                filepath = self._history_path(conf_uid, uid)
+                if not os.path.exists(filepath):
+                    continue
+                for position, record in enumerate(_read_records(filepath)):
+                    content = record.get("content")
+                    if (
+                        record.get("role") != "metadata"
+                        and isinstance(content, str)
+                        and needle in content.casefold()
+                    ):
+                        results.append(
+                            (
+                                record.get("timestamp", ""),
+                                position,
+                                {"history_uid": uid, "message": record},
+                            )
+                        )
+        except Exception as e:
+            logger.error(f"Failed to search histories of {conf_uid}: {e}")
+
+        results.sort(key=lambda r: r[:2], reverse=True)
+        return [result for _, _, result in results[:limit]]
+
+    def get_history_list(self, conf_uid: str) -> List[dict]:
+        """Get list of histories with their latest messages
+
+        Reads the index of the conf and only opens history files that changed
+        since they were indexed. Empty histories are left out of the list.
+        """
+        if not conf_uid:
+            return []
+
+        try:
+            conf_dir = self._ensure_conf_dir(conf_uid)
+            with self._index_lock:
+                index = self._get_index(conf_uid) or {
+                    "version": _INDEX_VERSION,
+                    "histories": {},
+                }
+                indexed = index["histories"]
+                changed = False
+                histories = {}
+                for history_uid in self._list_history_uids(conf_dir):
+                    try:
+                        filepath = self._history_path(conf_uid, history_uid)
+                        entry = indexed.get(history_uid)
+                        if entry is None or any(
+                            entry.get(key) != value
+                            for key, value in _file_state(filepath).items()
+                        ):
+                            # New, converted or changed outside of this class
+                            entry = _scan_index_entry(filepath)
+                            changed = True
+                        histories[history_uid] = entry
+                    except Exception as e:
+                        logger.error(f"Error reading history {history_uid}: {e}")
+                if changed or len(histories) != len(indexed):
+                    index["histories"] = histories
+                    self._index_changed(conf_uid, index)
+
+                # Entries are updated in place as messages are stored
+                history_list = [
+                    {
+                        "uid": history_uid,
+                        "latest_message": entry["latest_message"],
+                        "timestamp": entry["timestamp"],
+                        "message_count": entry["message_count"],
+                    }
+                    for history_uid, entry in histories.items()
+                    if entry["message_count"] > 0
+                ]
+            history_list.sort(
+                key=lambda x: x["timestamp"] if x["timestamp"] else "", reverse=True
+            )
+            return history_list
+
+        except Exception as e:
+            logger.error(f"Error listing histories: {e}")
+            return []
+
+    def delete_history(self, conf_uid: str, history_uid: str) -> bool:
+        """Delete a specific history file"""
+        if not conf_uid or not history_uid:
+            logger.warning("Missing conf_uid or history_uid")
+            return False
+
+        deleted = False
+        try:
+            for ext in (_HISTORY_EXT, _LEGACY_EXT):
+                filepath = self._get_safe_history_path(conf_uid, history_uid, ext)
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                    logger.debug(f"Successfully deleted history file: {filepath}")
+                    deleted = True
+        except Exception as e:
+            logger.error(f"Failed to delete history file: {e}")
+        self._update_index(conf_uid, history_uid, remove=True)
+        return deleted
+
+    def modify_latest_message(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        role: Literal["human", "ai", "system"],
+        new_content: str,
+    ) -> bool:
+        """Modify the latest message in a specific history file if it matches the given role"""
+        if not conf_uid or not history_uid:
+            logger.warning("Missing conf_uid or history_uid")
+            return False
+
+        try:
+            filepath = self._history_path(conf_uid, history_uid)
+            if not os.path.exists(filepath):
+                logger.warning(f"History file not found: {filepath}")
+                return False
+
+            offset = _last_line_offset(filepath)
+            if offset is None:
+                logger.warning("History is empty")
+                return False
+            with open(filepath, "rb") as f:
+                f.seek(offset)
+                latest_message = _parse_line(f.read())
+
+            if not latest_message or latest_message["role"] != role:
+                logger.warning(
+                    f"Latest message role ({latest_message and latest_message['role']}) "
+                    f"doesn't match requested role ({role})"
+                )
+                return False
+
+            # Only the last line is rewritten
+            latest_message["content"] = new_content
+            with self._index_lock:
+                with open(filepath, "r+b") as f:
+                    f.truncate(offset)
+                    f.seek(offset)
+                    f.write(_dump_line(latest_message).encode("utf-8"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._update_index(
+                    conf_uid, history_uid, [latest_message], replace_latest=True
+                )
+
+            logger.debug(f"Successfully modified latest {role} message")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to modify latest message: {e}")
+            return False
+
+    def rename_history(
+        self, conf_uid: str, old_history_uid: str, new_history_uid: str
+    ) -> bool:
+        """Rename a history file with a new history_uid"""
+        if not conf_uid or not old_history_uid or not new_history_uid:
+            logger.warning("Missing required parameters for rename")
+            return False
+
+        try:
+            old_filepath = self._history_path(conf_uid, old_history_uid)
+            new_filepath = self._get_safe_history_path(conf_uid, new_history_uid)
+            if os.path.exists(old_filepath):
+                os.rename(old_filepath, new_filepath)
+                self._update_index(conf_uid, old_history_uid, remove=True)
+                self._update_index(conf_uid, new_history_uid)
+                logger.info(
+                    f"Renamed history file from {old_history_uid} to {new_history_uid}"
+                )
+                return True
+        except Exception as e:
+            logger.error(f"Failed to rename history file: {e}")
+        return False
+
+    def close(self) -> None:
+        """Write the indexes that changed since they were last written"""
+        with self._index_lock:
+            for conf_uid in list(self._unsaved_indexes):
+                try:
+                    self._flush_index(conf_uid)
+                except Exception as e:
+                    logger.warning(f"Failed to write history index of {conf_uid}: {e}")
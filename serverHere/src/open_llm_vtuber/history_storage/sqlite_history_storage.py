@@ -0,0 +1,486 @@
+"""Chat history stored in one SQLite database per deployment.
+
+Every thread gets its own connection and the database runs in WAL mode, so
+the history list and searches, which run on worker threads, do not block
+messages being stored, and reads never wait for each other. Writes are
+serialized by SQLite itself. Messages are indexed by
+history and time, and an FTS5 index over their content backs full-text
+search. SQLite builds without FTS5 fall back to a LIKE scan.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Literal, Optional
+
+from loguru import logger
+
+from .history_storage_interface import (
+    HistoryMessage,
+    HistoryPage,
+    HistorySearchResult,
+    HistoryStorageInterface,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS histories (
+    conf_uid TEXT NOT NULL,
+    history_uid TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (conf_uid, history_uid)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conf_uid TEXT NOT NULL,
+    history_uid TEXT NOT NULL,
+    role TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    content TEXT NOT NULL,
+    name TEXT,
+    avatar TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_history
+    ON messages (conf_uid, history_uid, id);
+CREATE INDEX IF NOT EXISTS idx_messages_timestamp
+    ON messages (conf_uid, timestamp);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+_MESSAGE_COLUMNS = "id, role, timestamp, content, name, avatar"
+
+
+def _to_message(row: sqlite3.Row) -> HistoryMessage:
+    message = {
+        "role": row["role"],
+        "timestamp": row["timestamp"],
+        "content": row["content"],
+    }
+    # Same shape as the JSON storage, which omits missing display information
+    if row["name"] is not None:
+        message["name"] = row["name"]
+    if row["avatar"] is not None:
+        message["avatar"] = row["avatar"]
+    return message
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class SQLiteHistoryStorage(HistoryStorageInterface):
+    """Stores all histories in one SQLite database with full-text search."""
+
+    def __init__(self, db_path: str = "chat_history/history.db"):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        # One connection per thread, all of them are closed by `close`
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        try:
+            conn.executescript(_FTS_SCHEMA)
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(
+                f"SQLite has no FTS5 support ({e}). History search will be slower."
+            )
+            self.fts_enabled = False
+        logger.info(f"Using SQLite chat history at {db_path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Waits up to `timeout` seconds while another thread writes.
+            # check_same_thread is off only so that `close` can close it.
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=10.0,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction of the current thread."""
+        conn = self._connection()
+        # Take the write lock up front, so a read followed by a write in the
+        # transaction can't fail with SQLITE_BUSY halfway through
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _ensure_history(
+        self, conn: sqlite3.Connection, conf_uid: str, history_uid: str
+    ) -> None:
+        conn.execute(
+            "INSERT OR IGNORE INTO histories (conf_uid, history_uid, created_at) "
+            "VALUES (?, ?, ?)",
+            (conf_uid, history_uid, _now()),
+        )
+
+    def create_new_history(self, conf_uid: str) -> str:
+        if not conf_uid:
+            logger.warning("No conf_uid provided")
+            return ""
+
+        history_uid = (
+            f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex}"
+        )
+        try:
+            self._ensure_history(self._connection(), conf_uid, history_uid)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to create new history: {e}")
+            return ""
+        logger.debug(f"Created new history {history_uid}")
+        return history_uid
+
+    def append_messages(
+        self, conf_uid: str, history_uid: str, messages: List[HistoryMessage]
+    ) -> None:
+        if not conf_uid or not history_uid:
+            if not conf_uid:
+                logger.warning("Missing conf_uid")
+            if not history_uid:
+                logger.warning("Missing history_uid")
+            return
+        if not messages:
+            return
+
+        with self._transaction() as conn:
+            self._ensure_history(conn, conf_uid, history_uid)
+            conn.executemany(
+                "INSERT INTO messages "
+                "(conf_uid, history_uid, role, timestamp, content, name, avatar) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        conf_uid,
+                        history_uid,
+                        m["role"],
+                        m.get("timestamp") or _now(),
+                        m["content"],
+                        m.get("name"),
+                        m.get("avatar"),
+                    )
+                    for m in messages
+                ],
+            )
+        logger.debug(f"Successfully stored {len(messages)} message(s)")
+
+    def get_metadata(self, conf_uid: str, history_uid: str) -> dict:
+        if not conf_uid or not history_uid:
+            return {}
+        try:
+            row = self._connection().execute(
+                "SELECT created_at, metadata FROM histories "
+                "WHERE conf_uid = ? AND history_uid = ?",
+                (conf_uid, history_uid),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get metadata: {e}")
+            return {}
+        if row is None:
+            return {}
+        return {
+            "role": "metadata",
+            "timestamp": row["created_at"],
+            **json.loads(row["metadata"]),
+        }
+
+    def update_metadata(self, conf_uid: str, history_uid: str, metadata: dict) -> bool:
+        if not conf_uid or not history_uid:
+            return False
+        try:
+            with self._transaction() as conn:
+                row = conn.execute(
+                    "SELECT metadata FROM histories "
+                    "WHERE conf_uid = ? AND history_uid = ?",
+                    (conf_uid, history_uid),
+                ).fetchone()
+                if row is None:
+                    return False
+                merged = {**json.loads(row["metadata"]), **metadata}
+                conn.execute(
+                    "UPDATE histories SET metadata = ? "
+                    "WHERE conf_uid = ? AND history_uid = ?",
+                    (json.dumps(merged, ensure_ascii=False), conf_uid, history_uid),
+                )
+            logger.debug(f"Updated metadata for history {history_uid}")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to set metadata: {e}")
+        return False
+
+    def get_history(self, conf_uid: str, history_uid: str) -> List[HistoryMessage]:
+        if not conf_uid or not history_uid:
+            return []
+        try:
+            rows = self._connection().execute(
+                f"SELECT {_MESSAGE_COLUMNS} FROM messages "
+                "WHERE conf_uid = ? AND history_uid = ? ORDER BY id",
+                (conf_uid, history_uid),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read history {history_uid}: {e}")
+            return []
+        return [_to_message(row) for row in rows]
+
+    def _read_backwards(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        count: int,
+        before_id: Optional[int] = None,
+    ) -> List[sqlite3.Row]:
+        rows = self._connection().execute(
+            f"SELECT {_MESSAGE_COLUMNS} FROM messages "
+            "WHERE conf_uid = ? AND history_uid = ? AND id < ? "
+            "ORDER BY id DESC LIMIT ?",
+            (
+                conf_uid,
+                history_uid,
+                before_id if before_id is not None else 2**63 - 1,
+                count,
+            ),
+        ).fetchall()
+        rows.reverse()
+        return rows
+
+    def get_history_tail(
+        self, conf_uid: str, history_uid: str, count: int
+    ) -> List[HistoryMessage]:
+        if not conf_uid or not history_uid or count <= 0:
+            return []
+        try:
+            rows = self._read_backwards(conf_uid, history_uid, count)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read the end of history {history_uid}: {e}")
+            return []
+        return [_to_message(row) for row in rows]
+
+    def get_history_page(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        limit: int,
+        before: Optional[str] = None,
+    ) -> HistoryPage:
+        """Read a page of messages backwards from the cursor, a message id."""
+        if not conf_uid or not history_uid or limit <= 0:
+            return {"messages": [], "before": None}
+        try:
+            before_id = int(before) if before else None
+        except ValueError:
+            # Same as the JSON storage for a cursor it didn't hand out
+            logger.warning(f"Invalid history page cursor: {before!r}")
+            return {"messages": [], "before": None}
+        try:
+            rows = self._read_backwards(conf_uid, history_uid, limit, before_id)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read a page of history {history_uid}: {e}")
+            return {"messages": [], "before": None}
+        has_more = len(rows) == limit
+        return {
+            "messages": [_to_message(row) for row in rows],
+            "before": str(rows[0]["id"]) if has_more else None,
+        }
+
+    def search_history(
+        self,
+        conf_uid: str,
+        query: str,
+        limit: int = 20,
+        history_uid: Optional[str] = None,
+    ) -> List[HistorySearchResult]:
+        """Find messages matching the query, as a phrase, with FTS5."""
+        if not conf_uid or not query.strip():
+            return []
+
+        columns = ", ".join(f"m.{c}" for c in _MESSAGE_COLUMNS.split(", "))
+        params: list = []
+        if self.fts_enabled:
+            # Quote the query so that FTS5 operators in user input are literal
+            phrase = '"' + query.replace('"', '""') + '"'
+            sql = (
+                f"SELECT m.history_uid, {columns} FROM messages_fts "
+                "JOIN messages m ON m.id = messages_fts.rowid "
+                "WHERE messages_fts MATCH ? AND m.conf_uid = ?"
+            )
+            params += [phrase, conf_uid]
+        else:
+            escaped = (
+                query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            sql = (
+                f"SELECT m.history_uid, {columns} FROM messages m "
+                "WHERE m.content LIKE ? ESCAPE '\\' AND m.conf_uid = ?"
+            )
+            params += [f"%{escaped}%", conf_uid]
+        if history_uid:
+            sql += " AND m.history_uid = ?"
+            params.append(history_uid)
+        sql += " ORDER BY m.id DESC LIMIT ?"
+        params.append(limit)
+
+        try:
+            rows = self._connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to search histories of {conf_uid}: {e}")
+            return []
+        return [
+            {"history_uid": row["history_uid"], "message": _to_message(row)}
+            for row in rows
+        ]
+
+    def get_history_list(self, conf_uid: str) -> List[dict]:
+        if not conf_uid:
+            return []
+        try:
+            rows = self._connection().execute(
+                f"SELECT counts.message_count, m.history_uid, {_MESSAGE_COLUMNS} "
+                "FROM ("
+                "  SELECT history_uid, COUNT(*) AS message_count, MAX(id) AS last_id "
+                "  FROM messages WHERE conf_uid = ? GROUP BY history_uid"
+                ") AS counts JOIN messages m ON m.id = counts.last_id "
+                "ORDER BY m.timestamp DESC, m.id DESC",
+                (conf_uid,),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error listing histories: {e}")
+            return []
+        return [
+            {
+                "uid": row["history_uid"],
+                "latest_message": _to_message(row),
+                "timestamp": row["timestamp"],
+                "message_count": row["message_count"],
+            }
+            for row in rows
+        ]
+
+    def delete_history(self, conf_uid: str, history_uid: str) -> bool:
+        if not conf_uid or not history_uid:
+            logger.warning("Missing conf_uid or history_uid")
+            return False
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "DELETE FROM messages WHERE conf_uid = ? AND history_uid = ?",
+                    (conf_uid, history_uid),
+                )
+                deleted = conn.execute(
+                    "DELETE FROM histories WHERE conf_uid = ? AND history_uid = ?",
+                    (conf_uid, history_uid),
+                ).rowcount
+            return deleted > 0
+        except sqlite3.Error as e:
+            logger.error(f"Failed to delete history: {e}")
+        return False
+
+    def modify_latest_message(
+        self,
+        conf_uid: str,
+        history_uid: str,
+        role: Literal["human", "ai", "system"],
+        new_content: str,
+    ) -> bool:
+        if not conf_uid or not history_uid:
+            logger.warning("Missing conf_uid or history_uid")
+            return False
+        try:
+            with self._transaction() as conn:
+                row = conn.execute(
+                    "SELECT id, role FROM messages "
+                    "WHERE conf_uid = ? AND history_uid = ? ORDER BY id DESC LIMIT 1",
+                    (conf_uid, history_uid),
+                ).fetchone()
+                if row is None:
+                    logger.warning("History is empty")
+                    return False
+                if row["role"] != role:
+                    logger.warning(
+                        f"Latest message role ({row['role']}) doesn't match requested role ({role})"
+                    )
+                    return False
+                conn.execute(
+                    "UPDATE messages SET content = ? WHERE id = ?",
+                    (new_content, row["id"]),
+                )
+            logger.debug(f"Successfully modified latest {role} message")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to modify latest message: {e}")
+        return False
+
+    def rename_history(
+        self, conf_uid: str, old_history_uid: str, new_history_uid: str
+    ) -> bool:
+        if not conf_uid or not old_history_uid or not new_history_uid:
+            logger.warning("Missing required parameters for rename")
+            return False
+        try:
+            with self._transaction() as conn:
+                renamed = conn.execute(
+                    "UPDATE histories SET history_uid = ? "
+                    "WHERE conf_uid = ? AND history_uid = ?",
+                    (new_history_uid, conf_uid, old_history_uid),
+                ).rowcount
+                conn.execute(
+                    "UPDATE messages SET history_uid = ? "
+                    "WHERE conf_uid = ? AND history_uid = ?",
+                    (new_history_uid, conf_uid, old_history_uid),
+                )
+            if renamed:
+                logger.info(
+                    f"Renamed history from {old_history_uid} to {new_history_uid}"
+                )
+            return renamed > 0
+        except sqlite3.Error as e:
+            logger.error(f"Failed to rename history: {e}")
+        return False
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -195,7 +195,7 @@ class BiliBiliLivePlatform(LivePlatformInterface):
             return False
 
         try:
-            message = {"type": "text-input", "text": text}
+            message = {"type": "text-input", "text": text, "source": "live"}
             await self._websocket.send(json.dumps(message))
             logger.info(f"Sent danmaku to VTuber: {text}")
             return True
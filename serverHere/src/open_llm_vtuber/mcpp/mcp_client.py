@@ -30,6 +30,8 @@ class MCPClient:
         self.exit_stack: AsyncExitStack = AsyncExitStack()
         self.active_sessions: Dict[str, ClientSession] = {}
         self._server_locks: Dict[str, asyncio.Lock] = {}  # Locks per server
+        # Limits concurrent tool calls per server, see MCPServer.max_concurrent_calls
+        self._call_semaphores: Dict[str, asyncio.Semaphore] = {}
         self._list_tools_cache: Dict[str, List[Tool]] = {}  # Cache for list_tools
         self._send_text: Callable = send_text
         self._client_uid: str = client_uid
@@ -114,12 +116,37 @@ class MCPClient:
     ) -> Dict[str, Any]:
         """Call a tool on the specified server.
 
+        At most `max_concurrent_calls` calls run on a server at the same time,
+        further calls wait in the order they were made. A call taking longer
+        than the `call_timeout` of the server raises a RuntimeError.
+
         Returns:
             Dict containing the metadata and content_items from the tool response.
         """
-        session = await self._ensure_server_running_and_get_session(server_name)
-        logger.info(f"MCPC: Calling tool '{tool_name}' on server '{server_name}'...")
-        response = await session.call_tool(tool_name, tool_args)
+        server = self.server_registery.get_server(server_name)
+        if server_name not in self._call_semaphores:
+            self._call_semaphores[server_name] = asyncio.Semaphore(
+                server.max_concurrent_calls if server else 1
+            )
+
+        async with self._call_semaphores[server_name]:
+            session = await self._ensure_server_running_and_get_session(server_name)
+            logger.info(
+                f"MCPC: Calling tool '{tool_name}' on server '{server_name}'..."
+            )
+            call_timeout = server.call_timeout if server else None
+            try:
+                response = await asyncio.wait_for(
+                    session.call_tool(tool_name, tool_args), timeout=call_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"MCPC: Tool '{tool_name}' on server '{server_name}' timed out "
+                    f"after {call_timeout} seconds."
+                )
+                raise RuntimeError(
+                    f"Tool '{tool_name}' timed out after {call_timeout} seconds."
+                )
 
         if response.isError:
             error_text = (
@@ -176,6 +203,7 @@ class MCPClient:
         try:
             # Clear locks and cache first
             self._server_locks.clear()
+            self._call_semaphores.clear()
             self._list_tools_cache.clear()
             
             # Close all active sessions and transports via exit_stack
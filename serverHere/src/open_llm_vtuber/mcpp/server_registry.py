@@ -87,6 +87,10 @@ class ServerRegistry:
                 env=server_details.get("env", None),
                 cwd=server_details.get("cwd", None),
                 timeout=server_details.get("timeout", None),
+                max_concurrent_calls=max(
+                    int(server_details.get("max_concurrent_calls", 1)), 1
+                ),
+                call_timeout=server_details.get("call_timeout", None),
             )
             logger.debug(f"MCPSR: Loaded server: '{server_name}'.")
 
@@ -1,4 +1,5 @@
 import json
+import asyncio
 import datetime
 from loguru import logger
 from typing import (
@@ -189,148 +190,183 @@ class ToolExecutor:
         tool_calls: Union[List[Dict[str, Any]], List[ToolCallObject]],
         caller_mode: Literal["Claude", "OpenAI", "Prompt"],
     ) -> AsyncIterator[Dict[str, Any]]:
-        """Execute tools and yield status updates."""
-        tool_results_for_llm = []
+        """Execute tools concurrently and yield status updates.
+
+        All calls are started at once; MCPClient limits how many run on each
+        server. The 'running' updates follow the order of `tool_calls`, the
+        completion updates the order in which calls finish. The final results
+        keep the order of `tool_calls`.
+        """
+        tool_results_for_llm: List[Dict[str, Any] | None] = [None] * len(tool_calls)
+        running_tasks: Dict[asyncio.Task, int] = {}
 
         logger.info(f"Executing {len(tool_calls)} tool(s) for {caller_mode} caller.")
-        for call in tool_calls:
-            (
-                tool_name,
-                tool_id,
-                tool_input,
-                is_error,
-                result_content,
-                parse_error,
-            ) = self.parse_tool_call(call)
-
-            logger.info(f"Executing tool: {call}")
-
-            if parse_error:
-                logger.warning(
-                    f"Skipping tool call due to parsing error: {result_content}"
+        try:
+            for index, call in enumerate(tool_calls):
+                (
+                    tool_name,
+                    tool_id,
+                    tool_input,
+                    is_error,
+                    result_content,
+                    parse_error,
+                ) = self.parse_tool_call(call)
+
+                logger.info(f"Executing tool: {call}")
+
+                if parse_error:
+                    logger.warning(
+                        f"Skipping tool call due to parsing error: {result_content}"
+                    )
+                    tool_id = (
+                        tool_id
+                        or f"parse_error_{datetime.datetime.now(datetime.timezone.utc).isoformat()}"
+                    )
+                    yield {
+                        "type": "tool_call_status",
+                        "tool_id": tool_id,
+                        "tool_name": tool_name or "Unknown Tool",
+                        "status": "error",
+                        "content": result_content,
+                        "timestamp": datetime.datetime.now(
+                            datetime.timezone.utc
+                        ).isoformat()
+                        + "Z",
+                    }
+                    # Even on parse error, the LLM expects a result for the call
+                    tool_results_for_llm[index] = self.format_tool_result(
+                        caller_mode, tool_id, result_content, True
+                    )
+                    continue  # Skip execution logic for this call
+
+                task = asyncio.create_task(
+                    self._execute_tool_call(
+                        tool_name, tool_id, tool_input, caller_mode
+                    )
                 )
-                status_update = {
+                running_tasks[task] = index
+
+                # Yield 'running' status, the call starts at the next await
+                yield {
                     "type": "tool_call_status",
-                    "tool_id": tool_id
-                    or f"parse_error_{datetime.datetime.now(datetime.timezone.utc).isoformat()}",
-                    "tool_name": tool_name or "Unknown Tool",
-                    "status": "error",
-                    "content": result_content,
+                    "tool_id": tool_id,
+                    "tool_name": tool_name,
+                    "status": "running",
+                    "content": f"Input: {json.dumps(tool_input)}",
                     "timestamp": datetime.datetime.now(
                         datetime.timezone.utc
                     ).isoformat()
                     + "Z",
                 }
-                yield status_update
-                # Even on parse error, we might need to format a result for the LLM
-                # Use dummy values or the error message
-                formatted_result = self.format_tool_result(
-                    caller_mode,
-                    tool_id
-                    or f"parse_error_{datetime.datetime.now(datetime.timezone.utc).isoformat()}",
-                    result_content,
-                    True,  # is_error
-                )
-                if formatted_result:
-                    tool_results_for_llm.append(formatted_result)
-                continue  # Skip execution logic for this call
-
-            # Yield 'running' status before execution
-            yield {
-                "type": "tool_call_status",
-                "tool_id": tool_id,
-                "tool_name": tool_name,
-                "status": "running",
-                "content": f"Input: {json.dumps(tool_input)}",
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
-                + "Z",
-            }
-
-            # Execute the tool
-            (
-                is_error,
-                text_content,
-                metadata,
-                content_items,
-            ) = await self.run_single_tool(tool_name, tool_id, tool_input)
-
-            # Determine content for status update and LLM result format
-            status_content = text_content  # Default to text content
-            llm_formatted_content = text_content  # Default to text content for LLM
-
-            if content_items:
-                image_items = [
-                    item for item in content_items if item.get("type") == "image"
-                ]
-                if image_items:
-                    num_images = len(image_items)
-                    status_content = (
-                        f"{text_content}\n[Tool returned {num_images} image(s)]".strip()
-                    )
-
-                    if caller_mode == "Claude":
-                        # Format for Claude: list of blocks
-                        claude_blocks = []
-                        if text_content:
-                            claude_blocks.append({"type": "text", "text": text_content})
-                        for item in content_items:
-                            if (
-                                item.get("type") == "image"
-                                and "data" in item
-                                and "mimeType" in item
-                            ):
-                                claude_blocks.append(
-                                    {
-                                        "type": "image",
-                                        "source": {
-                                            "type": "base64",
-                                            "media_type": item["mimeType"],
-                                            "data": item["data"],
-                                        },
-                                    }
-                                )
-                            # Add other non-text types here
-                        llm_formatted_content = (
-                            claude_blocks if claude_blocks else ""
-                        )  # Use blocks or empty string
-                    elif caller_mode in ["OpenAI", "Prompt"]:
-                        llm_formatted_content = status_content
-
-            # Prepare and yield tool call status update
-            status_update = {
-                "type": "tool_call_status",
-                "tool_id": tool_id,
-                "tool_name": tool_name,
-                "status": "error" if is_error else "completed",
-                "content": status_content
-                if not is_error
-                else f"Error: {text_content}",  # Use descriptive content or error message
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
-                + "Z",
-            }
 
-            # For stagehand_navigate tool, include browser view links if available
-            if tool_name == "stagehand_navigate" and not is_error:
-                live_view_data = metadata.get("liveViewData", {})
-                if live_view_data:
-                    logger.info(
-                        f"Found live view data for stagehand_navigate: {live_view_data}"
-                    )
-                    status_update["browser_view"] = live_view_data
+            pending = set(running_tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Same order as the calls if several finished together
+                for task in sorted(done, key=running_tasks.get):
+                    status_update, formatted_result = task.result()
+                    yield status_update
+                    tool_results_for_llm[running_tasks[task]] = formatted_result
+        finally:
+            # The consumer stopped early, e.g. the conversation was interrupted
+            for task in running_tasks:
+                if not task.done():
+                    task.cancel()
+
+        results = [result for result in tool_results_for_llm if result]
+        logger.info(f"Finished executing tools with {len(results)} results.")
+        yield {"type": "final_tool_results", "results": results}
+
+    async def _execute_tool_call(
+        self,
+        tool_name: str,
+        tool_id: str,
+        tool_input: Any,
+        caller_mode: Literal["Claude", "OpenAI", "Prompt"],
+    ) -> tuple[Dict[str, Any], Dict[str, Any] | None]:
+        """Run a tool and build its status update and result for the LLM.
 
-            yield status_update
+        Returns:
+            tuple: (status_update, formatted_result)
+        """
+        (
+            is_error,
+            text_content,
+            metadata,
+            content_items,
+        ) = await self.run_single_tool(tool_name, tool_id, tool_input)
+
+        # Determine content for status update and LLM result format
+        status_content = text_content  # Default to text content
+        llm_formatted_content = text_content  # Default to text content for LLM
+
+        if content_items:
+            image_items = [
+                item for item in content_items if item.get("type") == "image"
+            ]
+            if image_items:
+                num_images = len(image_items)
+                status_content = (
+                    f"{text_content}\n[Tool returned {num_images} image(s)]".strip()
+                )
 
-            # Format result for LLM and add to list
-            formatted_result = self.format_tool_result(
-                caller_mode, tool_id, llm_formatted_content, is_error
-            )
-            if formatted_result:
-                tool_results_for_llm.append(formatted_result)
+                if caller_mode == "Claude":
+                    # Format for Claude: list of blocks
+                    claude_blocks = []
+                    if text_content:
+                        claude_blocks.append({"type": "text", "text": text_content})
+                    for item in content_items:
+                        if (
+                            item.get("type") == "image"
+                            and "data" in item
+                            and "mimeType" in item
+                        ):
+                            claude_blocks.append(
+                                {
+                                    "type": "image",
+                                    "source": {
+                                        "type": "base64",
+                                        "media_type": item["mimeType"],
+                                        "data": item["data"],
+                                    },
+                                }
+                            )
+                        # Add other non-text types here
+                    llm_formatted_content = (
+                        claude_blocks if claude_blocks else ""
+                    )  # Use blocks or empty string
+                elif caller_mode in ["OpenAI", "Prompt"]:
+                    llm_formatted_content = status_content
+
+        # Prepare tool call status update
+        status_update = {
+            "type": "tool_call_status",
+            "tool_id": tool_id,
+            "tool_name": tool_name,
+            "status": "error" if is_error else "completed",
+            "content": status_content
+            if not is_error
+            else f"Error: {text_content}",  # Use descriptive content or error message
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
+            + "Z",
+        }
+
+        # For stagehand_navigate tool, include browser view links if available
+        if tool_name == "stagehand_navigate" and not is_error:
+            live_view_data = metadata.get("liveViewData", {})
+            if live_view_data:
+                logger.info(
+                    f"Found live view data for stagehand_navigate: {live_view_data}"
+                )
+                status_update["browser_view"] = live_view_data
 
-        logger.info(
-            f"Finished executing tools with {len(tool_results_for_llm)} results."
+        # Format result for LLM
+        formatted_result = self.format_tool_result(
+            caller_mode, tool_id, llm_formatted_content, is_error
         )
-        yield {"type": "final_tool_results", "results": tool_results_for_llm}
+        return status_update, formatted_result
 
     async def run_single_tool(
         self, tool_name: str, tool_id: str, tool_input: Any
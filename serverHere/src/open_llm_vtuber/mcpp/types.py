@@ -14,6 +14,8 @@ class MCPServer:
         env (Optional[dict[str, str]], optional): Environment variables for the command. Defaults to None.
         cwd (Optional[str], optional): Working directory for the command. Defaults to None.
         timeout (Optional[timedelta], optional): Timeout for the command. Defaults to 10 seconds.
+        max_concurrent_calls (int, optional): Tool calls run on the server at the same time. Defaults to 1.
+        call_timeout (Optional[float], optional): Seconds a single tool call may take. Defaults to None (no limit).
     """
 
     name: str
@@ -23,6 +25,8 @@ class MCPServer:
     cwd: str | None = None
     timeout: Optional[timedelta] = timedelta(seconds=30)
     description: str = "No description available."
+    max_concurrent_calls: int = 1
+    call_timeout: Optional[float] = None
 
 
 @dataclass
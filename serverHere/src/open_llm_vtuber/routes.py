@@ -9,6 +9,7 @@ from starlette.responses import JSONResponse
 from starlette.websockets import WebSocketDisconnect
 from loguru import logger
 from .service_context import ServiceContext
+from .chat_history_manager import get_history_writer
 from .websocket_handler import WebSocketHandler
 from .proxy_handler import ProxyHandler
 
@@ -71,6 +72,54 @@ def init_proxy_route(server_url: str) -> APIRouter:
     return router
 
 
+def init_health_routes(default_context_cache: ServiceContext) -> APIRouter:
+    """
+    Create and return API routes for health checks.
+
+    Args:
+        default_context_cache: Default service context cache whose readiness is reported.
+
+    Returns:
+        APIRouter: Configured router with health endpoints.
+    """
+    router = APIRouter()
+
+    @router.get("/health/ready")
+    async def readiness():
+        """Report ready only once every engine of the default context is loaded and warm"""
+        timings = {
+            component: round(seconds, 3)
+            for component, seconds in default_context_cache.startup_timings.items()
+        }
+        warmup_timings = {
+            component: round(seconds, 3)
+            for component, seconds in default_context_cache.warmup_timings.items()
+        }
+        body = {
+            "status": "ready",
+            "startup_timings": timings,
+            "warmup_timings": warmup_timings,
+        }
+        if default_context_cache.is_ready:
+            return JSONResponse(body)
+
+        body["status"] = "starting"
+        if default_context_cache.startup_error is not None:
+            body["status"] = "failed"
+            body["error"] = str(default_context_cache.startup_error)
+        return JSONResponse(body, status_code=503)
+
+    @router.get("/health/history")
+    async def history_writer_metrics():
+        """Report the queue depth and flush latency of the background history writer"""
+        writer = get_history_writer()
+        if writer is None:
+            return JSONResponse({"policy": "immediate"})
+        return JSONResponse({"policy": writer.policy, **writer.metrics.to_dict()})
+
+    return router
+
+
 # Global cache for Live2D models info
 _live2d_models_cache = None
 
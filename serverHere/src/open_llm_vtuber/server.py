@@ -8,6 +8,7 @@ It uses FastAPI for the server and Starlette for static file serving.
 
 import os
 import shutil
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -15,8 +16,20 @@ from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import Response
 from starlette.staticfiles import StaticFiles as StarletteStaticFiles
 
-from .routes import init_client_ws_route, init_webtool_routes, init_proxy_route
+from .routes import (
+    init_client_ws_route,
+    init_webtool_routes,
+    init_proxy_route,
+    init_health_routes,
+)
 from .service_context import ServiceContext
+from .agent.stateless_llm.http_transport import close_http_clients
+from .chat_history_manager import (
+    close_history,
+    set_history_storage,
+    start_history_writer,
+)
+from .history_storage.history_storage_factory import HistoryStorageFactory
 from .config_manager.utils import Config
 
 
@@ -88,9 +101,25 @@ class WebSocketServer:
         self.app.include_router(
             init_webtool_routes(default_context_cache=self.default_context_cache),
         )
+        self.app.include_router(
+            init_health_routes(default_context_cache=self.default_context_cache),
+        )
 
         # Initialize and include proxy routes if proxy is enabled
         system_config = config.system_config
+
+        set_history_storage(
+            HistoryStorageFactory.get_history_storage(
+                system_config.history_storage,
+                db_path=system_config.history_db_path,
+            )
+        )
+        # Keep disk writes out of conversation turns
+        start_history_writer(
+            system_config.history_write_policy,
+            flush_interval=system_config.history_flush_interval_ms / 1000,
+            max_queue=system_config.history_write_queue_size,
+        )
         if hasattr(system_config, "enable_proxy") and system_config.enable_proxy:
             # Construct the server URL for the proxy
             host = system_config.host
@@ -154,19 +183,36 @@ class WebSocketServer:
         # Startup logic
         from loguru import logger
 
+        # Load models in the background so the server can report its readiness
+        # through /health/ready while engines are still loading.
         logger.info("Server starting up, initializing context...")
-        await self.initialize()
+        init_task = asyncio.create_task(self._initialize_in_background())
         yield
         # Shutdown logic
         logger.info("Server shutting down, cleaning up context...")
+        if not init_task.done():
+            init_task.cancel()
         if hasattr(self.default_context_cache, "close"):
             await self.default_context_cache.close()
+        await close_http_clients()
+        # Write the messages still queued before exiting
+        close_history()
 
     async def initialize(self):
         """Asynchronously load the service context from config.
         Calling this function is needed if default_context_cache was not provided to the constructor."""
         await self.default_context_cache.load_from_config(self.config)
 
+    async def _initialize_in_background(self):
+        """Run `initialize()` and record a failure on the context instead of raising."""
+        from loguru import logger
+
+        try:
+            await self.initialize()
+        except Exception as e:
+            logger.exception(f"Failed to initialize service context: {e}")
+            self.default_context_cache.mark_failed(e)
+
     @staticmethod
     def clean_cache():
         """Clean the cache directory by removing and recreating it."""
@@ -1,6 +1,11 @@
 import os
 import json
-from typing import Callable
+import time
+import uuid
+import asyncio
+import weakref
+from typing import Callable, Dict
+import numpy as np
 from loguru import logger
 from fastapi import WebSocket
 
@@ -37,6 +42,12 @@ from .config_manager import (
     validate_config,
 )
 
+# Engines that already went through warm-up. Engines are shared by reference
+# between sessions, so this is tracked per engine rather than per context.
+_warmed_up_engines = weakref.WeakSet()
+
+WARMUP_TTS_TEXT = "Hello."
+
 
 class ServiceContext:
     """Initializes, stores, and updates the asr, tts, and llm instances and other
@@ -68,11 +79,22 @@ class ServiceContext:
         self.mcp_prompt: str = ""
 
         self.history_uid: str = ""  # Add history_uid field
+        # Whether the client asked for `text-delta` messages
+        self.text_delta_enabled: bool = False
+        # Encoding of lip-sync volumes the client asked for, see utils.stream_audio
+        self.volume_encoding: str = "float"
 
         self.send_text: Callable = None
         self.client_uid: str = None
         self._current_mcp_servers: list[str] = []  # Track currently enabled servers
 
+        # Seconds spent initializing each component during the last load_from_config
+        self.startup_timings: Dict[str, float] = {}
+        # Seconds spent warming up each engine during the last load_from_config
+        self.warmup_timings: Dict[str, float] = {}
+        self.startup_error: Exception | None = None
+        self._startup_done = asyncio.Event()
+
     def __str__(self):
         return (
             f"ServiceContext:\n"
@@ -91,8 +113,83 @@ class ServiceContext:
             f"  MCP Enabled: {'Yes' if self.mcp_client else 'No'}"
         )
 
+    # ==== Readiness
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether all engines are loaded and the context can serve requests."""
+        return self._startup_done.is_set() and self.startup_error is None
+
+    def mark_ready(self) -> None:
+        """Mark the context as fully loaded."""
+        self.startup_error = None
+        self._startup_done.set()
+
+    def mark_failed(self, error: Exception) -> None:
+        """Record a startup failure and release anyone waiting for readiness."""
+        self.startup_error = error
+        self._startup_done.set()
+
+    async def wait_until_ready(self) -> None:
+        """Wait until the context is loaded.
+
+        Raises:
+            RuntimeError: If loading the context failed.
+        """
+        await self._startup_done.wait()
+        if self.startup_error is not None:
+            raise RuntimeError(
+                f"Service context failed to initialize: {self.startup_error}"
+            )
+
     # ==== Initializers
 
+    async def _run_timed(self, component: str, init_func: Callable, *args) -> None:
+        """Run a component initializer and record how long it took.
+
+        Synchronous initializers are run in a worker thread so that independent
+        model loads can overlap and the event loop stays responsive.
+        """
+        start = time.perf_counter()
+        if asyncio.iscoroutinefunction(init_func):
+            await init_func(*args)
+        else:
+            await asyncio.to_thread(init_func, *args)
+        self.startup_timings[component] = time.perf_counter() - start
+
+    async def _init_mcp_and_agent(self, config: Config) -> None:
+        """Initialize MCP components and then the agent, which depends on them."""
+        agent_settings = config.character_config.agent_config.agent_settings
+
+        # Initialize shared ToolAdapter if needed
+        if not self.tool_adapter and agent_settings.basic_memory_agent.use_mcpp:
+            if not self.mcp_server_registery:
+                self.mcp_server_registery = ServerRegistry()
+            self.tool_adapter = ToolAdapter(server_registery=self.mcp_server_registery)
+
+        # Initialize MCP components before Agent
+        await self._run_timed(
+            "mcp",
+            self._init_mcp_components,
+            agent_settings.basic_memory_agent.use_mcpp,
+            agent_settings.basic_memory_agent.mcp_enabled_servers,
+        )
+
+        await self._run_timed(
+            "agent",
+            self.init_agent,
+            config.character_config.agent_config,
+            config.character_config.persona_prompt,
+        )
+
+    def _log_startup_report(self) -> None:
+        """Log the time spent on each component during the last load."""
+        report = ", ".join(
+            f"{component}: {seconds:.2f}s"
+            for component, seconds in self.startup_timings.items()
+        )
+        logger.info(f"Service context loaded ({report})")
+
     async def _init_mcp_components(self, use_mcpp, enabled_servers):
         """Initializes MCP components based on configuration, dynamically fetching tool info."""
         
@@ -284,47 +381,48 @@ class ServiceContext:
                 logger.info("Reusing shared MCP components from cache - ToolExecutor initialized for this session.")
 
         logger.debug(f"Loaded service context with cache: {character_config}")
+        self.mark_ready()
 
     async def load_from_config(self, config: Config) -> None:
         """
         Load the ServiceContext from config.
         Reinitializes components if their configuration has changed.
+
+        Live2D is loaded first because the TTS voice and the expression prompt
+        depend on it. ASR, TTS, VAD and the MCP + agent chain are independent of
+        each other and are initialized concurrently.
         """
         self.config = config
         self.system_config = config.system_config
         self.character_config = config.character_config
+        self.startup_timings = {}
+        load_start = time.perf_counter()
 
-        # Initialize components from character config
-        self.init_live2d(config.character_config.live2d_model_name)
-        self.init_asr(config.character_config.asr_config)
-        self.init_tts(config.character_config.tts_config)
-        self.init_vad(config.character_config.vad_config)
-
-        # Initialize shared ToolAdapter if needed
-        if (
-            not self.tool_adapter
-            and config.character_config.agent_config.agent_settings.basic_memory_agent.use_mcpp
-        ):
-            if not self.mcp_server_registery:
-                self.mcp_server_registery = ServerRegistry()
-            self.tool_adapter = ToolAdapter(server_registery=self.mcp_server_registery)
-
-        # Initialize MCP components before Agent
-        await self._init_mcp_components(
-            config.character_config.agent_config.agent_settings.basic_memory_agent.use_mcpp,
-            config.character_config.agent_config.agent_settings.basic_memory_agent.mcp_enabled_servers,
+        await self._run_timed(
+            "live2d", self.init_live2d, config.character_config.live2d_model_name
         )
 
-        # Initialize agent
-        await self.init_agent(
-            config.character_config.agent_config,
-            config.character_config.persona_prompt,
+        await asyncio.gather(
+            self._run_timed("asr", self.init_asr, config.character_config.asr_config),
+            self._run_timed("tts", self.init_tts, config.character_config.tts_config),
+            self._run_timed("vad", self.init_vad, config.character_config.vad_config),
+            self._init_mcp_and_agent(config),
         )
 
-        self.init_translate(
-            config.character_config.tts_preprocessor_config.translator_config
+        await self._run_timed(
+            "translate",
+            self.init_translate,
+            config.character_config.tts_preprocessor_config.translator_config,
         )
 
+        self.startup_timings["total"] = time.perf_counter() - load_start
+        self._log_startup_report()
+
+        if self.system_config.warmup_engines:
+            await self.warm_up(include_llm=self.system_config.warmup_llm)
+
+        self.mark_ready()
+
     def init_live2d(self, live2d_model_name: str) -> None:
         logger.info(f"Initializing Live2D: {live2d_model_name}")
         try:
@@ -406,7 +504,10 @@ class ServiceContext:
         avatar = self.character_config.avatar or ""  # Get avatar from config
 
         try:
-            self.agent_engine = AgentFactory.create_agent(
+            # Agent construction may block (model preloading, local model loading),
+            # so keep it off the event loop.
+            self.agent_engine = await asyncio.to_thread(
+                AgentFactory.create_agent,
                 conversation_agent_choice=agent_config.conversation_agent_choice,
                 agent_settings=agent_config.agent_settings.model_dump(),
                 llm_configs=agent_config.llm_configs.model_dump(),
@@ -458,6 +559,74 @@ class ServiceContext:
         else:
             logger.info("Translation already initialized with the same config.")
 
+    # ==== Warm-up
+
+    async def warm_up(self, include_llm: bool = False) -> None:
+        """
+        Run each loaded engine once on dummy input so that lazy allocation and
+        tuning (ONNX sessions, CTranslate2, torch) happen before the first user
+        request. Engines that were already warmed up are skipped. Failures are
+        logged and never abort loading.
+
+        Parameters:
+        - include_llm (bool): Also send a minimal request to the LLM to open connections.
+        """
+        self.warmup_timings = {}
+        steps = [
+            ("asr", self.asr_engine, self._warm_up_asr),
+            ("tts", self.tts_engine, self._warm_up_tts),
+            ("vad", self.vad_engine, self._warm_up_vad),
+        ]
+        if include_llm:
+            steps.append(("llm", self.agent_engine, self._warm_up_llm))
+
+        for component, engine, warm_up_func in steps:
+            if engine is None or engine in _warmed_up_engines:
+                continue
+            start = time.perf_counter()
+            try:
+                await warm_up_func()
+            except Exception as e:
+                logger.warning(f"Warm-up of {component} ({type(engine).__name__}) failed: {e}")
+                continue
+            self.warmup_timings[component] = time.perf_counter() - start
+            _warmed_up_engines.add(engine)
+
+        if self.warmup_timings:
+            report = ", ".join(
+                f"{component}: {seconds:.2f}s"
+                for component, seconds in self.warmup_timings.items()
+            )
+            logger.info(f"Engines warmed up ({report})")
+
+    async def _warm_up_asr(self) -> None:
+        """Transcribe half a second of silence."""
+        silence = np.zeros(self.asr_engine.SAMPLE_RATE // 2, dtype=np.float32)
+        await self.asr_engine.async_transcribe_np(silence)
+
+    async def _warm_up_tts(self) -> None:
+        """Synthesize a short phrase and discard the audio."""
+        audio_path = await self.tts_engine.async_generate_audio(
+            text=WARMUP_TTS_TEXT,
+            file_name_no_ext=f"warmup_{uuid.uuid4().hex[:8]}",
+        )
+        if audio_path:
+            self.tts_engine.remove_file(audio_path, verbose=False)
+
+    async def _warm_up_vad(self) -> None:
+        """Run the VAD over a few windows of silence, then reset its state."""
+        window_size = getattr(self.vad_engine, "window_size_samples", 512)
+        silence = [0.0] * (window_size * 4)
+        await asyncio.to_thread(lambda: list(self.vad_engine.detect_speech(silence)))
+        # The VAD is shared, so the first client must not inherit the warm-up audio
+        if hasattr(self.vad_engine, "reset"):
+            self.vad_engine.reset()
+
+    async def _warm_up_llm(self) -> None:
+        """Let the agent open its LLM connection, if it supports warm-up."""
+        if hasattr(self.agent_engine, "warm_up"):
+            await self.agent_engine.warm_up()
+
     # ==== utils
 
     async def construct_system_prompt(self, persona_prompt: str) -> str:
@@ -0,0 +1,148 @@
+"""
+Adaptive segmentation of agent responses into TTS chunks.
+
+The sentence divider finds sentence boundaries. This module decides how those
+sentences are grouped into chunks for the TTS engine:
+
+- The first chunk is sized from the measured TTS latency and LLM output rate.
+- Consecutive short sentences are merged so "Yes." or "Oh!" don't each pay
+  for a TTS call.
+- Long run-on sentences are capped (see `SentenceDivider.max_sentence_chars`).
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .sentence_divider import SentenceWithTags, TagState
+
+# Average speaking rate of TTS voices, in characters per second
+SPEECH_CHARS_PER_SECOND = 15.0
+
+_CJK_END_PATTERN = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]$")
+
+
+class SegmentationStats:
+    """Moving averages of TTS latency and LLM output rate, shared by all sessions."""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.tts_latency: Optional[float] = None
+        self.llm_chars_per_second: Optional[float] = None
+
+    def _update(self, current: Optional[float], value: float) -> float:
+        if current is None:
+            return value
+        return self.alpha * value + (1 - self.alpha) * current
+
+    def record_tts_latency(self, seconds: float) -> None:
+        """Record the time a TTS engine took to synthesize one chunk."""
+        self.tts_latency = self._update(self.tts_latency, seconds)
+
+    def record_llm_rate(self, chars: int, seconds: float) -> None:
+        """Record how many characters the LLM streamed in the given time."""
+        if chars <= 0 or seconds <= 0:
+            return
+        self.llm_chars_per_second = self._update(
+            self.llm_chars_per_second, chars / seconds
+        )
+
+
+segmentation_stats = SegmentationStats()
+
+
+@dataclass
+class SegmentationPolicy:
+    """
+    How agent responses are split into TTS chunks.
+
+    Attributes:
+        min_chunk_chars: Merge consecutive sentences until a chunk has at least this many characters. 0 disables merging.
+        max_chunk_chars: Split sentences longer than this many characters. 0 disables the cap.
+        adaptive_first_chunk: Size the first chunk from measured TTS latency and LLM output rate.
+    """
+
+    min_chunk_chars: int = 0
+    max_chunk_chars: int = 0
+    adaptive_first_chunk: bool = False
+
+    def first_chunk_chars(self, stats: SegmentationStats = segmentation_stats) -> int:
+        """
+        Minimum length of the first chunk before it may be cut at a comma.
+
+        The first chunk should play for at least as long as the TTS engine needs
+        for the next chunk, so playback doesn't stall after it. Waiting for that
+        many characters is capped by what the LLM can stream in the same time,
+        so a slow LLM doesn't delay the first audio. Returns 0 (cut at the first
+        comma) until both rates have been measured.
+        """
+        if not self.adaptive_first_chunk:
+            return 0
+        if stats.tts_latency is None or stats.llm_chars_per_second is None:
+            return 0
+        chars = SPEECH_CHARS_PER_SECOND * stats.tts_latency
+        chars = min(chars, stats.llm_chars_per_second * stats.tts_latency)
+        if self.max_chunk_chars:
+            chars = min(chars, self.max_chunk_chars)
+        return int(chars)
+
+
+class SentenceCoalescer:
+    """
+    Merges consecutive short sentences into one chunk.
+
+    The first sentence of a response is never held back, so time to first
+    audio is unchanged. Tag boundaries (e.g. `<think>`) are never merged across.
+    """
+
+    def __init__(self, min_chars: int):
+        self.min_chars = min_chars
+        self._pending: Optional[SentenceWithTags] = None
+        self._emitted_first = False
+
+    @staticmethod
+    def _mergeable(sentence: SentenceWithTags) -> bool:
+        return all(tag.state in (TagState.NONE, TagState.INSIDE) for tag in sentence.tags)
+
+    @staticmethod
+    def _join(first: str, second: str) -> str:
+        separator = "" if _CJK_END_PATTERN.search(first) else " "
+        return f"{first}{separator}{second}"
+
+    def push(self, sentence: SentenceWithTags) -> List[SentenceWithTags]:
+        """Add a sentence and return the chunks that are ready."""
+        if self.min_chars <= 0:
+            return [sentence]
+
+        if not self._emitted_first and self._mergeable(sentence):
+            self._emitted_first = True
+            return [sentence]
+
+        ready = []
+        pending = self._pending
+        if pending and (
+            not self._mergeable(sentence)
+            or [str(t) for t in pending.tags] != [str(t) for t in sentence.tags]
+        ):
+            ready.append(pending)
+            pending = None
+
+        if not self._mergeable(sentence):
+            ready.append(sentence)
+        elif pending:
+            pending = SentenceWithTags(
+                text=self._join(pending.text, sentence.text), tags=pending.tags
+            )
+        else:
+            pending = sentence
+
+        if pending and len(pending.text) >= self.min_chars:
+            ready.append(pending)
+            pending = None
+        self._pending = pending
+        return ready
+
+    def flush(self) -> List[SentenceWithTags]:
+        """Return the sentence held back, if any."""
+        pending, self._pending = self._pending, None
+        return [pending] if pending else []
@@ -1,8 +1,9 @@
 import re
+from functools import lru_cache
 from typing import List, Tuple, AsyncIterator, Optional, Union, Dict, Any
 import pysbd
 from loguru import logger
-from langdetect import detect
+from langdetect import detect, DetectorFactory
 from enum import Enum
 from dataclasses import dataclass
 
@@ -72,6 +73,18 @@ SUPPORTED_LANGUAGES = {
     "zh",
 }
 
+# Make langdetect deterministic
+DetectorFactory.seed = 0
+
+# Character classes used to find punctuation in newly received text
+_END_PUNCTUATION_PATTERN = re.compile(
+    "[" + re.escape("".join(sorted(set("".join(END_PUNCTUATIONS))))) + "]"
+)
+_COMMA_PATTERN = re.compile("[" + re.escape("".join(sorted(set(COMMAS)))) + "]")
+_SENTENCE_PATTERN = re.compile(
+    r"(.*?(?:[" + "|".join(re.escape(p) for p in END_PUNCTUATIONS) + r"]))"
+)
+
 
 def detect_language(text: str) -> str:
     """
@@ -86,6 +99,12 @@ def detect_language(text: str) -> str:
         return None
 
 
+@lru_cache(maxsize=None)
+def get_segmenter(language: str) -> pysbd.Segmenter:
+    """Get a cached pysbd segmenter for the language."""
+    return pysbd.Segmenter(language=language, clean=False)
+
+
 def is_complete_sentence(text: str) -> bool:
     """
     Check if text ends with sentence-ending punctuation and not abbreviation.
@@ -170,6 +189,34 @@ def contains_end_punctuation(text: str) -> bool:
     return any(punct in text for punct in END_PUNCTUATIONS)
 
 
+def split_long_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into pieces of at most max_chars characters, preferring to cut
+    after the last comma, then at the last whitespace.
+
+    Args:
+        text: Text to split
+        max_chars: Maximum length of a piece. 0 disables splitting.
+
+    Returns:
+        List[str]: The pieces, stripped
+    """
+    pieces = []
+    text = text.strip()
+    while max_chars and len(text) > max_chars:
+        window = text[:max_chars]
+        cut = max(window.rfind(comma) for comma in COMMAS) + 1
+        if cut <= 0:
+            cut = window.rfind(" ")
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
 def segment_text_by_regex(text: str) -> Tuple[List[str], str]:
     """
     Segment text into complete sentences using regex pattern matching.
@@ -187,12 +234,8 @@ def segment_text_by_regex(text: str) -> Tuple[List[str], str]:
     complete_sentences = []
     remaining_text = text.strip()
 
-    # Create pattern for matching sentences ending with any end punctuation
-    escaped_punctuations = [re.escape(p) for p in END_PUNCTUATIONS]
-    pattern = r"(.*?(?:[" + "|".join(escaped_punctuations) + r"]))"
-
     while remaining_text:
-        match = re.search(pattern, remaining_text)
+        match = _SENTENCE_PATTERN.search(remaining_text)
         if not match:
             break
 
@@ -210,13 +253,16 @@ def segment_text_by_regex(text: str) -> Tuple[List[str], str]:
     return complete_sentences, remaining_text
 
 
-def segment_text_by_pysbd(text: str) -> Tuple[List[str], str]:
+def segment_text_by_pysbd(
+    text: str, language: Optional[str] = None
+) -> Tuple[List[str], str]:
     """
     Segment text into complete sentences and remaining text.
     Uses pysbd for supported languages, falls back to regex for others.
 
     Args:
         text: Text to segment into sentences
+        language: Language of the text. Detected from the text if None.
 
     Returns:
         Tuple[List[str], str]: (list of complete sentences, remaining incomplete text)
@@ -225,12 +271,11 @@ def segment_text_by_pysbd(text: str) -> Tuple[List[str], str]:
         return [], ""
 
     try:
-        # Detect language
-        lang = detect_language(text)
+        lang = language or detect_language(text)
 
         if lang is not None:
             # Use pysbd for supported languages
-            segmenter = pysbd.Segmenter(language=lang, clean=False)
+            segmenter = get_segmenter(lang)
             sentences = segmenter.segment(text)
 
             if not sentences:
@@ -304,6 +349,9 @@ class SentenceDivider:
         faster_first_response: bool = True,
         segment_method: str = "pysbd",
         valid_tags: List[str] = None,
+        language: Optional[str] = None,
+        first_chunk_min_chars: int = 0,
+        max_sentence_chars: int = 0,
     ):
         """
         Initialize the SentenceDivider.
@@ -312,14 +360,47 @@ class SentenceDivider:
             faster_first_response: Whether to split first sentence at commas
             segment_method: Method for segmenting sentences
             valid_tags: List of valid tag names to detect
+            language: Language for pysbd. Detected once per response if None.
+            first_chunk_min_chars: With faster_first_response, only split the first
+                sentence at a comma once it has at least this many characters
+            max_sentence_chars: Split sentences longer than this, also before their
+                end punctuation arrives. 0 disables the limit.
         """
         self.faster_first_response = faster_first_response
+        self.first_chunk_min_chars = first_chunk_min_chars
+        self.max_sentence_chars = max_sentence_chars
         self.segment_method = segment_method
         self.valid_tags = valid_tags or ["think"]
+        self.language = language if language in SUPPORTED_LANGUAGES else None
+        if language and not self.language:
+            logger.warning(
+                f"Language '{language}' is not supported by pysbd, detecting it instead."
+            )
+        # Matches <tag>, </tag> and <tag/> for all valid tags
+        self._tag_pattern = re.compile(
+            r"<(/?)("
+            + "|".join(re.escape(tag) for tag in self.valid_tags)
+            + r")(/?)>"
+        )
+        self._max_tag_length = max(len(tag) for tag in self.valid_tags) + 3
         self._is_first_sentence = True
         self._buffer = ""
         # Replace active_tags dict with a stack to handle nesting
         self._tag_stack = []
+        self._language = self.language
+        self._language_resolved = self.language is not None
+        self._reset_scan_state()
+
+    def _reset_scan_state(self) -> None:
+        """Reset the scan cursors. Called whenever the buffer is consumed."""
+        # Buffer positions before which no tag / punctuation can start
+        self._tag_scan_pos = 0
+        self._punctuation_scan_pos = 0
+
+    def _consume(self, length: int) -> None:
+        """Remove the first `length` characters from the buffer."""
+        self._buffer = self._buffer[length:]
+        self._reset_scan_state()
 
     def _get_current_tags(self) -> List[TagInfo]:
         """
@@ -339,191 +420,153 @@ class SentenceDivider:
         """
         return self._tag_stack[-1] if self._tag_stack else None
 
-    def _extract_tag(self, text: str) -> Tuple[Optional[TagInfo], str]:
+    def _find_tag(self) -> Optional[re.Match]:
         """
-        Extract the first tag from text if present.
-        Handles nested tags by maintaining a tag stack.
+        Find the first tag in the buffer, scanning only text that has not been
+        scanned yet plus enough characters to catch a tag split across tokens.
+        """
+        match = self._tag_pattern.search(self._buffer, self._tag_scan_pos)
+        if not match:
+            self._tag_scan_pos = max(0, len(self._buffer) - self._max_tag_length + 1)
+        return match
+
+    def _handle_tag(self, match: re.Match) -> TagInfo:
+        """
+        Update the tag stack for a tag found in the buffer.
 
         Args:
-            text: Text to check for tags
+            match: Match of the tag pattern
 
         Returns:
-            Tuple of (TagInfo if tag found else None, remaining text)
+            TagInfo: Information about the tag
         """
-        # Find the first occurrence of any tag
-        first_tag = None
-        first_pos = len(text)
-        tag_type = None
-        matched_tag = None
-
-        # Check for self-closing tags
-        for tag in self.valid_tags:
-            pattern = f"<{tag}/>"
-            match = re.search(pattern, text)
-            if match and match.start() < first_pos:
-                first_pos = match.start()
-                first_tag = match
-                tag_type = TagState.SELF_CLOSING
-                matched_tag = tag
-
-        # Check for opening tags
-        for tag in self.valid_tags:
-            pattern = f"<{tag}>"
-            match = re.search(pattern, text)
-            if match and match.start() < first_pos:
-                first_pos = match.start()
-                first_tag = match
-                tag_type = TagState.START
-                matched_tag = tag
-
-        # Check for closing tags
-        for tag in self.valid_tags:
-            pattern = f"</{tag}>"
-            match = re.search(pattern, text)
-            if match and match.start() < first_pos:
-                first_pos = match.start()
-                first_tag = match
-                tag_type = TagState.END
-                matched_tag = tag
-
-        if not first_tag:
-            return None, text
+        closing, tag, self_closing = match.groups()
+        if self_closing:
+            tag_type = TagState.SELF_CLOSING
+        elif closing:
+            tag_type = TagState.END
+        else:
+            tag_type = TagState.START
 
-        # Handle the found tag
         if tag_type == TagState.START:
             # Push new tag onto stack
-            self._tag_stack.append(TagInfo(matched_tag, TagState.START))
+            self._tag_stack.append(TagInfo(tag, TagState.START))
         elif tag_type == TagState.END:
             # Verify matching tags
-            if not self._tag_stack or self._tag_stack[-1].name != matched_tag:
-                logger.warning(f"Mismatched closing tag: {matched_tag}")
+            if not self._tag_stack or self._tag_stack[-1].name != tag:
+                logger.warning(f"Mismatched closing tag: {tag}")
             else:
                 self._tag_stack.pop()
 
-        return (TagInfo(matched_tag, tag_type), text[first_tag.end() :].lstrip())
+        return TagInfo(tag, tag_type)
+
+    def _extract_tag(self, text: str) -> Tuple[Optional[TagInfo], str]:
+        """
+        Extract the first tag from text if present.
+        Handles nested tags by maintaining a tag stack.
+
+        Args:
+            text: Text to check for tags
+
+        Returns:
+            Tuple of (TagInfo if tag found else None, remaining text)
+        """
+        match = self._tag_pattern.search(text)
+        if not match:
+            return None, text
+        return self._handle_tag(match), text[match.end() :].lstrip()
+
+    def _sentences(self, text: str, tags: List[TagInfo]) -> List[SentenceWithTags]:
+        """Wrap text in sentences, splitting it if it exceeds max_sentence_chars."""
+        tags = tags or [TagInfo("", TagState.NONE)]
+        return [
+            SentenceWithTags(text=piece, tags=tags)
+            for piece in split_long_text(text, self.max_sentence_chars)
+        ]
 
     async def _process_buffer(self) -> AsyncIterator[SentenceWithTags]:
         """
         Process the current buffer, yielding complete sentences with tags.
-        This is now an async generator.
-        It consumes processed parts from self._buffer.
+        It consumes processed parts from self._buffer. Text that has already
+        been scanned without finding a boundary is not scanned again.
         """
-        processed_something = True  # Flag to loop until no more processing can be done
-        while processed_something:
-            processed_something = False
-            original_buffer_len = len(self._buffer)
+        while self._buffer:
+            tag_match = self._find_tag()
+
+            if tag_match:
+                text_before_tag = self._buffer[: tag_match.start()]
+                if text_before_tag.strip():
+                    # The tag is a boundary, so everything before it is complete
+                    current_tags = self._get_current_tags()
+                    if contains_end_punctuation(text_before_tag):
+                        sentences, remaining = self._segment_text(text_before_tag)
+                    else:
+                        sentences, remaining = [], text_before_tag
+                    for sentence in sentences + [remaining]:
+                        for item in self._sentences(sentence, current_tags):
+                            yield item
+                    self._consume(len(text_before_tag))
+                    continue
+
+                # Tag is at the start of the buffer (ignoring whitespace)
+                tag_info = self._handle_tag(tag_match)
+                yield SentenceWithTags(text=tag_match.group(0), tags=[tag_info])
+                self._buffer = self._buffer[tag_match.end() :].lstrip()
+                self._reset_scan_state()
+                continue
 
             if not self._buffer.strip():
                 break
 
-            # Find the next tag position
-            next_tag_pos = len(self._buffer)
-            tag_pattern_found = None
-            for tag in self.valid_tags:
-                patterns = [f"<{tag}>", f"</{tag}>", f"<{tag}/>"]
-                for pattern in patterns:
-                    pos = self._buffer.find(pattern)
-                    if pos != -1 and pos < next_tag_pos:
-                        next_tag_pos = pos
-                        tag_pattern_found = pattern  # Store the found pattern
-
-            if next_tag_pos == 0:
-                # Tag is at the start of buffer
-                tag_info, remaining = self._extract_tag(self._buffer)
-                if tag_info:
-                    processed_text = self._buffer[
-                        : len(self._buffer) - len(remaining)
-                    ].strip()
-                    # Yield the tag itself, represented as a SentenceWithTags
-                    yield SentenceWithTags(text=processed_text, tags=[tag_info])
+            # Only text received since the last scan can contain a new boundary
+            scan_pos = self._punctuation_scan_pos
+            self._punctuation_scan_pos = len(self._buffer)
+            current_tags = self._get_current_tags()
+
+            # Handle first sentence with comma if enabled
+            if self._is_first_sentence and self.faster_first_response:
+                comma = _COMMA_PATTERN.search(
+                    self._buffer, max(scan_pos, self.first_chunk_min_chars - 1)
+                )
+                if comma:
+                    sentence = self._buffer[: comma.end()].strip()
+                    if sentence:
+                        for item in self._sentences(sentence, current_tags):
+                            yield item
+                        self._is_first_sentence = False
+                        self._buffer = self._buffer[comma.end() :].lstrip()
+                        self._reset_scan_state()
+                        continue
+
+            # Process normal sentences based on end punctuation
+            if _END_PUNCTUATION_PATTERN.search(self._buffer, scan_pos):
+                sentences, remaining = self._segment_text(self._buffer)
+                if sentences:  # Only process if segmentation yielded sentences
+                    self._is_first_sentence = False
                     self._buffer = remaining
-                    processed_something = True
-                    continue  # Restart processing loop for the remaining buffer
-
-            elif next_tag_pos < len(self._buffer):
-                # Tag is in the middle - process text before tag first
-                text_before_tag = self._buffer[:next_tag_pos]
-                current_tags = self._get_current_tags()
-                processed_segment = ""
-
-                # Process complete sentences in text before tag
-                if contains_end_punctuation(text_before_tag):
-                    sentences, remaining_before = self._segment_text(text_before_tag)
+                    self._reset_scan_state()
                     for sentence in sentences:
-                        if sentence.strip():
-                            yield SentenceWithTags(
-                                text=sentence.strip(),
-                                tags=current_tags or [TagInfo("", TagState.NONE)],
-                            )
-                    # The part consumed includes sentences + what's left before the tag
-                    processed_segment = text_before_tag
-                    self._buffer = self._buffer[len(processed_segment) :]
-                    processed_something = True
-                    continue  # Restart processing loop
-
-                elif text_before_tag.strip() and tag_pattern_found:
-                    # No sentence end, but content exists AND we found a tag pattern after it.
-                    # We can yield this segment because the tag provides a boundary.
+                        for item in self._sentences(sentence, current_tags):
+                            yield item
+                    continue
+
+            # Cut run-on text that grows past the limit without end punctuation.
+            # Trailing whitespace does not count, it cannot be cut off.
+            text_length = len(self._buffer.rstrip())
+            if self.max_sentence_chars and text_length > self.max_sentence_chars:
+                pieces = split_long_text(self._buffer, self.max_sentence_chars)
+                if len(pieces) <= 1:
+                    break
+                for piece in pieces[:-1]:
                     yield SentenceWithTags(
-                        text=text_before_tag.strip(),
-                        tags=current_tags or [TagInfo("", TagState.NONE)],
+                        text=piece, tags=current_tags or [TagInfo("", TagState.NONE)]
                     )
-                    self._buffer = self._buffer[len(text_before_tag) :]
-                    processed_something = True
-                    continue  # Restart processing loop
-                # --- If no tag found after text_before_tag, we wait for more input or end punctuation ---
-
-                # Process the tag itself if we haven't continued
-                tag_info, remaining_after_tag = self._extract_tag(self._buffer)
-                if tag_info:
-                    processed_tag_text = self._buffer[
-                        : len(self._buffer) - len(remaining_after_tag)
-                    ].strip()
-                    yield SentenceWithTags(text=processed_tag_text, tags=[tag_info])
-                    self._buffer = remaining_after_tag
-                    processed_something = True
-                    continue  # Restart processing loop
-
-            # No tags found or tag is not at the beginning/middle of processable segment
-            # Process normal text if buffer has changed or punctuation exists
-            if original_buffer_len > 0:
-                current_tags = self._get_current_tags()
-
-                # Handle first sentence with comma if enabled
-                if (
-                    self._is_first_sentence
-                    and self.faster_first_response
-                    and contains_comma(self._buffer)
-                ):
-                    sentence, remaining = comma_splitter(self._buffer)
-                    if sentence.strip():
-                        yield SentenceWithTags(
-                            text=sentence.strip(),
-                            tags=current_tags or [TagInfo("", TagState.NONE)],
-                        )
-                        self._buffer = remaining
-                        self._is_first_sentence = False
-                        processed_something = True
-                        continue  # Restart processing loop
-
-                # Process normal sentences based on end punctuation
-                if contains_end_punctuation(self._buffer):
-                    sentences, remaining = self._segment_text(self._buffer)
-                    if sentences:  # Only process if segmentation yielded sentences
-                        self._buffer = remaining
-                        self._is_first_sentence = False
-                        processed_something = True
-                        for sentence in sentences:
-                            if sentence.strip():
-                                yield SentenceWithTags(
-                                    text=sentence.strip(),
-                                    tags=current_tags or [TagInfo("", TagState.NONE)],
-                                )
-                        continue  # Restart processing loop
-
-            # If we reached here without processing anything, break the loop
-            if not processed_something:
-                break
+                self._is_first_sentence = False
+                # Keep trailing whitespace, the next token continues the text
+                self._consume(text_length - len(pieces[-1]))
+                continue
+
+            break
 
     async def _flush_buffer(self) -> AsyncIterator[SentenceWithTags]:
         """
@@ -599,10 +642,20 @@ class SentenceDivider:
         """Segment text using the configured method"""
         if self.segment_method == "regex":
             return segment_text_by_regex(text)
-        return segment_text_by_pysbd(text)
+        # Detect the language once per response instead of once per sentence
+        if not self._language_resolved:
+            self._language = self.language or detect_language(text)
+            self._language_resolved = True
+            logger.debug(f"Sentence segmentation language: {self._language}")
+        if self._language is None:
+            return segment_text_by_regex(text)
+        return segment_text_by_pysbd(text, language=self._language)
 
     def reset(self):
         """Reset the divider state for a new conversation"""
         self._is_first_sentence = True
         self._buffer = ""
         self._tag_stack = []
+        self._language = self.language
+        self._language_resolved = self.language is not None
+        self._reset_scan_state()
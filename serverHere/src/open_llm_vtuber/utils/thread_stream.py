@@ -0,0 +1,82 @@
+"""Bridge from blocking iterators to async iterators."""
+
+import asyncio
+import threading
+from contextlib import nullcontext
+from typing import AsyncIterator, Callable, ContextManager, Iterator, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def stream_from_thread(
+    make_iterator: Callable[[], Iterator[T]],
+    name: str = "stream-producer",
+    lock: Optional[ContextManager] = None,
+) -> AsyncIterator[T]:
+    """
+    Run a blocking iterator on a dedicated thread and yield its items on the event loop.
+
+    The producer thread hands items over through an asyncio.Queue with
+    `call_soon_threadsafe`, so the event loop never runs the blocking iteration
+    itself. When the consumer stops early (break, cancellation, interrupt), the
+    producer stops before pulling the next item and closes the iterator.
+
+    Args:
+        make_iterator: Creates the blocking iterator. Called on the producer thread.
+        name: Name of the producer thread
+        lock: Entered by the producer thread while iterating, e.g. a lock that
+            serializes access to a model
+
+    Yields:
+        The items of the iterator. Exceptions raised by the iterator are re-raised.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def put(item, error: Optional[BaseException] = None) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:
+            # Event loop closed while the producer was still running
+            stop.set()
+
+    def produce() -> None:
+        try:
+            with lock or nullcontext():
+                if stop.is_set():
+                    return
+                iterator = make_iterator()
+                try:
+                    for item in iterator:
+                        if stop.is_set():
+                            break
+                        put(item)
+                finally:
+                    close = getattr(iterator, "close", None)
+                    if close:
+                        close()
+        except BaseException as e:
+            put(_DONE, e)
+            return
+        finally:
+            if stop.is_set():
+                logger.debug(f"{name}: stopped by consumer")
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                if error:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
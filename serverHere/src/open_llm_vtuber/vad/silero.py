@@ -50,6 +50,12 @@ class VADEngine(VADInterface):
         logger.info("Loading Silero-VAD model...")
         return load_silero_vad()
 
+    def reset(self):
+        """Forget the audio seen so far: the model's recurrent state and the state machine."""
+        if hasattr(self.model, "reset_states"):
+            self.model.reset_states()
+        self.state = StateMachine(self.config)
+
     def detect_speech(self, audio_data: list[float]):
         audio_np = np.array(audio_data, dtype=np.float32)
         for i in range(0, len(audio_np), self.window_size_samples):
@@ -7,6 +7,7 @@ import numpy as np
 from loguru import logger
 
 from .service_context import ServiceContext
+from .agent.agents.agent_interface import AgentInterface
 from .chat_group import (
     ChatGroupManager,
     handle_group_operation,
@@ -14,14 +15,16 @@ from .chat_group import (
     broadcast_to_group,
 )
 from .message_handler import message_handler
-from .utils.stream_audio import prepare_audio_payload
+from .utils.stream_audio import VOLUME_ENCODINGS, prepare_audio_payload
 from .chat_history_manager import (
     create_new_history,
-    get_history,
     delete_history,
     get_history_list,
+    get_history_page,
+    search_history,
 )
 from .config_manager.utils import scan_config_alts_directory, scan_bg_directory
+from .conversations.proactive_speech import ProactiveSpeechCache
 from .conversations.conversation_handler import (
     handle_conversation_trigger,
     handle_group_interrupt,
@@ -29,6 +32,10 @@ from .conversations.conversation_handler import (
 )
 
 
+# Messages sent with history-data when a history is opened
+HISTORY_FIRST_PAGE_SIZE = 50
+
+
 class WSMessage(TypedDict, total=False):
     """Type definition for WebSocket messages"""
 
@@ -40,6 +47,11 @@ class WSMessage(TypedDict, total=False):
     history_uid: Optional[str]
     file: Optional[str]
     display_text: Optional[dict]
+    enabled: Optional[bool]
+    before: Optional[str]
+    limit: Optional[int]
+    query: Optional[str]
+    encoding: Optional[str]
 
 
 class WebSocketHandler:
@@ -65,6 +77,8 @@ class WebSocketHandler:
             "request-group-info": self._handle_group_info,
             "fetch-history-list": self._handle_history_list_request,
             "fetch-and-set-history": self._handle_fetch_history,
+            "fetch-history-page": self._handle_fetch_history_page,
+            "search-history": self._handle_search_history,
             "create-new-history": self._handle_create_history,
             "delete-history": self._handle_delete_history,
             "interrupt-signal": self._handle_interrupt,
@@ -79,6 +93,8 @@ class WebSocketHandler:
             "audio-play-start": self._handle_audio_play_start,
             "request-init-config": self._handle_init_config_request,
             "heartbeat": self._handle_heartbeat,
+            "set-text-delta": self._handle_set_text_delta,
+            "set-volume-encoding": self._handle_set_volume_encoding,
         }
 
     async def handle_new_connection(
@@ -95,6 +111,9 @@ class WebSocketHandler:
             Exception: If initialization fails
         """
         try:
+            # Models may still be loading in the background right after startup
+            await self.default_context_cache.wait_until_ready()
+
             session_service_context = await self._init_service_context(
                 websocket.send_text, client_uid
             )
@@ -176,7 +195,7 @@ class WebSocketHandler:
             asr_engine=self.default_context_cache.asr_engine,
             tts_engine=self.default_context_cache.tts_engine,
             vad_engine=self.default_context_cache.vad_engine,
-            agent_engine=self.default_context_cache.agent_engine,
+            agent_engine=self._create_session_agent(),
             translate_engine=self.default_context_cache.translate_engine,
             mcp_server_registery=self.default_context_cache.mcp_server_registery,
             tool_adapter=self.default_context_cache.tool_adapter,
@@ -188,6 +207,16 @@ class WebSocketHandler:
         )
         return session_service_context
 
+    def _create_session_agent(self) -> AgentInterface:
+        """
+        Give the session its own agent memory on top of the shared LLM and tools.
+        Agents that keep their memory elsewhere are shared as they are.
+        """
+        agent_engine = self.default_context_cache.agent_engine
+        if hasattr(agent_engine, "create_session"):
+            return agent_engine.create_session()
+        return agent_engine
+
     async def handle_websocket_communication(
         self, websocket: WebSocket, client_uid: str
     ) -> None:
@@ -286,8 +315,9 @@ class WebSocketHandler:
 
         # Clean up other client data
         self.client_connections.pop(client_uid, None)
-        self.client_contexts.pop(client_uid, None)
+        context = self.client_contexts.pop(client_uid, None)
         self.received_data_buffers.pop(client_uid, None)
+        ProactiveSpeechCache.remove(client_uid)
         if client_uid in self.current_conversation_tasks:
             task = self.current_conversation_tasks[client_uid]
             if task and not task.done():
@@ -295,7 +325,6 @@ class WebSocketHandler:
             self.current_conversation_tasks.pop(client_uid, None)
 
         # Call context close to clean up resources
-        context = self.client_contexts.get(client_uid)
         if context:
             # MCP client is shared, so don't close it on individual client disconnect
             await context.close(close_mcp=False)
@@ -306,7 +335,7 @@ class WebSocketHandler:
     async def _cleanup_failed_connection(self, client_uid: str) -> None:
         """Clean up failed connection data"""
         self.client_connections.pop(client_uid, None)
-        self.client_contexts.pop(client_uid, None)
+        context = self.client_contexts.pop(client_uid, None)
         self.received_data_buffers.pop(client_uid, None)
         self.chat_group_manager.client_group_map.pop(client_uid, None)
 
@@ -316,6 +345,9 @@ class WebSocketHandler:
                 task.cancel()
             self.current_conversation_tasks.pop(client_uid, None)
 
+        if context:
+            await context.close(close_mcp=False)
+
         message_handler.cleanup_client(client_uid)
 
     async def broadcast_to_group(
@@ -384,7 +416,10 @@ class WebSocketHandler:
     ) -> None:
         """Handle request for chat history list"""
         context = self.client_contexts[client_uid]
-        histories = get_history_list(context.character_config.conf_uid)
+        # May have to read history files if the index is stale
+        histories = await asyncio.to_thread(
+            get_history_list, context.character_config.conf_uid
+        )
         await websocket.send_text(
             json.dumps({"type": "history-list", "histories": histories})
         )
@@ -398,23 +433,84 @@ class WebSocketHandler:
             return
 
         context = self.client_contexts[client_uid]
+        conf_uid = context.character_config.conf_uid
+        # Send the latest page right away. Older pages are fetched on request
+        # with fetch-history-page, starting from the `before` cursor.
+        page = await asyncio.to_thread(
+            get_history_page, conf_uid, history_uid, HISTORY_FIRST_PAGE_SIZE
+        )
+        messages = [msg for msg in page["messages"] if msg["role"] != "system"]
+        await websocket.send_text(
+            json.dumps(
+                {"type": "history-data", "messages": messages, "before": page["before"]}
+            )
+        )
+
         # Update history_uid in service context
         context.history_uid = history_uid
-        context.agent_engine.set_memory_from_history(
-            conf_uid=context.character_config.conf_uid,
-            history_uid=history_uid,
+        # Agents only load as much of the end of the history as they can use.
+        # Those that can start from the page just sent don't read it again.
+        agent = context.agent_engine
+        if hasattr(agent, "set_memory_from_history_page"):
+            await asyncio.to_thread(
+                agent.set_memory_from_history_page, conf_uid, history_uid, page
+            )
+        else:
+            await asyncio.to_thread(
+                agent.set_memory_from_history,
+                conf_uid=conf_uid,
+                history_uid=history_uid,
+            )
+
+    async def _handle_fetch_history_page(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """Handle request for a page of a chat history, newest page first"""
+        history_uid = data.get("history_uid")
+        if not history_uid:
+            return
+
+        context = self.client_contexts[client_uid]
+        limit = max(1, min(int(data.get("limit") or 50), 500))
+        page = await asyncio.to_thread(
+            get_history_page,
+            context.character_config.conf_uid,
+            history_uid,
+            limit,
+            data.get("before"),
+        )
+        await websocket.send_text(
+            json.dumps(
+                {
+                    "type": "history-page",
+                    "history_uid": history_uid,
+                    "messages": [
+                        msg for msg in page["messages"] if msg["role"] != "system"
+                    ],
+                    "before": page["before"],
+                }
+            )
         )
 
-        messages = [
-            msg
-            for msg in get_history(
+    async def _handle_search_history(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """Handle full-text search over the chat histories of the current character"""
+        query = (data.get("query") or "").strip()
+        context = self.client_contexts[client_uid]
+        results = []
+        if query:
+            results = await asyncio.to_thread(
+                search_history,
                 context.character_config.conf_uid,
-                history_uid,
+                query,
+                max(1, min(int(data.get("limit") or 20), 200)),
+                data.get("history_uid"),
             )
-            if msg["role"] != "system"
-        ]
         await websocket.send_text(
-            json.dumps({"type": "history-data", "messages": messages})
+            json.dumps(
+                {"type": "history-search-results", "query": query, "results": results}
+            )
         )
 
     async def _handle_create_history(
@@ -422,10 +518,13 @@ class WebSocketHandler:
     ) -> None:
         """Handle creation of new chat history"""
         context = self.client_contexts[client_uid]
-        history_uid = create_new_history(context.character_config.conf_uid)
+        history_uid = await asyncio.to_thread(
+            create_new_history, context.character_config.conf_uid
+        )
         if history_uid:
             context.history_uid = history_uid
-            context.agent_engine.set_memory_from_history(
+            await asyncio.to_thread(
+                context.agent_engine.set_memory_from_history,
                 conf_uid=context.character_config.conf_uid,
                 history_uid=history_uid,
             )
@@ -447,7 +546,8 @@ class WebSocketHandler:
             return
 
         context = self.client_contexts[client_uid]
-        success = delete_history(
+        success = await asyncio.to_thread(
+            delete_history,
             context.character_config.conf_uid,
             history_uid,
         )
@@ -591,3 +691,27 @@ class WebSocketHandler:
             await websocket.send_json({"type": "heartbeat-ack"})
         except Exception as e:
             logger.error(f"Error sending heartbeat acknowledgment: {e}")
+
+    async def _handle_set_text_delta(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """Turn the `text-delta` stream of the reply text on or off for a client"""
+        context = self.client_contexts.get(client_uid)
+        if context:
+            context.text_delta_enabled = bool(data.get("enabled", True))
+            logger.debug(
+                f"Text delta stream for {client_uid}: {context.text_delta_enabled}"
+            )
+
+    async def _handle_set_volume_encoding(
+        self, websocket: WebSocket, client_uid: str, data: WSMessage
+    ) -> None:
+        """Choose how lip-sync volumes are encoded in the audio sent to a client"""
+        encoding = data.get("encoding", "float")
+        context = self.client_contexts.get(client_uid)
+        if encoding not in VOLUME_ENCODINGS:
+            logger.warning(f"Unknown volume encoding from {client_uid}: {encoding}")
+            return
+        if context:
+            context.volume_encoding = encoding
+            logger.debug(f"Volume encoding for {client_uid}: {encoding}")
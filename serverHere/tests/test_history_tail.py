@@ -0,0 +1,65 @@
+import pytest
+
+from open_llm_vtuber import chat_history_manager
+from open_llm_vtuber.agent.agents import basic_memory_agent
+from open_llm_vtuber.agent.agents.basic_memory_agent import BasicMemoryAgent
+from open_llm_vtuber.history_storage.history_storage_interface import new_message
+from open_llm_vtuber.history_storage.json_history_storage import JSONHistoryStorage
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    storage = JSONHistoryStorage(str(tmp_path))
+    monkeypatch.setattr(chat_history_manager, "_storage", storage)
+    monkeypatch.setattr(chat_history_manager, "_writer", None)
+    history_uid = storage.create_new_history("conf")
+    storage.append_messages(
+        "conf",
+        history_uid,
+        [new_message("human" if i % 2 else "ai", f"message {i} " * 20) for i in range(500)],
+    )
+    return history_uid
+
+
+@pytest.fixture
+def page_reads(monkeypatch):
+    reads = []
+    get_page = basic_memory_agent.get_history_page
+
+    def counting_get_page(*args):
+        reads.append(args)
+        return get_page(*args)
+
+    monkeypatch.setattr(basic_memory_agent, "get_history_page", counting_get_page)
+    return reads
+
+
+def make_agent(token_budget):
+    return BasicMemoryAgent(
+        llm=None,
+        system="system",
+        live2d_model=None,
+        memory_token_budget=token_budget,
+        summarize_memory=False,
+    )
+
+
+def test_latest_page_is_not_read_again(history, page_reads):
+    agent = make_agent(token_budget=100)
+    page = chat_history_manager.get_history_page("conf", history, 50)
+    agent.set_memory_from_history_page("conf", history, page)
+    assert page_reads == []
+    assert agent._memory[-1]["content"] == page["messages"][-1]["content"]
+
+
+def test_pages_are_read_until_the_budget_is_covered(history, page_reads):
+    agent = make_agent(token_budget=6000)
+    agent.set_memory_from_history("conf", history)
+    assert 1 < len(page_reads) < 10
+    assert len(agent._memory) < 500
+
+
+def test_whole_history_is_read_without_a_budget(history):
+    agent = make_agent(token_budget=0)
+    agent.set_memory_from_history("conf", history)
+    assert len(agent._memory) == 500
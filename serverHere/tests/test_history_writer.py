@@ -0,0 +1,41 @@
+import threading
+import time
+
+from open_llm_vtuber.history_storage.history_storage_interface import new_message
+from open_llm_vtuber.history_storage.history_writer import HistoryWriter
+
+
+class SlowStorage:
+    """Records appended messages, blocking until released."""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.messages = []
+
+    def append_messages(self, conf_uid, history_uid, messages):
+        self.released.wait()
+        self.messages.extend(message["content"] for message in messages)
+
+
+def test_submit_does_not_wait_for_the_disk():
+    storage = SlowStorage()
+    writer = HistoryWriter(storage, policy="interval", max_queue=2)
+    try:
+        start = time.perf_counter()
+        for i in range(10):
+            writer.submit("conf", "history", new_message("human", str(i)))
+        assert time.perf_counter() - start < 0.5
+        assert writer.metrics.overflowed_messages > 0
+    finally:
+        storage.released.set()
+        writer.close()
+    assert storage.messages == [str(i) for i in range(10)]
+
+
+def test_messages_after_close_are_written():
+    storage = SlowStorage()
+    storage.released.set()
+    writer = HistoryWriter(storage)
+    writer.close()
+    writer.submit("conf", "history", new_message("ai", "late"))
+    assert storage.messages == ["late"]
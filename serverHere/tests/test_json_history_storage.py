@@ -0,0 +1,67 @@
+import threading
+
+from open_llm_vtuber.history_storage import json_history_storage
+from open_llm_vtuber.history_storage.history_storage_interface import new_message
+from open_llm_vtuber.history_storage.json_history_storage import JSONHistoryStorage
+
+
+def test_listing_during_an_append_counts_messages_once(tmp_path, monkeypatch):
+    storage = JSONHistoryStorage(str(tmp_path))
+    history_uid = storage.create_new_history("conf")
+    storage.append_messages("conf", history_uid, [new_message("human", "hello")])
+    assert storage.get_history_list("conf")[0]["message_count"] == 1
+
+    append_records = json_history_storage._append_records
+
+    def append_then_list(filepath, messages):
+        append_records(filepath, messages)
+        # A listing on another thread, between the write and the index update
+        listing = threading.Thread(target=storage.get_history_list, args=("conf",))
+        listing.start()
+        listing.join(timeout=0.5)
+
+    monkeypatch.setattr(json_history_storage, "_append_records", append_then_list)
+    storage.append_messages(
+        "conf", history_uid, [new_message("ai", "hi"), new_message("human", "bye")]
+    )
+    monkeypatch.setattr(json_history_storage, "_append_records", append_records)
+
+    assert storage.get_history_list("conf")[0]["message_count"] == 3
+
+
+
+def test_appends_do_not_rewrite_the_index_each_time(tmp_path, monkeypatch):
+    storage = JSONHistoryStorage(str(tmp_path))
+    history_uids = [storage.create_new_history("conf") for _ in range(3)]
+    storage.get_history_list("conf")
+
+    saves = []
+    save_index = storage._save_index
+    monkeypatch.setattr(
+        storage, "_save_index", lambda *args: saves.append(args) or save_index(*args)
+    )
+    for i in range(50):
+        storage.append_messages(
+            "conf", history_uids[i % 3], [new_message("human", f"message {i}")]
+        )
+    assert len(saves) <= 1
+    assert sum(h["message_count"] for h in storage.get_history_list("conf")) == 50
+
+    storage.close()
+    reopened = JSONHistoryStorage(str(tmp_path))
+    monkeypatch.setattr(json_history_storage, "_scan_index_entry", None)
+    assert sum(h["message_count"] for h in reopened.get_history_list("conf")) == 50
+
+
+def test_a_stale_index_is_corrected_from_the_files(tmp_path):
+    storage = JSONHistoryStorage(str(tmp_path))
+    history_uid = storage.create_new_history("conf")
+    storage.get_history_list("conf")
+    for i in range(5):
+        storage.append_messages("conf", history_uid, [new_message("human", f"m{i}")])
+
+    # Not closed, so the index on disk may be missing the latest appends
+    reopened = JSONHistoryStorage(str(tmp_path))
+    [history] = reopened.get_history_list("conf")
+    assert history["message_count"] == 5
+    assert history["latest_message"]["content"] == "m4"
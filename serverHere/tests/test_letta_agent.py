@@ -0,0 +1,129 @@
+"""LettaAgent against a local fake Letta server that streams slowly."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("letta_client")
+
+from open_llm_vtuber.agent.agents.letta_agent import LettaAgent  # noqa: E402
+from open_llm_vtuber.agent.input_types import (  # noqa: E402
+    BatchInput,
+    TextData,
+    TextSource,
+)
+from open_llm_vtuber.config_manager import TTSPreprocessorConfig  # noqa: E402
+
+CHUNK_DELAY = 0.3
+CHUNKS = ["Hello there. ", "The weather is nice. ", "Let's go outside. "]
+
+
+class FakeLettaHandler(BaseHTTPRequestHandler):
+    """Streams assistant message tokens, pausing before each like a thinking server."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        try:
+            for i, chunk in enumerate(CHUNKS):
+                time.sleep(CHUNK_DELAY)
+                message = {
+                    "id": f"message-{i}",
+                    "date": "2025-01-01T00:00:00Z",
+                    "message_type": "assistant_message",
+                    "content": chunk,
+                }
+                self.wfile.write(f"data: {json.dumps(message)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeLive2dModel:
+    def extract_emotion(self, text):
+        return []
+
+
+@pytest.fixture
+def letta_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeLettaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def make_agent(port):
+    return LettaAgent(
+        live2d_model=FakeLive2dModel(),
+        id="agent-test",
+        tts_preprocessor_config=TTSPreprocessorConfig(
+            remove_special_char=False,
+            translator_config={"translate_audio": False, "translate_provider": "deeplx"},
+        ),
+        segment_method="regex",
+        host="127.0.0.1",
+        port=port,
+    )
+
+
+def user_input(text):
+    return BatchInput(texts=[TextData(source=TextSource.INPUT, content=text)])
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Return the longest time the event loop was late to wake this task."""
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - start - interval)
+    return max_lag
+
+
+def test_slow_stream_does_not_block_the_event_loop(letta_server):
+    agent = make_agent(letta_server)
+
+    async def run():
+        stop = asyncio.Event()
+        lag = asyncio.create_task(measure_lag(stop))
+        # Let the lag task start ticking before the chat takes the loop
+        await asyncio.sleep(0.05)
+        texts = [output.display_text.text async for output in agent.chat(user_input("hi"))]
+        stop.set()
+        return texts, await lag
+
+    texts, max_lag = asyncio.run(run())
+
+    assert " ".join(texts).split() == " ".join(CHUNKS).split()
+    # A blocking read would stall the loop for about CHUNK_DELAY
+    assert max_lag < CHUNK_DELAY / 3
+
+
+def test_interrupt_stops_the_stream(letta_server):
+    agent = make_agent(letta_server)
+
+    async def run():
+        stream = agent.chat(user_input("hi"))
+        await anext(stream)
+        await stream.aclose()
+
+    asyncio.run(run())
+
+    deadline = time.monotonic() + 2 * CHUNK_DELAY * len(CHUNKS)
+    while time.monotonic() < deadline and any(
+        thread.name == "letta-stream" for thread in threading.enumerate()
+    ):
+        time.sleep(0.05)
+    assert not any(thread.name == "letta-stream" for thread in threading.enumerate())
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from open_llm_vtuber.agent.agents.basic_memory_agent import BasicMemoryAgent
+from open_llm_vtuber.agent.input_types import BatchInput, TextData, TextSource
+from open_llm_vtuber.agent.output_types import SentenceOutput
+from open_llm_vtuber.agent.stateless_llm.llm_gateway import (
+    OVERLOADED_MESSAGE,
+    GatedLLM,
+    GatewayLimits,
+    LLMGateway,
+    LLMOverloadedError,
+    Priority,
+)
+
+
+def test_release_skips_a_cancelled_waiter():
+    gateway = LLMGateway("test", GatewayLimits(max_concurrency=1))
+
+    async def run():
+        await gateway.acquire("a", Priority.INTERACTIVE, 10)
+        queued = asyncio.create_task(gateway.acquire("b", Priority.INTERACTIVE, 10))
+        await asyncio.sleep(0)
+        # Interrupted while queued, then the running request finishes before
+        # the cancelled task gets to remove its waiter
+        queued.cancel()
+        gateway.release()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+        # The slot is free again
+        await asyncio.wait_for(gateway.acquire("c", Priority.INTERACTIVE, 10), 1)
+        gateway.release()
+
+    asyncio.run(run())
+    assert gateway.metrics.active == 0
+    assert gateway.metrics.queued == 0
+
+
+def test_shedding_skips_a_cancelled_waiter():
+    gateway = LLMGateway("test", GatewayLimits(max_concurrency=1, max_queue=1))
+
+    async def run():
+        await gateway.acquire("a", Priority.INTERACTIVE, 10)
+        queued = asyncio.create_task(gateway.acquire("b", Priority.BACKGROUND, 10))
+        await asyncio.sleep(0)
+        queued.cancel()
+        # Takes the place of the cancelled request instead of shedding it.
+        # acquire() checks the queue before the cancelled task removes its waiter.
+        asyncio.get_running_loop().call_soon(gateway.release)
+        await gateway.acquire("c", Priority.INTERACTIVE, 10)
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        gateway.release()
+
+    asyncio.run(run())
+    assert gateway.metrics.rejected == 0
+    assert gateway.metrics.active == 0
+
+
+def test_full_queue_rejects_a_less_important_request():
+    gateway = LLMGateway("test", GatewayLimits(max_concurrency=1, max_queue=1))
+
+    async def run():
+        await gateway.acquire("a", Priority.INTERACTIVE, 10)
+        queued = asyncio.create_task(gateway.acquire("b", Priority.INTERACTIVE, 10))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMOverloadedError):
+            await gateway.acquire("c", Priority.BACKGROUND, 10)
+        gateway.release()
+        await queued
+        gateway.release()
+
+    asyncio.run(run())
+    assert gateway.metrics.rejected == 1
+
+
+class EchoLLM:
+    async def chat_completion(self, messages, system=None, tools=None):
+        yield "Hello."
+
+
+def test_shed_request_is_reported_but_not_remembered():
+    gateway = LLMGateway("test", GatewayLimits(max_concurrency=1, max_queue=1))
+    agent = BasicMemoryAgent(
+        llm=GatedLLM(EchoLLM(), gateway),
+        system="system",
+        live2d_model=None,
+        summarize_memory=False,
+    )
+    user_input = BatchInput(texts=[TextData(source=TextSource.INPUT, content="hi")])
+
+    async def run():
+        await gateway.acquire("a", Priority.INTERACTIVE, 10)
+        queued = asyncio.create_task(gateway.acquire("b", Priority.INTERACTIVE, 10))
+        await asyncio.sleep(0)
+        outputs = [output async for output in agent.chat(user_input)]
+        gateway.release()
+        await queued
+        gateway.release()
+        return outputs
+
+    outputs = asyncio.run(run())
+    assert outputs == [{"type": "error", "message": OVERLOADED_MESSAGE}]
+    assert not any(isinstance(output, SentenceOutput) for output in outputs)
+    assert all(message["role"] != "assistant" for message in agent._memory)
@@ -0,0 +1,26 @@
+import asyncio
+
+from open_llm_vtuber.agent.transformers import OutputPipeline, display_stage, tts_stage
+
+
+async def token_stream(text):
+    for i in range(0, len(text), 4):
+        yield text[i : i + 4]
+
+
+def test_pipeline_without_a_tts_config_uses_the_default():
+    pipeline = OutputPipeline(
+        stages=[display_stage, tts_stage()], segment_method="regex", valid_tags=["think"]
+    )
+
+    async def run():
+        return [
+            output
+            async for output in pipeline.process(
+                token_stream("<think>Plan.</think>Hello *waves* there.")
+            )
+        ]
+
+    outputs = asyncio.run(run())
+    spoken = " ".join(o.tts_text for o in outputs if o.tts_text).split()
+    assert spoken == ["Hello", "there."]
@@ -0,0 +1,59 @@
+import asyncio
+
+from open_llm_vtuber.agent.stateless_llm.routed_llm import RoutedLLM
+
+
+class ScriptedLLM:
+    """Yields its events, sleeping where an event is a number of seconds."""
+
+    def __init__(self, events):
+        self.events = events
+
+    async def chat_completion(self, messages, system=None, tools=None):
+        for event in self.events:
+            if isinstance(event, float):
+                await asyncio.sleep(event)
+            else:
+                yield event
+
+
+MESSAGE_START = {"type": "message_start", "data": {}}
+
+
+def collect(llm):
+    async def run():
+        return [event async for event in llm.chat_completion([], "system")]
+
+    return asyncio.run(run())
+
+
+def test_stall_after_message_start_is_hedged():
+    stalled = ScriptedLLM([MESSAGE_START, 5.0, {"type": "text_delta", "text": "late"}])
+    fast = ScriptedLLM([MESSAGE_START, {"type": "text_delta", "text": "Hi"}])
+    llm = RoutedLLM([stalled, fast], ["stalled", "fast"], hedge_delay_ms=50)
+
+    events = collect(llm)
+
+    assert events == [MESSAGE_START, {"type": "text_delta", "text": "Hi"}]
+    assert llm.stats[1].hedges_won == 1
+
+
+def test_ttft_is_measured_to_the_first_token():
+    llm = RoutedLLM(
+        [ScriptedLLM([MESSAGE_START, 0.1, {"type": "text_delta", "text": "Hi"}])],
+        ["slow"],
+    )
+
+    events = collect(llm)
+
+    assert events == [MESSAGE_START, {"type": "text_delta", "text": "Hi"}]
+    assert llm.stats[0].ttft_avg >= 0.1
+
+
+def test_error_after_message_start_fails_over():
+    failing = ScriptedLLM([MESSAGE_START, {"type": "error", "message": "boom"}])
+    working = ScriptedLLM(["Hello."])
+    llm = RoutedLLM([failing, working], ["failing", "working"])
+
+    assert collect(llm) == ["Hello."]
+    assert llm.stats[0].failures == 1
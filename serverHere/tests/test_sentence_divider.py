@@ -0,0 +1,25 @@
+import asyncio
+
+from open_llm_vtuber.utils.sentence_divider import SentenceDivider
+
+
+def divide(tokens, **kwargs):
+    async def stream():
+        for token in tokens:
+            yield token
+
+    async def collect():
+        divider = SentenceDivider(segment_method="regex", **kwargs)
+        return [item.text async for item in divider.process_stream(stream())]
+
+    return asyncio.run(asyncio.wait_for(collect(), timeout=5))
+
+
+def test_trailing_whitespace_past_limit_is_not_cut():
+    assert divide(["abcdefghij", " "], max_sentence_chars=10) == ["abcdefghij"]
+
+
+def test_run_on_text_is_cut_at_the_limit():
+    sentences = divide(["Hi "] + ["word "] * 40, max_sentence_chars=40)
+    assert all(len(sentence) <= 40 for sentence in sentences)
+    assert " ".join(sentences).split() == ["Hi"] + ["word"] * 40
@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+
+import pytest
+
+from open_llm_vtuber.history_storage.history_storage_interface import new_message
+from open_llm_vtuber.history_storage.json_history_storage import JSONHistoryStorage
+from open_llm_vtuber.history_storage.sqlite_history_storage import SQLiteHistoryStorage
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tmp_path):
+    if request.param == "json":
+        storage = JSONHistoryStorage(str(tmp_path))
+    else:
+        storage = SQLiteHistoryStorage(str(tmp_path / "history.db"))
+    yield storage
+    storage.close()
+
+
+def test_malformed_page_cursor_returns_an_empty_page(storage):
+    history_uid = storage.create_new_history("conf")
+    storage.append_messages("conf", history_uid, [new_message("human", "hello")])
+    page = storage.get_history_page("conf", history_uid, 10, before="not a cursor")
+    assert page == {"messages": [], "before": None}
+
+
+def test_reads_do_not_wait_for_a_write(tmp_path):
+    storage = SQLiteHistoryStorage(str(tmp_path / "history.db"))
+    history_uid = storage.create_new_history("conf")
+    storage.append_messages("conf", history_uid, [new_message("human", "hello")])
+
+    writing = threading.Event()
+    release = threading.Event()
+
+    def slow_write():
+        with storage._transaction() as conn:
+            conn.execute(
+                "UPDATE messages SET content = 'changed' WHERE conf_uid = 'conf'"
+            )
+            writing.set()
+            release.wait(5)
+
+    writer = threading.Thread(target=slow_write)
+    writer.start()
+    try:
+        assert writing.wait(5)
+        histories = []
+        reader = threading.Thread(
+            target=lambda: histories.extend(storage.get_history_list("conf"))
+        )
+        reader.start()
+        reader.join(timeout=2)
+        assert not reader.is_alive()
+        # The uncommitted write is not visible
+        assert histories[0]["latest_message"]["content"] == "hello"
+    finally:
+        release.set()
+        writer.join()
+        storage.close()
+
+
+class LockedConnection:
+    def execute(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+
+@pytest.mark.parametrize(
+    "call, expected",
+    [
+        (lambda s, uid: s.get_metadata("conf", uid), {}),
+        (lambda s, uid: s.get_history("conf", uid), []),
+        (lambda s, uid: s.get_history_tail("conf", uid, 10), []),
+        (
+            lambda s, uid: s.get_history_page("conf", uid, 10),
+            {"messages": [], "before": None},
+        ),
+        (lambda s, uid: s.get_history_list("conf"), []),
+        (lambda s, uid: s.modify_latest_message("conf", uid, "human", "hi"), False),
+    ],
+)
+def test_database_errors_are_logged_not_raised(tmp_path, monkeypatch, call, expected):
+    storage = SQLiteHistoryStorage(str(tmp_path / "history.db"))
+    history_uid = storage.create_new_history("conf")
+    storage.append_messages("conf", history_uid, [new_message("human", "hello")])
+
+    monkeypatch.setattr(storage, "_connection", LockedConnection)
+    try:
+        assert call(storage, history_uid) == expected
+    finally:
+        monkeypatch.undo()
+        storage.close()